@@ -20,9 +20,11 @@ Moving any of these folders or files will prevent the game from working properly
 Author: Walker M. White (wmw2)
 Date:   November 20, 2019
 """
-from consts import *
+import sys
+from config import GameConfig
 from app import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    Invaders(GameConfig.from_argv(sys.argv[1:]),retained=True,stats=True,
+            preload=True,preload_sizes=(30,)).run()
@@ -12,6 +12,7 @@ question on Piazza.
 # 12/7/21
 """
 from consts import *
+from config import GameConfig
 from game2d import *
 from wave import *
 
@@ -32,10 +33,11 @@ class Invaders(GameApp):
 
         Method draw displays the Play object and any other elements on screen
 
-    Because of some of the weird ways that Kivy works, you SHOULD NOT create
-    an initializer __init__ for this class.  Any initialization should be done
-    in the start method instead.  This is only for this class.  All other
-    classes behave normally.
+    Because of some of the weird ways that Kivy works, the initializer
+    __init__ of this class only stores the settings of the game (a
+    GameConfig) and passes everything else to GameApp.  Any initialization
+    of the game should be done in the start method instead.  This is only
+    for this class.  All other classes behave normally.
 
     Most of the work handling the game is actually provided in the class Wave.
     Wave should be modeled after subcontrollers.py from lecture, and will
@@ -75,7 +77,32 @@ class Invaders(GameApp):
     # Attribute lastkeys: the number of keys pressed last frame
     # Invariant: laskeys is an int >= 0
 
-    # DO NOT MAKE A NEW INITIALIZER!
+    # Attribute _game_config: the settings of every wave in this game (kivy
+    # already uses the name config)
+    # Invariant: _game_config is a GameConfig
+
+    # INITIALIZER (ONLY STORES THE SETTINGS)
+    def __init__(self, config=None, **keywords):
+        """
+        Creates, but does not start, the game with the given settings
+
+        The window is the size of the game in config, unless the keywords
+        width and height are given. If the keyword tick_rate is not given,
+        the game updates once every frame_time of config.
+
+        Parameter config: the settings of the game (the defaults if None)
+        Precondition: config is a GameConfig or None
+
+        Parameter keywords: the keyword arguments of GameApp
+        Precondition: keywords are valid keyword arguments of GameApp
+        """
+        if config is None:
+            config = GameConfig()
+        self._game_config = config
+        keywords.setdefault('width', config.game_width)
+        keywords.setdefault('height', config.game_height)
+        keywords.setdefault('tick_rate', 1/config.frame_time)
+        super().__init__(**keywords)
 
     # THREE MAIN GAMEAPP METHODS
     def start(self):
@@ -107,6 +134,7 @@ class Invaders(GameApp):
             self._text.x = label_width
             self._text.y = label_height
 
+    @traced()
     def update(self,dt):
         """
         Animates a single frame in the game.
@@ -161,7 +189,7 @@ class Invaders(GameApp):
         if self._state == STATE_INACTIVE:
             self._determineChange()
         elif self._state == STATE_NEWWAVE:
-            self._wave = Wave()
+            self._wave = Wave(config=self._game_config)
             self._state = STATE_ACTIVE
         elif self._state == STATE_ACTIVE:
             self._text = None
@@ -186,7 +214,8 @@ class Invaders(GameApp):
             else:
                 self._game_win()
 
-    def draw(self):
+    @traced()
+    def draw(self, alpha=1.0):
         """
         Draws the game objects to the view.
 
@@ -199,12 +228,19 @@ class Invaders(GameApp):
         getters for these attributes or you need to add a draw method to
         class Wave.  We suggest the latter.  See the example subcontroller.py
         from class.
+
+        When the game runs with a fixed tick_rate (see GameApp), alpha is
+        how far the clock is between the last update and the next one, and
+        the wave uses it to draw moving objects smoothly.
+
+        Parameter alpha: how far the clock is past the last update
+        Precondition: alpha is a float in 0..1
         """
         # IMPLEMENT ME
         if self._text is not None:
             self._text.draw(self.view)
         else:
-            self._wave.draw(self.view)
+            self._wave.draw(self.view, alpha)
 
     # HELPER METHODS FOR THE STATES GO HERE
     def _determineChange(self):
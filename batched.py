@@ -0,0 +1,557 @@
+"""
+Batched waves for Alien Invaders
+
+This module plays many waves at once, for bots that need millions of
+frames. A BatchedWave holds the state of N independent waves in stacked
+NumPy arrays (one entry per wave along the first axis), and its method
+step applies the rules of Wave.update to all N waves with a fixed number
+of NumPy calls. There is no Python loop over the waves, the aliens or the
+bolts, so a step costs about the same for 1 wave as for a few thousand.
+
+The rules are the ones in wave.py: the aliens march and step down at the
+edges, fire from the bottom of a random column every few steps, and speed
+up by a factor of .97 for every alien destroyed; the ship moves, fires one
+bolt at a time, is destroyed by alien bolts and revived while it has lives
+left; and the wave is lost when the aliens reach the defense line. The
+hearts are only decoration, so they are not simulated. A wave that is over
+is reset at the end of the step, so every row of the batch always holds a
+wave in progress.
+
+The input of each wave is a bitmask of the held keys, in the same format
+as a Trace (see KEYS in replay.py). For example
+
+    waves = BatchedWave(1024, seed=7)
+    left, right, fire = 0b000011, 0b001100, 0b110000
+    kills, done = waves.step(np.full(1024, right|fire))
+
+All of the waves of a batch have the same settings, given as a GameConfig
+(see config.py). This module does not import game2d, so it does not need
+kivy.
+
+# Avery Avila - aha68
+# Neil Gidwani - nsg67
+# 12/7/21
+"""
+from config import GameConfig
+from replay import KEYS
+import numpy as np
+
+# The bits of each action in a key mask (see KEYS in replay.py)
+_LEFT  = (1 << KEYS.index('left')) | (1 << KEYS.index('a'))
+_RIGHT = (1 << KEYS.index('right')) | (1 << KEYS.index('d'))
+_FIRE  = (1 << KEYS.index('up')) | (1 << KEYS.index('spacebar'))
+
+# The phases of the ship of a wave
+_ALIVE  = 0     # The ship can move and fire
+_HIT    = 1     # The ship was hit in the last update
+_DYING  = 2     # The ship is playing its destroy animation
+_GONE   = 3     # The ship is gone, until it is revived
+
+# The offsets of a cell and its neighbours, bottom row first (see Formation)
+_NEIGHBOR_ROWS = np.repeat([-1,0,1],3)
+_NEIGHBOR_COLS = np.tile([-1,0,1],3)
+
+
+class BatchedWave(object):
+    """
+    A class to play N waves of Alien Invaders at once.
+
+    The layout of every wave is the same as in Wave: alien_rows rows of
+    aliens_in_row aliens (see GameConfig), with the formation stored as the center of its
+    bottom left cell (the origin) and a grid of alive cells. Each wave also
+    has a fixed number of bolt slots. Slot 0 is the bolt of the ship (the
+    ship only has one bolt at a time) and the other slots are for alien
+    bolts. An alien that fires when all of its wave's slots are in use
+    does not fire; with the default number of slots this does not happen
+    in normal play.
+
+    There are two small differences from Wave. The random numbers come from
+    one NumPy generator for the whole batch, so a BatchedWave does not play
+    the same game as a Wave with the same seed. And when two bolts hit the
+    same alien in the same update, only the first one is stopped.
+
+    The state arrays are available as read-only attributes, so that a bot
+    can build its observations from them. Do not modify them.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _config: the settings of every wave
+    # Invariant: _config is a GameConfig
+    #
+    # Attribute _rng: the random number generator of the whole batch
+    # Invariant: _rng is a numpy.random.Generator
+    #
+    # Attribute _env: the index of each wave
+    # Invariant: _env is the int array arange(N)
+    #
+    # Attribute _alive: which cells of each formation still have an alien
+    # Invariant: _alive is a bool array of shape (N, alien_rows, aliens_in_row)
+    #
+    # Attribute _count: the number of aliens left in each wave
+    # Invariant: _count is an int array of shape (N,), the sum of _alive
+    #
+    # Attribute _origin: the center of the bottom left cell of each formation
+    # Invariant: _origin is a float array of shape (N, 2) in (x, y)
+    #
+    # Attribute _vstep: the number of times each formation stepped down
+    # Invariant: _vstep is an int array of shape (N,), >= 0
+    #
+    # Attribute _speed: the seconds between alien steps in each wave
+    # Invariant: _speed is a float array of shape (N,), > 0
+    #
+    # Attribute _time: the time since the last alien step in each wave
+    # Invariant: _time is a float array of shape (N,), >= 0
+    #
+    # Attribute _rate: the alien steps between alien bolts in each wave
+    # Invariant: _rate is an int array of shape (N,), in 1..bolt_rate
+    #
+    # Attribute _rate_time: the alien steps since the last alien bolt
+    # Invariant: _rate_time is an int array of shape (N,), >= 0
+    #
+    # Attribute _ship_x: the x coordinate of each ship
+    # Invariant: _ship_x is a float array of shape (N,)
+    #
+    # Attribute _phase: the phase of each ship (see _ALIVE to _GONE)
+    # Invariant: _phase is an int array of shape (N,), in 0..3
+    #
+    # Attribute _death: how far each destroy animation has gone
+    # Invariant: _death is a float array of shape (N,), in 0..8
+    #
+    # Attribute _lives: the number of lives left in each wave
+    # Invariant: _lives is an int array of shape (N,), >= 0
+    #
+    # Attribute _bolt_x: the x coordinate of each bolt slot
+    # Invariant: _bolt_x is a float array of shape (N, slots)
+    #
+    # Attribute _bolt_y: the y coordinate of each bolt slot
+    # Invariant: _bolt_y is a float array of shape (N, slots)
+    #
+    # Attribute _bolt_v: the velocity of each bolt slot
+    # Invariant: _bolt_v is a float array of shape (N, slots); it is
+    # bolt_speed in slot 0 and -bolt_speed in the others
+    #
+    # Attribute _bolt_on: which bolt slots hold a live bolt
+    # Invariant: _bolt_on is a bool array of shape (N, slots)
+    #
+    # Attribute _frames: the number of updates of each wave since its reset
+    # Invariant: _frames is an int array of shape (N,), >= 0
+
+    # GETTERS AND SETTERS
+    @property
+    def size(self):
+        """
+        The number of waves in this batch
+
+        **Invariant**: Must be an int > 0
+        """
+        return len(self._env)
+
+    @property
+    def config(self):
+        """
+        The settings of every wave in this batch
+
+        **Invariant**: Must be a GameConfig
+        """
+        return self._config
+
+    @property
+    def alive(self):
+        """
+        Which cells of each formation still have an alien
+
+        **Invariant**: Must be a bool array of shape (size, rows, cols)
+        """
+        return self._alive
+
+    @property
+    def count(self):
+        """
+        The number of aliens left in each wave
+
+        **Invariant**: Must be an int array of shape (size,)
+        """
+        return self._count
+
+    @property
+    def origin(self):
+        """
+        The center of the bottom left cell of each formation
+
+        **Invariant**: Must be a float array of shape (size, 2)
+        """
+        return self._origin
+
+    @property
+    def ship_x(self):
+        """
+        The x coordinate of each ship
+
+        **Invariant**: Must be a float array of shape (size,)
+        """
+        return self._ship_x
+
+    @property
+    def ship_alive(self):
+        """
+        Whether the ship of each wave can move and fire
+
+        **Invariant**: Must be a bool array of shape (size,)
+        """
+        return self._phase == _ALIVE
+
+    @property
+    def lives(self):
+        """
+        The number of lives left in each wave
+
+        **Invariant**: Must be an int array of shape (size,)
+        """
+        return self._lives
+
+    @property
+    def bolts(self):
+        """
+        The bolts of each wave, as the arrays (x, y, live)
+
+        Slot 0 is the bolt of the ship. The coordinates of slots that are
+        not live are meaningless.
+
+        **Invariant**: Must be a tuple of three arrays of shape (size, slots)
+        """
+        return (self._bolt_x, self._bolt_y, self._bolt_on)
+
+    @property
+    def frames(self):
+        """
+        The number of updates of each wave since it was reset
+
+        **Invariant**: Must be an int array of shape (size,)
+        """
+        return self._frames
+
+    # INITIALIZER
+    def __init__(self,size,seed=None,slots=8,config=None):
+        """
+        Initializes a batch of new waves
+
+        Parameter size: the number of waves
+        Precondition: size is an int > 0
+
+        Parameter seed: the seed for the random number generator
+        Precondition: seed is an int or None
+
+        Parameter slots: the number of bolt slots of each wave
+        Precondition: slots is an int >= 2
+
+        Parameter config: the settings of every wave (the defaults if None)
+        Precondition: config is a GameConfig or None
+        """
+        assert type(size) == int and size > 0, '%s is not a valid size' % repr(size)
+        assert type(slots) == int and slots >= 2, '%s is not a valid slots' % repr(slots)
+        if config is None:
+            config = GameConfig()
+        self._config = config
+        self._rng = np.random.default_rng(seed)
+        self._env = np.arange(size)
+        self._alive = np.zeros((size,config.alien_rows,config.aliens_in_row),dtype=bool)
+        self._count = np.zeros(size,dtype=int)
+        self._origin = np.zeros((size,2))
+        self._vstep = np.zeros(size,dtype=int)
+        self._speed = np.zeros(size)
+        self._time = np.zeros(size)
+        self._rate = np.zeros(size,dtype=int)
+        self._rate_time = np.zeros(size,dtype=int)
+        self._ship_x = np.zeros(size)
+        self._phase = np.zeros(size,dtype=int)
+        self._death = np.zeros(size)
+        self._lives = np.zeros(size,dtype=int)
+        self._bolt_x = np.zeros((size,slots))
+        self._bolt_y = np.zeros((size,slots))
+        self._bolt_v = np.full((size,slots),-float(config.bolt_speed))
+        self._bolt_v[:,0] = config.bolt_speed
+        self._bolt_on = np.zeros((size,slots),dtype=bool)
+        self._frames = np.zeros(size,dtype=int)
+
+        # The layout of Formation
+        self._step = np.array([config.alien_h_step,config.alien_v_step],dtype=float)
+        self._start = np.array([config.alien_x,config.alien_y],dtype=float)
+        self.reset()
+
+    # PUBLIC METHODS
+    def reset(self,mask=None):
+        """
+        Starts new waves
+
+        Parameter mask: which waves to reset (all of them if None)
+        Precondition: mask is a bool array of shape (size,) or None
+        """
+        if mask is None:
+            mask = np.ones(self.size,dtype=bool)
+        n = int(np.count_nonzero(mask))
+        if n == 0:
+            return
+        config = self._config
+        self._alive[mask] = True
+        self._count[mask] = config.alien_rows*config.aliens_in_row
+        self._origin[mask] = self._start
+        self._vstep[mask] = 0
+        self._speed[mask] = config.alien_speed
+        self._time[mask] = 0
+        self._rate[mask] = self._rng.integers(1,config.bolt_rate+1,n)
+        self._rate_time[mask] = 0
+        self._ship_x[mask] = config.game_width//2
+        self._phase[mask] = _ALIVE
+        self._death[mask] = 0
+        self._lives[mask] = config.ship_lives
+        self._bolt_on[mask] = False
+        self._frames[mask] = 0
+
+    def is_game_over(self):
+        """
+        Returns a bool array saying which waves are over
+
+        A wave is over if it has no lives left or all aliens are dead.
+        Waves are reset at the end of step, so this is only True between
+        steps if the batch was changed some other way.
+        """
+        return (self._lives <= 0) | (self._count == 0)
+
+    def step(self,keys,dt=None):
+        """
+        Returns the tuple (kills, done) after updating every wave once
+
+        kills is an int array with the number of aliens each wave lost in
+        this update, and done is a bool array saying which waves ended in
+        this update. The waves that ended are reset before this method
+        returns, so their state is already that of a new wave.
+
+        Parameter keys: the keys held down in each wave (see KEYS in replay.py)
+        Precondition: keys is an int array of shape (size,), or an int
+
+        Parameter dt: The time since the last animation frame (the
+        frame_time of the config if None)
+        Precondition: dt is a float > 0 or None
+        """
+        if dt is None:
+            dt = self._config.frame_time
+        keys = np.broadcast_to(np.asarray(keys,dtype=int),self._env.shape)
+        self._frames += 1
+
+        # Revive the ships that are gone (Wave._revive_ship)
+        phase = self._phase
+        phase[(phase == _GONE) & (self._lives > 0)] = _ALIVE
+
+        # Play the destroy animations (Wave._animate_destroy_ship)
+        dying = phase == _DYING
+        self._death[dying] += 8/self._config.death_speed*dt
+        done = dying & (self._death >= 8)
+        phase[done] = _GONE
+        self._lives[done] -= 1
+        hit = phase == _HIT
+        phase[hit] = _DYING
+        self._death[hit] = 0
+
+        # Move and fire (Wave._update_ship_bolt)
+        ready = phase == _ALIVE
+        self._move_ships(keys,ready,dt)
+        self._fire_ships(keys,ready)
+        self._fire_aliens(ready)
+
+        # March the aliens (Wave._update_aliens)
+        self._time += dt
+        self._march((self._time > self._speed) & (self._time != 0),dt)
+
+        kills = self._move_bolts(dt)
+        over = self.is_game_over()
+        self.reset(over)
+        return (kills, over)
+
+    # HIDDEN METHODS
+    def _move_ships(self,keys,ready,dt):
+        """
+        Moves the ready ships left or right, keeping them on screen
+
+        Parameter keys: the keys held down in each wave
+        Precondition: keys is an int array of shape (size,)
+
+        Parameter ready: which ships can move
+        Precondition: ready is a bool array of shape (size,)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float > 0
+        """
+        config = self._config
+        da = (np.where(keys & _RIGHT,config.ship_movement,0) -
+              np.where(keys & _LEFT,config.ship_movement,0))*(dt/config.frame_time)
+        moved = np.clip(self._ship_x + da,config.ship_min_x,config.ship_max_x)
+        self._ship_x = np.where(ready,moved,self._ship_x)
+
+    def _fire_ships(self,keys,ready):
+        """
+        Fires a bolt from every ready ship that wants to and has none
+
+        Parameter keys: the keys held down in each wave
+        Precondition: keys is an int array of shape (size,)
+
+        Parameter ready: which ships can fire
+        Precondition: ready is a bool array of shape (size,)
+        """
+        fire = ready & ((keys & _FIRE) != 0) & ~self._bolt_on[:,0]
+        self._bolt_x[fire,0] = self._ship_x[fire]
+        self._bolt_y[fire,0] = self._config.ship_bottom + self._config.ship_muzzle
+        self._bolt_on[fire,0] = True
+
+    def _fire_aliens(self,ready):
+        """
+        Fires a bolt from a random column in every wave whose turn it is
+
+        Parameter ready: which waves can fire
+        Precondition: ready is a bool array of shape (size,)
+        """
+        turn = ready & (self._rate_time > self._rate)
+        envs = self._env[turn]
+        if len(envs) == 0:
+            return
+        self._rate_time[envs] = 0
+        self._rate[envs] = self._rng.integers(1,self._config.bolt_rate+1,len(envs))
+
+        # Pick a column with an alien, then the bottom alien of that column
+        columns = self._alive[envs].any(axis=1)
+        pick = (self._rng.random(len(envs))*columns.sum(axis=1)).astype(int)
+        col = np.argmax(np.cumsum(columns,axis=1) > pick[:,np.newaxis],axis=1)
+        row = np.argmax(self._alive[envs,:,col],axis=1)
+
+        free = ~self._bolt_on[envs,1:]
+        can = free.any(axis=1) & columns.any(axis=1)
+        envs, row, col = envs[can], row[can], col[can]
+        slot = np.argmax(free[can],axis=1)+1
+        origin = self._origin[envs]
+        self._bolt_x[envs,slot] = origin[:,0] + col*self._step[0]
+        self._bolt_y[envs,slot] = (origin[:,1] + row*self._step[1]
+                                   - self._config.alien_muzzle)
+        self._bolt_on[envs,slot] = True
+
+    def _march(self,due,dt):
+        """
+        Moves the aliens of every wave that is due for a step
+
+        Parameter due: which waves take a step
+        Precondition: due is a bool array of shape (size,)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float > 0
+        """
+        envs = self._env[due]
+        if len(envs) == 0:
+            return
+        columns = self._alive[envs].any(axis=1)
+        rows = self._alive[envs].any(axis=2)
+        cols = columns.shape[1]
+        left = np.argmax(columns,axis=1)
+        right = cols-1-np.argmax(columns[:,::-1],axis=1)
+        low = np.argmax(rows,axis=1)
+        origin = self._origin[envs]
+        config = self._config
+
+        even = self._vstep[envs] % 2 == 0
+        edge_r = (origin[:,0] + right*self._step[0] + config.alien_width//2
+                  + config.alien_h_sep)
+        edge_l = (origin[:,0] + left*self._step[0] - config.alien_width//2
+                  - config.alien_h_sep)
+        walk = np.where(even,edge_r < config.game_width,edge_l > 0)
+        origin[:,0] += np.where(walk,np.where(even,config.alien_h_walk,
+                                              -config.alien_h_walk),0)
+        origin[:,1] -= np.where(walk,0,config.alien_v_walk)
+        self._origin[envs] = origin
+        self._vstep[envs] += ~walk
+        self._rate_time[envs] += 1
+
+        below = (origin[:,1] + low*self._step[1] - config.alien_height//2
+                 - config.defense_line <= 0)
+        lost = envs[below & columns.any(axis=1)]
+        self._lives[lost] = 0
+        self._phase[lost] = _GONE
+        self._time[envs] = dt
+
+    def _move_bolts(self,dt):
+        """
+        Returns the number of aliens each wave lost after moving the bolts
+
+        Every live bolt moves, and bolts that leave the screen, hit an alien
+        or hit a ship are removed (Wave._update_bolts).
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float > 0
+        """
+        config = self._config
+        on = self._bolt_on
+        self._bolt_y += self._bolt_v*(dt/config.frame_time)
+        y = self._bolt_y
+        half = config.bolt_height//2
+        on &= ~((y + half > config.game_height) | (y - half < 0))
+
+        kills = self._hit_aliens()
+        x = self._bolt_x
+        ship = (self._phase != _GONE)[:,np.newaxis]
+        hit = (on & ship &
+               (np.abs(x - self._ship_x[:,np.newaxis])
+                < config.ship_width/2.0 + config.bolt_width//2) &
+               (np.abs(y - config.ship_bottom) < config.ship_height/2.0 + half))
+        struck = hit.any(axis=1)
+        self._phase[struck & (self._phase == _ALIVE)] = _HIT
+        on &= ~hit
+        return kills
+
+    def _hit_aliens(self):
+        """
+        Returns the number of aliens each wave lost to a bolt
+
+        This is the grid test of Formation.hits, applied to every live bolt
+        of every wave. Each bolt that hits an alien destroys it and is
+        removed, and each alien destroyed speeds up its wave by .97.
+        """
+        # Only bolts over the lattice of their formation can hit anything
+        rows, cols = self._alive.shape[1:]
+        reach_x = self._config.alien_reach_x
+        reach_y = self._config.alien_reach_y
+        dx = self._bolt_x - self._origin[:,0:1]
+        dy = self._bolt_y - self._origin[:,1:2]
+        band = (self._bolt_on &
+                (dx > -reach_x) & (dx < (cols-1)*self._step[0] + reach_x) &
+                (dy > -reach_y) & (dy < (rows-1)*self._step[1] + reach_y))
+        env, slot = np.nonzero(band)
+        kills = np.zeros(self.size,dtype=int)
+        if len(env) == 0:
+            return kills
+        xs = self._bolt_x[env,slot]
+        ys = self._bolt_y[env,slot]
+        ox = self._origin[env,0]
+        oy = self._origin[env,1]
+        col = np.floor((xs-ox)/self._step[0]+0.5).astype(int)
+        row = np.floor((ys-oy)/self._step[1]+0.5).astype(int)
+        near_r = row[:,np.newaxis] + _NEIGHBOR_ROWS
+        near_c = col[:,np.newaxis] + _NEIGHBOR_COLS
+
+        inside = (near_r >= 0) & (near_r < rows) & (near_c >= 0) & (near_c < cols)
+        touch = (inside &
+                 (np.abs(ox[:,np.newaxis]+near_c*self._step[0]-xs[:,np.newaxis])
+                  < reach_x) &
+                 (np.abs(oy[:,np.newaxis]+near_r*self._step[1]-ys[:,np.newaxis])
+                  < reach_y))
+        cells = np.where(inside,env[:,np.newaxis]*rows*cols + near_r*cols + near_c,0)
+        touch &= self._alive.ravel()[cells]
+
+        # The first cell each bolt touches, and the first bolt on each cell
+        bolts = np.flatnonzero(touch.any(axis=1))
+        if len(bolts) == 0:
+            return kills
+        cell = cells[bolts,np.argmax(touch[bolts],axis=1)]
+        cell, first = np.unique(cell,return_index=True)
+        bolts = bolts[first]
+
+        self._alive.ravel()[cell] = False
+        kills = np.bincount(env[bolts],minlength=self.size)
+        self._count -= kills
+        self._speed *= .97**kills
+        self._bolt_on[env[bolts],slot[bolts]] = False
+        return kills
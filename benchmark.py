@@ -0,0 +1,332 @@
+"""
+Benchmarks for Alien Invaders
+
+This module measures how the cost of Wave.update grows with the size of
+the formation, the number of bolts on screen and the speed of the aliens.
+Each point of the benchmark matrix plays a headless wave (see headless.py)
+with a GameConfig (see config.py) to match, and reports
+
+    ns_per_tick       the wall time of one Wave.update, in nanoseconds
+    methods           the time of one call of each hot method, in nanoseconds
+    peak_bytes        the peak memory allocated during one update, in bytes
+    net_blocks        the memory blocks kept after one update
+
+Bolts are added at random after every update (outside of the timing) to keep
+the number of bolts on screen steady, and a new wave is started whenever the
+wave is over. The screen grows with the formation, so that even a formation
+of thousands of aliens has room to march.
+
+For every hot method and every bolt count and speed, the benchmark also fits
+the scaling exponent k in time ~ aliens**k. Run the benchmark as
+
+    python benchmark.py --json results.json
+    python benchmark.py --json new.json --compare results.json
+
+to save the results as JSON and to compare them with an earlier run. The
+method draw is only measured if kivy can create a GView.
+
+# Avery Avila - aha68
+# Neil Gidwani - nsg67
+# 12/7/21
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+from config import GameConfig
+
+# The methods of Wave that are timed on every call
+HOT_METHODS = ('_update_bolts','_alien_contact','_update_aliens','is_game_over','draw')
+
+# The points of the benchmark matrix: (rows, cols), bolts on screen, ALIEN_SPEED
+SIZES  = ((5,12),(10,15),(20,40),(40,80))
+BOLTS  = (0,16,64,256)
+SPEEDS = (1.0,0.1)
+
+# The smaller matrix used with --quick
+QUICK_SIZES  = ((5,12),(20,40))
+QUICK_BOLTS  = (0,64)
+QUICK_SPEEDS = (1.0,)
+
+
+class _Timer(object):
+    """
+    A class to time every call of a method.
+
+    The timer replaces the method on one object, so the object calls the
+    timer instead and the timer adds up the time of every call.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _method: the method being timed
+    # Invariant: _method is a bound method
+    #
+    # Attribute calls: the number of calls so far
+    # Invariant: calls is an int >= 0
+    #
+    # Attribute total: the time of all calls so far, in nanoseconds
+    # Invariant: total is an int >= 0
+
+    def __init__(self,method):
+        """
+        Initializes a timer for the given method
+
+        Parameter method: the method to time
+        Precondition: method is a bound method
+        """
+        self._method = method
+        self.calls = 0
+        self.total = 0
+
+    def __call__(self,*args):
+        """
+        Calls the method, adding its time to the total
+        """
+        start = time.perf_counter_ns()
+        try:
+            return self._method(*args)
+        finally:
+            self.total += time.perf_counter_ns()-start
+            self.calls += 1
+
+
+def make_config(rows,cols,speed):
+    """
+    Returns the GameConfig for one point of the benchmark
+
+    The screen is made large enough for the formation to march and step
+    down a few times before it reaches the defense line.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens per row
+    Precondition: cols is an int > 0
+
+    Parameter speed: the seconds between alien steps
+    Precondition: speed is a float > 0
+    """
+    return GameConfig(alien_rows=rows,aliens_in_row=cols,alien_speed=speed).fitted(8)
+
+
+def measure(rows,cols,bolts,speed,ticks=600,seed=0):
+    """
+    Returns a dict with the results of one point of the benchmark
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens per row
+    Precondition: cols is an int > 0
+
+    Parameter bolts: the number of bolts to keep on screen
+    Precondition: bolts is an int >= 0
+
+    Parameter speed: the seconds between alien steps
+    Precondition: speed is a float > 0
+
+    Parameter ticks: the number of updates to time
+    Precondition: ticks is an int > 0
+
+    Parameter seed: the seed for the waves and the extra bolts
+    Precondition: seed is an int
+    """
+    from headless import Wave, ScriptedInput
+    config = make_config(rows,cols,speed)
+    rng = random.Random(seed)
+    view = _make_view()
+
+    def start():
+        wave = Wave(rng.getrandbits(32),config)
+        timers = {}
+        for name in HOT_METHODS:
+            timers[name] = _Timer(getattr(wave,name))
+            setattr(wave,name,timers[name])
+        return wave, timers
+
+    def refill(wave):
+        while wave.get_bolt_count() < bolts:
+            wave.fire_bolt(rng.uniform(0,config.game_width),
+                           rng.uniform(config.defense_line,
+                                       config.game_height-config.bolt_height),
+                           rng.choice(('up','down')))
+
+    def collect(timers):
+        for name in HOT_METHODS:
+            totals[name][0] += timers[name].total
+            totals[name][1] += timers[name].calls
+
+    input = ScriptedInput()
+    wave, timers = start()
+    totals = dict((name,[0,0]) for name in HOT_METHODS)
+    elapsed = 0
+    peak = 0
+    blocks = 0
+    tracing = max(1,ticks//4)
+    for tick in range(ticks+tracing):
+        if tick == ticks:
+            # Allocation pass (tracemalloc slows everything down)
+            collect(timers)
+            tracemalloc.start()
+        if wave.is_game_over():
+            if tick < ticks:
+                collect(timers)
+            wave, timers = start()
+        refill(wave)
+
+        if tick < ticks:
+            begin = time.perf_counter_ns()
+            wave.update(input, config.frame_time)
+            wave.is_game_over()
+            if view is not None:
+                view.clear()
+                wave.draw(view)
+            elapsed += time.perf_counter_ns()-begin
+        else:
+            before = sys.getallocatedblocks()
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            wave.update(input, config.frame_time)
+            peak += tracemalloc.get_traced_memory()[1]-base
+            blocks += sys.getallocatedblocks()-before
+    tracemalloc.stop()
+
+    methods = {}
+    for name in HOT_METHODS:
+        total, calls = totals[name]
+        methods[name] = None if calls == 0 else total/calls
+    return {'rows': rows, 'cols': cols, 'aliens': rows*cols,
+            'bolts': bolts, 'speed': speed, 'ticks': ticks,
+            'ns_per_tick': elapsed/ticks, 'methods': methods,
+            'peak_bytes': peak/tracing, 'net_blocks': blocks/tracing}
+
+
+def scaling(results):
+    """
+    Returns the scaling exponent of every hot method
+
+    The result is a list of dicts, one for every bolt count and speed, with
+    the exponent k of the fit time ~ aliens**k for every method (None if
+    there are not enough points to fit).
+
+    Parameter results: the results of the benchmark
+    Precondition: results is a list of dicts made by measure
+    """
+    groups = {}
+    for result in results:
+        groups.setdefault((result['bolts'],result['speed']),[]).append(result)
+    curves = []
+    for (bolts,speed), group in sorted(groups.items()):
+        curve = {'bolts': bolts, 'speed': speed, 'exponents': {}}
+        for name in HOT_METHODS+('tick',):
+            points = [(r['aliens'],r['ns_per_tick'] if name == 'tick' else r['methods'][name])
+                      for r in group]
+            points = [p for p in points if p[1]]
+            exponent = None
+            if len(set(p[0] for p in points)) >= 2:
+                x = np.log([p[0] for p in points])
+                y = np.log([p[1] for p in points])
+                exponent = float(np.polyfit(x,y,1)[0])
+            curve['exponents'][name] = exponent
+        curves.append(curve)
+    return curves
+
+
+def compare(new,old):
+    """
+    Returns a list of lines comparing two runs of the benchmark
+
+    Each line gives the change in ns_per_tick and in every hot method for
+    a point of the matrix that is in both runs.
+
+    Parameter new: the new run, as saved by main
+    Precondition: new is a dict with the key 'results'
+
+    Parameter old: the earlier run, as saved by main
+    Precondition: old is a dict with the key 'results'
+    """
+    def key(result):
+        return (result['rows'],result['cols'],result['bolts'],result['speed'])
+
+    def change(a,b):
+        if not a or not b:
+            return '    n/a'
+        return '%+6.1f%%' % (100.0*(a-b)/b)
+
+    before = dict((key(r),r) for r in old['results'])
+    lines = []
+    for result in new['results']:
+        other = before.get(key(result))
+        if other is None:
+            continue
+        parts = ['%4dx%-4d bolts %3d speed %.2f' % key(result),
+                 'tick %s' % change(result['ns_per_tick'],other['ns_per_tick'])]
+        for name in HOT_METHODS:
+            parts.append('%s %s' % (name,change(result['methods'][name],
+                                                other['methods'][name])))
+        lines.append('  '.join(parts))
+    return lines
+
+
+def main(argv=None):
+    """
+    Runs the benchmark from the command line
+
+    Parameter argv: the command line arguments (sys.argv[1:] if None)
+    Precondition: argv is a list of strings or None
+    """
+    parser = argparse.ArgumentParser(description='Benchmark Wave.update')
+    parser.add_argument('--ticks',type=int,default=600,help='updates per point')
+    parser.add_argument('--quick',action='store_true',help='use a smaller matrix')
+    parser.add_argument('--json',help='file to save the results to')
+    parser.add_argument('--compare',help='earlier results to compare with')
+    args = parser.parse_args(argv)
+
+    sizes, bolt_counts, speeds = SIZES, BOLTS, SPEEDS
+    if args.quick:
+        sizes, bolt_counts, speeds = QUICK_SIZES, QUICK_BOLTS, QUICK_SPEEDS
+
+    results = []
+    for rows, cols in sizes:
+        for bolts in bolt_counts:
+            for speed in speeds:
+                gc.collect()
+                result = measure(rows,cols,bolts,speed,args.ticks)
+                results.append(result)
+                print('%4dx%-4d bolts %3d speed %.2f  %9.0f ns/tick  %7.0f bytes  %+5.1f blocks'
+                      % (rows,cols,bolts,speed,result['ns_per_tick'],
+                         result['peak_bytes'],result['net_blocks']))
+
+    report = {'python': platform.python_version(), 'numpy': np.__version__,
+              'machine': platform.machine(), 'ticks': args.ticks,
+              'results': results, 'scaling': scaling(results)}
+    for curve in report['scaling']:
+        print('bolts %3d speed %.2f  ' % (curve['bolts'],curve['speed']) +
+              '  '.join('%s %s' % (name,'n/a' if k is None else '%.2f' % k)
+                        for name, k in curve['exponents'].items()))
+    if args.json:
+        with open(args.json,'w') as file:
+            json.dump(report,file,indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            for line in compare(report,json.load(file)):
+                print(line)
+
+
+def _make_view():
+    """
+    Returns a GView to draw in, or None if kivy cannot make one
+    """
+    try:
+        from game2d import GView
+        return GView()
+    except Exception:
+        return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Game settings for Alien Invaders
+
+This module contains GameConfig, the settings of one game of Alien
+Invaders: the size of the screen, the ship, the aliens and the bolts, the
+size of the formation and the speed of the game. Every setting defaults to
+the constant of the same name in consts.py, so GameConfig() is the normal
+game.
+
+A GameConfig cannot be changed once it is made. Invaders and Wave take one
+when they are created and hand it to the models they create, so a single
+process can play waves with different settings side by side, for example
+
+    small = GameConfig(alien_rows=2, aliens_in_row=4)
+    huge = GameConfig(alien_rows=40, aliens_in_row=80).fitted()
+    waves = [Wave(seed, small) for seed in range(8)] + [Wave(0, huge)]
+
+The values that follow from the settings (the distance between two aliens,
+the size of an alien step, where the formation starts, ...) are computed
+once, when the config is made, and stored with it.
+
+# Avery Avila - aha68
+# Neil Gidwani - nsg67
+# 12/7/21
+"""
+import dataclasses
+from consts import *
+
+
+@dataclasses.dataclass(frozen=True)
+class GameConfig(object):
+    """
+    A class to represent the settings of one game of Alien Invaders.
+
+    The settings are the attributes listed below, in lower case, with the
+    same meaning as the constants of the same name in consts.py. They are
+    given as keyword arguments to the initializer, and cannot be changed
+    afterwards (use the method replace to make a changed copy). Two configs
+    with the same settings are equal.
+
+    The attributes after the settings are computed from them, and are
+    not arguments of the initializer.
+    """
+    # SETTINGS (see consts.py)
+    game_width: int = GAME_WIDTH
+    game_height: int = GAME_HEIGHT
+    frame_time: float = FRAME_TIME
+    ship_width: int = SHIP_WIDTH
+    ship_height: int = SHIP_HEIGHT
+    ship_bottom: int = SHIP_BOTTOM
+    ship_movement: float = SHIP_MOVEMENT
+    ship_image: str = SHIP_IMAGE
+    ship_lives: int = SHIP_LIVES
+    death_speed: float = DEATH_SPEED
+    defense_line: int = DEFENSE_LINE
+    alien_width: int = ALIEN_WIDTH
+    alien_height: int = ALIEN_HEIGHT
+    alien_h_sep: int = ALIEN_H_SEP
+    alien_v_sep: int = ALIEN_V_SEP
+    alien_ceiling: int = ALIEN_CEILING
+    alien_rows: int = ALIEN_ROWS
+    aliens_in_row: int = ALIENS_IN_ROW
+    alien_images: tuple = ALIEN_IMAGES
+    alien_speed: float = ALIEN_SPEED
+    bolt_width: int = BOLT_WIDTH
+    bolt_height: int = BOLT_HEIGHT
+    bolt_speed: float = BOLT_SPEED
+    bolt_rate: int = BOLT_RATE
+    heart_width: int = HEART_WIDTH
+    heart_height: int = HEART_HEIGHT
+    heart_speed: float = HEART_SPEED
+    heart_time: float = HEART_TIME
+
+    # DERIVED VALUES
+    # Attribute alien_h_walk: the horizontal pixels of an alien step
+    # Attribute alien_v_walk: the vertical pixels of an alien step down
+    # Attribute alien_h_step: the distance between the centers of two columns
+    # Attribute alien_v_step: the distance between the centers of two rows
+    # Attribute alien_x: the x coordinate of the first bottom left alien
+    # Attribute alien_y: the y coordinate of the first bottom left alien
+    # Attribute alien_sources: the image file of each row, bottom row first
+    # Attribute alien_reach_x: how close (in x) a bolt must be to hit an alien
+    # Attribute alien_reach_y: how close (in y) a bolt must be to hit an alien
+    # Attribute alien_muzzle: how far below an alien its bolts start
+    # Attribute ship_muzzle: how far above the ship its bolts start
+    # Attribute ship_min_x: the leftmost x coordinate of the ship
+    # Attribute ship_max_x: the rightmost x coordinate of the ship
+    alien_h_walk: int = dataclasses.field(init=False,repr=False,compare=False)
+    alien_v_walk: int = dataclasses.field(init=False,repr=False,compare=False)
+    alien_h_step: int = dataclasses.field(init=False,repr=False,compare=False)
+    alien_v_step: int = dataclasses.field(init=False,repr=False,compare=False)
+    alien_x: int = dataclasses.field(init=False,repr=False,compare=False)
+    alien_y: int = dataclasses.field(init=False,repr=False,compare=False)
+    alien_sources: tuple = dataclasses.field(init=False,repr=False,compare=False)
+    alien_reach_x: float = dataclasses.field(init=False,repr=False,compare=False)
+    alien_reach_y: float = dataclasses.field(init=False,repr=False,compare=False)
+    alien_muzzle: int = dataclasses.field(init=False,repr=False,compare=False)
+    ship_muzzle: int = dataclasses.field(init=False,repr=False,compare=False)
+    ship_min_x: int = dataclasses.field(init=False,repr=False,compare=False)
+    ship_max_x: int = dataclasses.field(init=False,repr=False,compare=False)
+
+    def __post_init__(self):
+        """
+        Checks the settings and computes the derived values
+        """
+        assert self.game_width > 0 and self.game_height > 0, 'the screen is empty'
+        assert self.frame_time > 0, 'frame_time %s is not positive' % repr(self.frame_time)
+        assert type(self.alien_rows) == int and self.alien_rows >= 1, \
+            'alien_rows %s is not an int >= 1' % repr(self.alien_rows)
+        assert type(self.aliens_in_row) == int and self.aliens_in_row >= 1, \
+            'aliens_in_row %s is not an int >= 1' % repr(self.aliens_in_row)
+        assert self.alien_speed > 0, 'alien_speed %s is not positive' % repr(self.alien_speed)
+        assert type(self.bolt_rate) == int and self.bolt_rate >= 1, \
+            'bolt_rate %s is not an int >= 1' % repr(self.bolt_rate)
+        assert type(self.ship_lives) == int and self.ship_lives >= 0, \
+            'ship_lives %s is not an int >= 0' % repr(self.ship_lives)
+        assert len(self.alien_images) > 0, 'there are no alien images'
+
+        # A JSON file gives back a list
+        images = tuple(self.alien_images)
+        h_step = self.alien_h_sep + self.alien_width
+        v_step = self.alien_v_sep + self.alien_height
+        top_h = self.game_height - (self.alien_ceiling + self.alien_height//2)
+        derived = {
+            'alien_images': images,
+            'alien_h_walk': self.alien_width // 4,
+            'alien_v_walk': self.alien_height // 2,
+            'alien_h_step': h_step,
+            'alien_v_step': v_step,
+            'alien_x': self.alien_h_sep + self.alien_width//2,
+            'alien_y': top_h - (v_step * (self.alien_rows-1)),
+            # Each image is used for two rows, then the next one
+            'alien_sources': tuple(images[(row//2) % len(images)]
+                                   for row in range(self.alien_rows)),
+            'alien_reach_x': self.alien_width/2.0 + self.bolt_width//2,
+            'alien_reach_y': self.alien_height/2.0 + self.bolt_height//2,
+            'alien_muzzle': self.alien_height//2 + self.bolt_height//2,
+            'ship_muzzle': self.ship_height//2 + self.bolt_height//2,
+            'ship_min_x': self.ship_width//2,
+            'ship_max_x': self.game_width - self.ship_width//2,
+        }
+        # The config is frozen, so the usual assignment is not allowed
+        for name in derived:
+            object.__setattr__(self,name,derived[name])
+
+        assert 2*h_step >= self.alien_width + self.bolt_width, \
+            'the aliens are too close together'
+        assert 2*v_step >= self.alien_height + self.bolt_height, \
+            'the rows of aliens are too close together'
+
+    # PUBLIC METHODS
+    def replace(self,**changes):
+        """
+        Returns a copy of this config with some settings changed
+
+        Parameter changes: the new values of the settings
+        Precondition: changes are keyword arguments naming settings
+        """
+        return dataclasses.replace(self,**changes)
+
+    def changes(self):
+        """
+        Returns a dict of the settings that differ from the defaults
+
+        The result can be saved as JSON, and GameConfig(**result) makes a
+        config equal to this one.
+        """
+        default = _DEFAULT
+        result = {}
+        for field in dataclasses.fields(self):
+            if field.init:
+                value = getattr(self,field.name)
+                if value != getattr(default,field.name):
+                    result[field.name] = list(value) if type(value) == tuple else value
+        return result
+
+    def fitted(self,steps=0):
+        """
+        Returns a copy of this config with a screen large enough for the aliens
+
+        The screen is only ever made larger. It is made wide enough for the
+        formation plus steps alien steps to either side, and tall enough
+        for the formation to step down steps times before it reaches the
+        defense line. The normal formation fits the normal screen with
+        steps = 0, so that config is returned unchanged.
+
+        Parameter steps: the number of alien steps of room to leave
+        Precondition: steps is an int >= 0
+        """
+        width = max(self.game_width,
+                    self.aliens_in_row*self.alien_h_step + steps*self.alien_h_walk)
+        height = max(self.game_height,
+                     self.alien_rows*self.alien_v_step + self.alien_ceiling +
+                     self.defense_line + steps*self.alien_v_walk)
+        if width == self.game_width and height == self.game_height:
+            return self
+        return self.replace(game_width=width,game_height=height)
+
+    @classmethod
+    def from_argv(cls,argv):
+        """
+        Returns the config given by the command line arguments
+
+        The arguments are the number of rows of aliens, the number of
+        aliens in each row, and the seconds between alien steps, as in
+
+            python invaders 3 4 0.5
+
+        Any argument that is missing or not valid keeps its default. There
+        is no upper limit on the rows or the aliens in a row; the screen is
+        made larger (see fitted) if the formation does not fit.
+
+        Parameter argv: the command line arguments, without the script
+        Precondition: argv is a list of strings
+        """
+        changes = {}
+        try:
+            rows = int(argv[0])
+            if rows >= 1:
+                changes['alien_rows'] = rows
+        except:
+            pass # Use the default value
+
+        try:
+            perrow = int(argv[1])
+            if perrow >= 1:
+                changes['aliens_in_row'] = perrow
+        except:
+            pass # Use the default value
+
+        try:
+            speed = float(argv[2])
+            if speed > 0 and speed <= 3:
+                changes['alien_speed'] = speed
+        except:
+            pass # Use the default value
+        return cls(**changes).fitted()
+
+
+# The normal game (used by GameConfig.changes)
+_DEFAULT = GameConfig()
@@ -6,13 +6,15 @@ to be used in the model, the view, and the controller. As these are spread
 across multiple modules, we separate the constants into their own module. This
 allows all modules to access them.
 
+These constants are the defaults. A game reads its settings from a GameConfig
+(see config.py), which starts from these values, so that one process can play
+games with different settings. The command line arguments are read by
+GameConfig.from_argv, not by this module.
+
 # Avery Avila - aha68
 # Neil Gidwani - ndg67
 # 12/7/21
 """
-import introcs
-import sys
-
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
 
 #: the width of the game display
@@ -21,6 +23,10 @@ GAME_WIDTH  = 800
 GAME_HEIGHT = 700
 
 
+# the length of the animation frame that speeds per update are given for
+FRAME_TIME  = 1/60
+
+
 ### SHIP CONSTANTS ###
 
 # the width of the ship
@@ -29,7 +35,7 @@ SHIP_WIDTH    = 44
 SHIP_HEIGHT   = 44
 # the distance of the (bottom of the) ship from the bottom of the screen
 SHIP_BOTTOM   = 32
-# The number of pixels to move the ship per update
+# The number of pixels to move the ship per FRAME_TIME
 SHIP_MOVEMENT = 5
 # The image file to use for the ship
 SHIP_IMAGE = 'ship-strip.png'
@@ -58,7 +64,7 @@ ALIEN_H_WALK  = ALIEN_WIDTH // 4
 ALIEN_V_WALK  = ALIEN_HEIGHT // 2
 # The distance of the top alien from the top of the window
 ALIEN_CEILING = 100
-# the number of rows of aliens, in range 1..10
+# the number of rows of aliens
 ALIEN_ROWS     = 5
 # the number of aliens per row
 ALIENS_IN_ROW  = 12
@@ -74,7 +80,7 @@ ALIEN_SPEED = 1.0
 BOLT_WIDTH  = 4
 # the height of a laser bolt
 BOLT_HEIGHT = 16
-# the number of pixels to move the bolt per update
+# the number of pixels to move the bolt per FRAME_TIME
 BOLT_SPEED  = 10
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
@@ -96,38 +102,6 @@ STATE_CONTINUE = 4
 STATE_COMPLETE = 5
 
 
-### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW
-"""
-sys.argv is a list of the command line arguments when you run Python. These
-arguments are everything after the word python. So if you start the game typing
-
-    python invaders 3 4 0.5
-
-Python puts ['breakout.py', '3', '4', '0.5'] into sys.argv. Below, we take
-advantage of this fact to change the constants ALIEN_ROWS, ALIENS_IN_ROW, and
-ALIEN_SPEED.
-"""
-try:
-    rows = int(sys.argv[1])
-    if rows >= 1 and rows <= 10:
-        ALIEN_ROWS = rows
-except:
-    pass # Use original value
-
-try:
-    perrow = int(sys.argv[2])
-    if perrow >= 1 and perrow <= 15:
-        ALIENS_IN_ROW = perrow
-except:
-    pass # Use original value
-
-try:
-    speed = float(sys.argv[3])
-    if speed > 0 and speed <= 3:
-        ALIEN_SPEED = speed
-except:
-    pass # Use original value
-
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
 ### Heart Constants ###
 
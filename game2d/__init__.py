@@ -4,13 +4,54 @@ A module to support simple 2D game development.
 This module is a simple wrapper around Kivy interfaces to make 2D game development
 simpler for students in CS 1110.
 
+The classes of this package are loaded the first time they are used, so importing the
+package does not import Kivy.  Kivy is only loaded once a class that needs it (such as
+a drawable, a sound or the application itself) is accessed.  That way, code that only
+uses the game state, like a headless simulation, starts without the cost of Kivy.
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
-from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
-from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+import importlib
+
+# The module of every class and function in this package
+_EXPORTS = {
+    'GObject': 'gobject', 'GScene': 'gobject',
+    'GRectangle': 'grectangle', 'GEllipse': 'grectangle', 'GImage': 'grectangle',
+    'GLabel': 'grectangle',
+    'GSprite': 'gsprite',
+    'SpriteBatch': 'gbatch',
+    'GPath': 'gpath', 'GTriangle': 'gpath', 'GPolygon': 'gpath',
+    'GInput': 'gview', 'GView': 'gview',
+    'BitmapFont': 'gfont', 'GText': 'gfont',
+    'FrameStats': 'gperf',
+    'Preloader': 'gload',
+    'Tracer': 'gtrace', 'TRACER': 'gtrace', 'traced': 'gtrace', 'span': 'gtrace',
+    'Sound': 'sound', 'SoundLibrary': 'sound', 'SoundPool': 'sound',
+    'Mixer': 'gmixer', 'NullSink': 'gmixer', 'FileSink': 'gmixer', 'DeviceSink': 'gmixer',
+    'GameApp': 'app',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Returns the class or function ``name``, loading its module the first time.
+
+    :param name: The name to look up
+    :type name:  ``str``
+    """
+    if not name in _EXPORTS:
+        raise AttributeError('module %s has no attribute %s' % (repr(__name__),repr(name)))
+    module = importlib.import_module('.'+_EXPORTS[name],__name__)
+    value = getattr(module,name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """
+    Returns the names in this package, including those not loaded yet.
+    """
+    return sorted(set(globals()) | set(__all__))
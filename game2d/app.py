@@ -20,6 +20,15 @@ import numpy as np
 
 import os.path
 
+from .gtrace import TRACER, traced
+
+# The file extensions of images that may be packed into the atlas
+ATLAS_EXTENSIONS = ('.png','.jpg','.jpeg','.gif','.bmp')
+# The subfolder of **Images** that caches the packed atlas
+ATLAS_FOLDER = '.atlas'
+# The base name of the atlas files in that folder
+ATLAS_NAME = 'images'
+
 class GameApp(kivy.app.App):
     """
     A controller class for a simple game application.
@@ -41,6 +50,10 @@ class GameApp(kivy.app.App):
     """
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
+    # Class attribute mapping image file names to their region of the atlas
+    ATLAS = {}
+    # Class attribute mapping sound file names to preloaded sounds not used yet
+    SOUND_CACHE = {}
     
     
     # MUTABLE ATTRIBUTES
@@ -67,6 +80,69 @@ class GameApp(kivy.app.App):
     
     
     # IMMUTABLE PROPERTIES
+    @property
+    def tick_rate(self):
+        """
+        The number of simulation steps per second, or None for a variable timestep
+        
+        When this value is None (the default), :meth:`update` is called once per animation
+        frame with the time since the last frame.  Otherwise, the game uses a fixed
+        timestep: :meth:`update` is always called with ``dt`` equal to ``1/tick_rate``, as
+        many times per frame as needed to keep up with the clock (but no more than
+        ``max_steps``), and :meth:`draw` is called with an interpolation factor ``alpha``.
+        See :meth:`draw` for more information.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._tick_rate
+    
+    @property
+    def max_steps(self):
+        """
+        The most simulation steps to take in one animation frame.
+        
+        This only matters if :attr:`tick_rate` is not None.  If the game falls further
+        behind the clock than this many steps (for example, after a long hitch), the
+        extra time is dropped rather than simulated, so the game slows down instead of
+        spending ever more time catching up.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._max_steps
+    
+    @property
+    def stats(self):
+        """
+        The timing of recent animation frames, or None if it is not recorded.
+
+        If the game was created with ``stats=True``, every frame is timed, phase by
+        phase, and the number of canvas instructions drawn is counted.  See :class:`FrameStats`.
+        Pressing the ``overlay_key`` (F3 by default) then shows or hides a summary of
+        these statistics in the top left corner of the window.
+
+        **Invariant**: Must be a :class:`FrameStats` or None.
+        """
+        return self._stats
+    
+    @property
+    def progress(self):
+        """
+        The fraction of the assets loaded before the game starts.
+        
+        If the game was created with ``preload=True``, every file in the **Images**,
+        **Fonts** and **Sounds** folders is loaded before :meth:`start` is called, so that
+        the game never waits on a file the first time it uses it.  While they load, this
+        value goes from 0 to 1, and :meth:`loading` is called every frame instead of
+        :meth:`update` and :meth:`draw`.  See :class:`Preloader`.
+        
+        It is 1 once the game has started.
+        
+        **Invariant**: Must be a float in 0..1.
+        """
+        if self._preloader is None:
+            return 1.0
+        return self._preloader.progress
+    
     @property
     def width(self):
         """
@@ -165,13 +241,16 @@ class GameApp(kivy.app.App):
         return os.path.exists(os.path.join(cls.sounds,name))
     
     @classmethod
+    @traced('GameApp.load_texture','io')
     def load_texture(cls,name):
         """
         Returns: The texture for the given file name, or None if it cannot be loaded
         
         The ``name`` must refer to the file in the **Images** folder.  If the texture
-        has already been loaded, it will return the cached texture.  Otherwise, it will
-        load the texture and cache it before returning it.
+        has already been loaded, it will return the cached texture.  If the image was
+        packed into the atlas (see :meth:`load_atlas`), it will return its region of the
+        atlas texture.  Otherwise, it will load the texture and cache it before returning
+        it.
         
         This method will crash if name is not a valid file.
         
@@ -182,6 +261,11 @@ class GameApp(kivy.app.App):
         if name in cls.TEXTURE_CACHE:
             return cls.TEXTURE_CACHE[name]
         
+        if name in cls.ATLAS:
+            texture = cls.ATLAS[name]
+            cls.TEXTURE_CACHE[name] = texture
+            return texture
+        
         try:
             from kivy.core.image import Image
             texture = Image(name).texture
@@ -191,6 +275,91 @@ class GameApp(kivy.app.App):
         
         return texture
     
+    @classmethod
+    @traced('GameApp.load_atlas','io')
+    def load_atlas(cls,size=512):
+        """
+        Returns: True if the images were packed into an atlas; False otherwise
+        
+        This method packs every image in the **Images** folder into one texture (or as
+        few textures of the given size as possible), so that :meth:`load_texture` returns
+        regions of a shared texture instead of a texture per file.  Drawing images that
+        share a texture needs fewer texture switches, and lets :class:`SpriteBatch` draw
+        them in a single mesh.
+        
+        The packed atlas is cached in the subfolder **Images/.atlas**.  It is only packed
+        again if an image was added, removed or changed since the cache was written.
+        Packing requires PIL (Pillow).  If the atlas cannot be packed or loaded, this
+        method returns False and every image keeps its own texture.
+        
+        This method is called for you before :meth:`start`, unless the game was created
+        with the keyword ``atlas=False``.  If it was created with ``preload=True``, the
+        atlas is packed before :meth:`start`, but its pages are loaded by the preloader.
+        
+        :param size: The width and height of each atlas page in pixels
+        :type size:  ``int`` > 0
+        """
+        from kivy.atlas import Atlas
+        
+        outname = cls._pack_atlas(size)
+        if outname is None:
+            return False
+        try:
+            atlas = Atlas(outname)
+        except:
+            print('Failed to load the atlas for',repr(cls.images))
+            return False
+        
+        for name in os.listdir(cls.images):
+            key, ext = os.path.splitext(name)
+            if ext.lower() in ATLAS_EXTENSIONS and key in atlas.textures:
+                cls.ATLAS[name] = atlas.textures[key]
+        return True
+    
+    @classmethod
+    def _pack_atlas(cls,size=512):
+        """
+        Returns the .atlas file of the **Images** folder, or None if there is none
+        
+        The images are packed again if the cached atlas is out of date.  This method
+        returns None if there are no images, or if they cannot be packed.
+        
+        :param size: The width and height of each atlas page in pixels
+        :type size:  ``int`` > 0
+        """
+        import json
+        from kivy.atlas import Atlas
+        
+        folder  = os.path.join(cls.images,ATLAS_FOLDER)
+        outname = os.path.join(folder,ATLAS_NAME)
+        files = sorted(f for f in os.listdir(cls.images)
+                       if os.path.splitext(f)[1].lower() in ATLAS_EXTENSIONS)
+        if not files:
+            return None
+        
+        # Check whether the cached atlas is still valid
+        stale = True
+        try:
+            with open(outname+'.atlas') as file:
+                pages = json.load(file)
+            packed = set()
+            for page in pages.values():
+                packed.update(page.keys())
+            newest = max(os.path.getmtime(os.path.join(cls.images,f)) for f in files)
+            stale = (packed != set(os.path.splitext(f)[0] for f in files) or
+                     os.path.getmtime(outname+'.atlas') < newest)
+        except:
+            pass
+        
+        try:
+            if stale:
+                os.makedirs(folder,exist_ok=True)
+                Atlas.create(outname,[os.path.join(cls.images,f) for f in files],size)
+        except:
+            print('Failed to pack the atlas for',repr(cls.images))
+            return None
+        return outname+'.atlas'
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -223,9 +392,22 @@ class GameApp(kivy.app.App):
             
             GameApp(width=400,height=400)
         
-        The game window will not show until you start the game. To start the game, use 
+        The game window will not show until you start the game. To start the game, use
         the method ``run()``.
-        
+
+        The keyword ``atlas`` (True by default) controls whether the **Images** folder
+        is packed into a texture atlas at startup.  See :meth:`load_atlas`.  The keyword
+        ``retained`` (False by default) puts the view in retained mode, so that objects
+        drawn every frame stay attached to the canvas.  See :class:`GView`.  The keywords
+        ``tick_rate`` and ``max_steps`` turn on a fixed simulation timestep.  See the
+        attributes of the same name.  The keyword ``stats`` (False by default) times
+        every frame, and ``overlay_key`` is the key that shows those times on screen.
+        See the attribute ``stats``.  The keyword ``trace`` is the name of a file to
+        record a Chrome trace of the game to, for at most ``trace_limit`` seconds if
+        that is given.  See :class:`Tracer`.  The keyword ``preload`` (False by default)
+        loads every asset before the game starts, rendering each font at the sizes in
+        ``preload_sizes``.  See the attribute ``progress``.
+
         **You will never call the constructor or run yourself**.  That is handled for 
         you in the provided code.
         
@@ -235,15 +417,55 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        a = keywords.pop('atlas', True)
+        r = keywords.pop('retained', False)
+        t = keywords.pop('tick_rate', None)
+        m = keywords.pop('max_steps', 5)
+        s = keywords.pop('stats', False)
+        k = keywords.pop('overlay_key', 'f3')
+        c = keywords.pop('trace', None)
+        l = keywords.pop('trace_limit', None)
+        p = keywords.pop('preload', False)
+        z = keywords.pop('preload_sizes', (15,))
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
+        assert type(a) == bool, 'atlas %s is not a bool' % repr(a)
+        assert type(r) == bool, 'retained %s is not a bool' % repr(r)
+        assert t is None or type(t) in [int,float], 'tick_rate %s is not a number' % repr(t)
+        assert t is None or t > 0, 'tick_rate %s is not positive' % repr(t)
+        assert type(m) == int and m > 0, 'max_steps %s is not a positive int' % repr(m)
+        assert type(s) == bool, 'stats %s is not a bool' % repr(s)
+        assert k is None or type(k) == str, 'overlay_key %s is not a string' % repr(k)
+        assert c is None or type(c) == str, 'trace %s is not a string' % repr(c)
+        assert l is None or (type(l) in [int,float] and l > 0), \
+            'trace_limit %s is not a positive number' % repr(l)
+        assert type(p) == bool, 'preload %s is not a bool' % repr(p)
+        assert type(z) == tuple, 'preload_sizes %s is not a tuple' % repr(z)
 
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self._atlas = a
+        self._retained = r
+        self._tick_rate = t
+        self._max_steps = m
+        self._lag = 0.0
+        self._stats = None
+        if s:
+            from .gperf import FrameStats
+            self._stats = FrameStats(budget=1000.0/f)
+        self._overlay_key = k
+        self._overlay = None
+        self._overlay_held = False
+        self._trace = c
+        self._trace_limit = l
+        self._preload = p
+        self._preload_sizes = z
+        self._preloader = None
+        self._bar = None
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
@@ -262,7 +484,7 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         from .gview import GInput, GView
-        self._view = GView()
+        self._view = GView(self._retained)
         self._view.size_hint = (1,1)
         self._input = GInput()
         self._input._register(self._view)
@@ -287,6 +509,9 @@ class GameApp(kivy.app.App):
         """
         import sys
         kivy.app.App.stop(self)
+        if self._preloader is not None:
+            self._preloader.cancel()
+        TRACER.stop()
         sys.exit(0)
     
     def start(self):
@@ -324,9 +549,38 @@ class GameApp(kivy.app.App):
         
         Every single object that you draw will need to be an attribute of the ``GameApp``
         class.  This method should largely be a sequence of calls to ``self.view.draw()``.
+        
+        If :attr:`tick_rate` is not None, this method is called as ``draw(alpha)``, where
+        ``alpha`` (a float in 0..1) is how far the clock is between the last simulation
+        step and the next one.  A game can use it to draw moving objects between their
+        previous and current positions, so that motion stays smooth when the game is
+        drawn more often than it is simulated.  In that case, override this method with
+        an extra parameter ``alpha``.
         """
         pass
     
+    def loading(self,progress):
+        """
+        Draws the progress of loading the assets, before the game starts.
+        
+        This method is called every animation frame while the assets are loaded (see
+        :attr:`progress`), in place of :meth:`update` and :meth:`draw`.  The game has not
+        started yet, so it must not use any game attributes.  By default, it draws a bar
+        across the middle of the window.  Override it to show something else, but keep
+        it simple: any file it uses is loaded in the middle of the loading.
+        
+        :param progress: The fraction of the assets loaded so far
+        :type progress:  ``float`` in 0..1
+        """
+        from .grectangle import GRectangle
+        if self._bar is None:
+            self._bar = GRectangle(fillcolor='white',linecolor='white',height=8)
+        width = max(self.width*0.6*progress,1)
+        self._bar.width = width
+        self._bar.x = self.width*0.2+width/2.0
+        self._bar.y = self.height/2.0
+        self._bar.draw(self.view)
+    
     
     # HIDDEN METHODS
     def _bootstrap(self,dt):
@@ -340,21 +594,113 @@ class GameApp(kivy.app.App):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
         else:
             Clock.schedule_interval(self._refresh,0)
-        self.start()
+        if self._trace is not None:
+            TRACER.start(self._trace,self._trace_limit)
+        if self._preload:
+            from .gload import Preloader
+            atlas = self._pack_atlas() if self._atlas else None
+            self._preloader = Preloader(self.images,self.fonts,self.sounds,
+                                        self._preload_sizes,atlas=atlas)
+            self._preloader.start()
+        else:
+            if self._atlas:
+                self.load_atlas()
+            self.start()
     
+    @traced('GameApp._refresh','frame')
     def _refresh(self,dt):
         """
         Processes a single animation frame.
         
         This method a callback-proxy for the methods `update` and `draw`.  It handles
-        important issues behind the scenes, particularly with clearing the window.
+        important issues behind the scenes, particularly with clearing the window,
+        stepping a fixed timestep (see :attr:`tick_rate`) and timing the frame (see
+        :attr:`stats`).
         
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
+        if self._preloader is not None:
+            self._warm_up()
+            return
+        
+        stats = self._stats
+        if stats is not None:
+            stats.begin()
+        self.view.clear()
+        if stats is not None:
+            stats.mark()
+        
+        if self._tick_rate is None:
+            self.update(dt)
+        else:
+            step = 1.0/self._tick_rate
+            self._lag += dt
+            steps = 0
+            while self._lag >= step and steps < self._max_steps:
+                self.update(step)
+                self._lag -= step
+                steps += 1
+            if self._lag >= step:
+                # Too far behind; drop the time we could not simulate
+                self._lag = 0.0
+        if stats is not None:
+            stats.mark()
+        
+        if self._tick_rate is None:
+            self.draw()
+        else:
+            self.draw(self._lag/step)
+        if stats is not None:
+            self._draw_overlay()
+            stats.mark()
+        
+        self.view._commit()
+        if stats is not None:
+            stats.mark()
+            stats.end(self.view.count)
+    
+    def _warm_up(self):
+        """
+        Loads the next assets and draws the progress, starting the game when done.
+        
+        The time spent catching up on the clock is dropped, so the first update of the
+        game is not a burst of steps.
+        """
         self.view.clear()
-        self.update(dt)
-        self.draw()
+        finished = self._preloader.step()
+        self.loading(self._preloader.progress)
+        self.view._commit()
+        if finished:
+            self._preloader = None
+            self._bar = None
+            self._lag = 0.0
+            self.start()
+    
+    def _draw_overlay(self):
+        """
+        Shows or hides the frame statistics, and draws them if they are shown.
+        
+        The overlay is toggled when the ``overlay_key`` is pressed.  It is bitmap text, so
+        changing it is cheap, but it is only updated every few frames so it can be read.
+        """
+        if self._overlay_key is None:
+            return
+        held = self.input.is_key_down(self._overlay_key)
+        if held and not self._overlay_held:
+            if self._overlay is None:
+                from .gfont import GText
+                self._overlay = GText(text=self._stats.summary(),font_size=12,
+                                      linecolor='green',halign='left',valign='top')
+            else:
+                self._overlay = None
+        self._overlay_held = held
+        if self._overlay is not None:
+            if self._stats.frames % 15 == 0:
+                self._overlay.text = self._stats.summary()
+            self._overlay.left = 0
+            self._overlay.top = self.height
+            self._overlay.draw(self.view)
     
     def _setpaths(self):
         """
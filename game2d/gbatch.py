@@ -0,0 +1,174 @@
+"""
+Batched drawing of many images for 2D game support.
+
+This module provides a drawable for scenes with many small images, like a grid of
+aliens.  Each :class:`GImage` is its own group of Kivy instructions (transforms, color
+and rectangle), so drawing hundreds of them means hundreds of instructions per frame.
+A :class:`SpriteBatch` instead packs every image that shares a texture into a single
+Kivy ``Mesh``, so the whole batch is drawn with one instruction per texture.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import get_color
+from .app import GameApp
+import numpy as np
+
+# The two triangles of each quad, as offsets into its four corners
+QUAD_INDICES = (0,1,2,2,3,0)
+
+
+def quad_indices(count):
+    """
+    Returns the mesh indices of the given number of quads.
+
+    Kivy uses the result in place if it is an array of 16 bit indices, so that is what
+    this function returns, unless there are too many vertices for 16 bits.
+
+    :param count: The number of quads
+    :type count:  ``int`` >= 0
+    """
+    indices = (4*np.arange(count)[:,np.newaxis]+QUAD_INDICES).ravel()
+    if 4*count <= 1 << 16:
+        return indices.astype(np.uint16)
+    return indices.tolist()
+
+
+# #mark -
+class SpriteBatch(object):
+    """
+    A class representing a fixed collection of images drawn together.
+
+    The batch is created with one texture per image, given either as the name of a
+    file in the **Images** folder or as a Kivy texture (such as a frame of a
+    :class:`GSprite`).  Images whose textures are regions of the same texture share
+    one ``Mesh``.
+
+    The images do not have attributes of their own.  Instead, you set the position and
+    size of every image at once with :meth:`update`, using sequences or NumPy arrays
+    with one entry per image (in the order of the textures).  Images are positioned by
+    their center, like any :class:`GObject`, and cannot be rotated.  An image that is
+    not visible is collapsed to an empty quad rather than removed, so hiding images
+    never rebuilds the meshes.
+
+    The vertex data of each mesh is a NumPy array of 32 bit floats that the mesh uses as
+    its buffer, so it is rewritten in place, without copies.  It is only rewritten when
+    :meth:`update` is given values that differ from the last call.  So a batch that has
+    not moved costs nothing to draw again.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of images in this batch.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._coords)
+
+    # BUILT-IN METHODS
+    def __init__(self,textures):
+        """
+        Creates a new batch of images.
+
+        The images are all hidden until the first call to :meth:`update`.
+
+        :param textures: The texture of each image
+        :type textures:  ``list`` of ``str`` (file names) or Kivy textures
+        """
+        self._coords = np.zeros((len(textures),4,2))
+        self._state  = None
+        self._cache  = InstructionGroup()
+        self._cache.add(get_color((1,1,1,1)))
+
+        # Group the images by the texture that actually gets bound
+        groups = {}
+        for pos in range(len(textures)):
+            texture = textures[pos]
+            if type(texture) == str:
+                texture = GameApp.load_texture(texture)
+            assert not texture is None, 'image %s has no texture' % repr(textures[pos])
+            owner = texture
+            while not getattr(owner,'owner',None) is None:
+                owner = owner.owner
+            if not owner in groups:
+                groups[owner] = []
+            groups[owner].append((pos,texture.tex_coords))
+
+        self._groups = []
+        for owner in groups:
+            members = groups[owner]
+            items = np.array([m[0] for m in members],dtype=int)
+            # The mesh keeps the flat buffer; the quads are a view of the same memory
+            buffer = np.zeros(16*len(members),dtype=np.float32)
+            vertices = buffer.reshape(-1,4,4)
+            vertices[:,:,2:] = np.array([m[1] for m in members]).reshape(-1,4,2)
+            mesh = Mesh(vertices=buffer, indices=quad_indices(len(members)),
+                        mode='triangles', texture=owner)
+            self._cache.add(mesh)
+            self._groups.append((items,vertices,buffer,mesh))
+
+    # PUBLIC METHODS
+    def update(self,x,y,width,height,visible=None):
+        """
+        Sets the position and size of every image in this batch.
+
+        Each argument may be a single number, to use for every image, or a sequence
+        with one number per image.  If nothing has changed since the last call, this
+        method does nothing.
+
+        :param x: The horizontal coordinate of each image center
+        :type x:  ``int``, ``float`` or a sequence of them
+
+        :param y: The vertical coordinate of each image center
+        :type y:  ``int``, ``float`` or a sequence of them
+
+        :param width: The width of each image
+        :type width:  ``int``, ``float`` or a sequence of them
+
+        :param height: The height of each image
+        :type height:  ``int``, ``float`` or a sequence of them
+
+        :param visible: Whether to show each image (all are shown if None)
+        :type visible:  ``bool`` or a sequence of them
+        """
+        n = self.count
+        state = np.empty((5,n))
+        state[0] = x
+        state[1] = y
+        state[2] = width
+        state[3] = height
+        state[4] = True if visible is None else visible
+        if self._state is not None and np.array_equal(state,self._state):
+            return
+        self._state = state
+
+        # Hidden images are collapsed to their center
+        hw = np.where(state[4] != 0,state[2]/2.0,0)
+        hh = np.where(state[4] != 0,state[3]/2.0,0)
+        left, right = state[0]-hw, state[0]+hw
+        bottom, top = state[1]-hh, state[1]+hh
+        self._coords[:,0,0] = left
+        self._coords[:,0,1] = bottom
+        self._coords[:,1,0] = right
+        self._coords[:,1,1] = bottom
+        self._coords[:,2,0] = right
+        self._coords[:,2,1] = top
+        self._coords[:,3,0] = left
+        self._coords[:,3,1] = top
+
+        for items, vertices, buffer, mesh in self._groups:
+            vertices[:,:,:2] = self._coords[items]
+            # Setting the same buffer only tells the mesh that it changed
+            mesh.vertices = buffer
+
+    def draw(self, view):
+        """
+        Draws this batch in the provided view.
+
+        Ideally, the view should be the one provided by :class:`GameApp`.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self._cache)
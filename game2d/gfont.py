@@ -0,0 +1,487 @@
+"""
+Bitmap text for 2D game support.
+
+A :class:`GLabel` renders its whole text to a texture each time the text changes.  That
+is fine for a message, but a score, a timer or a frame rate counter changes every frame.
+This module renders every character of a font once, into a single texture (the atlas) of
+a :class:`BitmapFont`.  A :class:`GText` then draws its text as one textured quad per
+character, all in one Kivy ``Mesh``, so changing the text only rewrites the vertices of
+that mesh.
+
+Characters are placed side by side by their width, without kerning.  This suits the
+pixel fonts of the **Fonts** folder (such as ``RetroGame.ttf`` and ``Arcade.ttf``) and
+text made of digits, but long sentences in other fonts look better in a :class:`GLabel`.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from kivy.graphics.texture import Texture
+from kivy.core.text import Label as CoreLabel
+from .gobject import GObject
+from .gbatch import quad_indices
+import numpy as np
+
+# The characters of a font by default (printable ASCII)
+ASCII = ''.join(chr(code) for code in range(32,127))
+
+# The widest atlas texture made by a font
+ATLAS_WIDTH = 1024
+
+# Fonts by (font_name, font_size, bold), so that texts share their atlas (see BitmapFont.get)
+FONT_CACHE = {}
+
+
+# #mark -
+class BitmapFont(object):
+    """
+    A class representing a font rendered once into a texture atlas.
+
+    Each character is rendered in white with a Kivy core label, and the results are
+    packed in rows into a single texture.  The font remembers the width of each
+    character and where it is in the atlas, which is all :meth:`layout` needs to turn a
+    string into quads.  Characters that are not in the font are drawn as '?'.
+
+    Rendering the characters needs a window, so fonts must be made in (or after) the
+    method ``start`` of the game.  Use :meth:`get` to share a font between texts.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def font_name(self):
+        """
+        The file name of the .ttf file of this font.
+
+        **Invariant**: Must be a string.
+        """
+        return self._fname
+
+    @property
+    def font_size(self):
+        """
+        The size of this font in points.
+
+        **Invariant**: Must be a positive number (int or float).
+        """
+        return self._fsize
+
+    @property
+    def bold(self):
+        """
+        Whether this font is bold (which only works for the default Kivy font).
+
+        **Invariant**: Must be a bool.
+        """
+        return self._bold
+
+    @property
+    def line_height(self):
+        """
+        The height of a line of text in pixels.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._line
+
+    @property
+    def characters(self):
+        """
+        The characters of this font, in the order they are in the atlas.
+
+        **Invariant**: Must be a string.
+        """
+        return ''.join(self._glyphs)
+
+    @property
+    def texture(self):
+        """
+        The atlas holding every character of this font.
+
+        **Invariant**: Must be a Kivy ``Texture``.
+        """
+        return self._texture
+
+    # BUILT-IN METHODS
+    def __init__(self,font_name='Roboto',font_size=15,bold=False,characters=ASCII):
+        """
+        Creates a new font, rendering every one of its characters.
+
+        :param font_name: The file name of a .ttf file in the **Fonts** folder
+        :type font_name:  ``str``
+
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float`` > 0
+
+        :param bold: Whether the font is bold
+        :type bold:  ``bool``
+
+        :param characters: The characters to render ('?' is always added)
+        :type characters:  ``str``
+        """
+        assert type(font_name) == str, 'font_name %s is not a string' % repr(font_name)
+        assert type(font_size) in [int,float] and font_size > 0, \
+            'font_size %s is not a positive number' % repr(font_size)
+        assert type(bold) == bool, 'bold %s is not a bool' % repr(bold)
+        assert type(characters) == str, 'characters %s is not a string' % repr(characters)
+        self._fname = font_name
+        self._fsize = font_size
+        self._bold  = bold
+
+        # Skip repeats and line breaks, but keep the order
+        chars = [c for c in dict.fromkeys(characters+'?') if c != '\n']
+        self._glyphs = {}
+        images = []
+        for char in chars:
+            label = CoreLabel(text=char,font_name=font_name,font_size=font_size,bold=bold,
+                              color=(1,1,1,1))
+            label.refresh()
+            width, height = label.size
+            if width > 1 and height > 1:
+                # The pixels start at the bottom row.  They are white on a clear
+                # background, so the red channel is how much of each pixel is covered.
+                pixels = np.frombuffer(label.texture.pixels,dtype=np.uint8)
+                pixels = pixels.reshape(height,width,4)[:,:,0]
+            else:
+                pixels = None
+            self._glyphs[char] = len(images)
+            images.append((width,height,pixels))
+        self._line = max(1,max(image[1] for image in images))
+        self._pack(images)
+
+    # PUBLIC METHODS
+    @classmethod
+    def get(cls,font_name='Roboto',font_size=15,bold=False):
+        """
+        Returns the shared font (of ASCII characters) with the given settings.
+
+        The font is made the first time it is asked for.
+
+        :param font_name: The file name of a .ttf file in the **Fonts** folder
+        :type font_name:  ``str``
+
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float`` > 0
+
+        :param bold: Whether the font is bold
+        :type bold:  ``bool``
+        """
+        key = (font_name,font_size,bold)
+        if not key in FONT_CACHE:
+            FONT_CACHE[key] = cls(font_name,font_size,bold)
+        return FONT_CACHE[key]
+
+    def measure(self,text):
+        """
+        Returns the (width, height) in pixels of the given text.
+
+        :param text: The text to measure (which may have several lines)
+        :type text:  ``str``
+        """
+        lines = text.split('\n')
+        width = max(self._advance[self._lookup(line)].sum() for line in lines)
+        return int(width), self._line*len(lines)
+
+    def layout(self,text,halign='left'):
+        """
+        Returns the quads of the given text, and its (width, height).
+
+        The quads are a NumPy array of shape ``(n,4,4)``, with one quad per character
+        that is not a space, and for each corner its (x, y, u, v).  The bottom left of
+        the text is at (0,0).  The corners are in the order of :class:`SpriteBatch`.
+
+        :param text: The text to lay out (which may have several lines)
+        :type text:  ``str``
+
+        :param halign: How to align lines of different widths
+        :type halign:  one of 'left', 'right', or 'center'
+        """
+        lines = text.split('\n')
+        glyphs = [self._lookup(line) for line in lines]
+        widths = [self._advance[line].sum() for line in glyphs]
+        width = max(widths)
+        height = self._line*len(lines)
+
+        quads = []
+        for row in range(len(lines)):
+            line = glyphs[row]
+            left = np.cumsum(self._advance[line])-self._advance[line]
+            if halign == 'right':
+                left += width-widths[row]
+            elif halign == 'center':
+                left += (width-widths[row])//2
+            # Blank characters (like spaces) have nothing to draw
+            shown = self._shown[line]
+            line = line[shown]
+            left = left[shown]
+            quad = np.empty((len(line),4,4))
+            quad[:,:,0] = left[:,np.newaxis]+self._corners[line,:,0]
+            quad[:,:,1] = height-(row+1)*self._line+self._corners[line,:,1]
+            quad[:,:,2:] = self._coords[line]
+            quads.append(quad)
+        return np.concatenate(quads), (int(width),int(height))
+
+    # HIDDEN METHODS
+    def _lookup(self,line):
+        """
+        Returns the atlas positions of the characters of a line, as a NumPy array.
+
+        :param line: The text of one line
+        :type line:  ``str``
+        """
+        missing = self._glyphs['?']
+        return np.array([self._glyphs.get(char,missing) for char in line],dtype=int)
+
+    def _pack(self,images):
+        """
+        Packs the rendered characters in rows into the atlas texture.
+
+        :param images: The (width, height, pixels) of each character
+        :type images:  ``list`` of ``tuple``
+        """
+        count = len(images)
+        self._advance = np.array([image[0] for image in images],dtype=float)
+        self._shown   = np.array([image[2] is not None and image[2].any() for image in images],
+                                 dtype=bool)
+        self._corners = np.zeros((count,4,2))
+        self._coords  = np.zeros((count,4,2))
+
+        # A pixel of space around every character, so they do not bleed when filtered
+        places = []
+        x, y = 1, 1
+        for width, height, pixels in images:
+            if x+width+1 > ATLAS_WIDTH:
+                x, y = 1, y+self._line+1
+            places.append((x,y))
+            x += width+1
+        size = (ATLAS_WIDTH if y > 1 else x, y+self._line+1)
+
+        atlas = np.zeros((size[1],size[0],4),dtype=np.uint8)
+        atlas[:,:,:3] = 255
+        for pos in range(count):
+            width, height, pixels = images[pos]
+            if not self._shown[pos]:
+                continue
+            x, y = places[pos]
+            atlas[y:y+height,x:x+width,3] = pixels
+            left, right = x/size[0], (x+width)/size[0]
+            bottom, top = y/size[1], (y+height)/size[1]
+            self._corners[pos] = ((0,0),(width,0),(width,height),(0,height))
+            self._coords[pos]  = ((left,bottom),(right,bottom),(right,top),(left,top))
+
+        self._texture = Texture.create(size=size,colorfmt='rgba')
+        self._texture.blit_buffer(atlas.tobytes(),colorfmt='rgba',bufferfmt='ubyte')
+
+
+# #mark -
+class GText(GObject):
+    """
+    A class representing text drawn from a :class:`BitmapFont`.
+
+    This object is like a :class:`GLabel` whose text is cheap to change: setting `text`
+    only rewrites the vertices of one mesh.  Use it for text that changes often, like a
+    score.  The `linecolor` is the color of the text, and `fillcolor` (if any) is the
+    color of the rectangle behind it.
+
+    The `width` and `height` of this object are those of its text, and cannot be set.
+    When the text changes size, the attributes `halign` and `valign` decide which edges
+    of the text stay where they are.  For example, a score with ``halign='left'`` grows
+    to the right.  They also align the lines of the text with each other.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """
+        The text drawn by this object.
+
+        The escape character '\\n' starts a new line.
+
+        **Invariant**: Must be a string.
+        """
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        if value == self._text:
+            return
+        self._text = value
+        if self._defined:
+            self._layout()
+
+    @property
+    def font(self):
+        """
+        The font of this text.
+
+        **Invariant**: Must be a :class:`BitmapFont`.
+        """
+        return self._font
+
+    @font.setter
+    def font(self,value):
+        assert isinstance(value,BitmapFont), 'value %s is not a BitmapFont' % repr(value)
+        self._font = value
+        if self._defined:
+            self._reset()
+
+    @property
+    def halign(self):
+        """
+        The horizontal alignment of this text.
+
+        This is the edge of the text ('left' or 'right') that stays put when the text
+        changes width, or 'center' to keep the center.  Lines of different widths are
+        aligned in the same way.
+
+        **Invariant**: Must be one of 'left', 'right', or 'center'.
+        """
+        return self._halign
+
+    @halign.setter
+    def halign(self,value):
+        assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
+        self._halign = value
+        if self._defined:
+            self._layout()
+
+    @property
+    def valign(self):
+        """
+        The vertical alignment of this text.
+
+        This is the edge of the text ('top' or 'bottom') that stays put when the text
+        gains or loses lines, or 'middle' to keep the center.
+
+        **Invariant**: Must be one of 'top', 'bottom', or 'middle'.
+        """
+        return self._valign
+
+    @valign.setter
+    def valign(self,value):
+        assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
+        self._valign = value
+
+    # REDEFINED PROPERTIES
+    @property
+    def width(self):
+        """
+        The width of the text in pixels.
+
+        **Invariant**: Must be an int >= 0.  It cannot be set.
+        """
+        return self._size[0]
+
+    @property
+    def height(self):
+        """
+        The height of the text in pixels.
+
+        **Invariant**: Must be an int >= 0.  It cannot be set.
+        """
+        return self._size[1]
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new bitmap text.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to show a
+        score in the top left corner, use the constructor call::
+
+            GText(text='0',font_name='Arcade.ttf',font_size=20,halign='left',valign='top',
+                  left=10,top=GAME_HEIGHT-10)
+
+        This class supports the same keywords as :class:`GObject` (except `width` and
+        `height`).  The font is either given as the keyword `font`, or by the keywords
+        `font_name`, `font_size` and `bold`, which give the shared font of
+        :meth:`BitmapFont.get`.
+        """
+        self._defined = False
+        self._text = keywords['text'] if 'text' in keywords else ''
+        self._size = (0,0)
+        self._capacity = 0
+        if 'font' in keywords:
+            self.font = keywords['font']
+        else:
+            self.font = BitmapFont.get(keywords['font_name'] if 'font_name' in keywords else 'Roboto',
+                                       keywords['font_size'] if 'font_size' in keywords else 15,
+                                       keywords['bold'] if 'bold' in keywords else False)
+        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
+        self.valign = keywords['valign'] if 'valign' in keywords else 'middle'
+
+        # The edges are only known once the text is laid out
+        self._size = self._font.measure(self._text)
+        GObject.__init__(self,**keywords)
+        if not self.linecolor:
+            self.linecolor = (0,0,0,1)
+        self._reset()
+        self._defined = True
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._fill = None
+        if self._fillcolor:
+            self._fill = Rectangle()
+            self._cache.add(self._fillcolor)
+            self._cache.add(self._fill)
+
+        # The font is white, so the color is that of the text
+        self._mesh = Mesh(mode='triangles',texture=self._font.texture)
+        self._capacity = 0
+        self._cache.add(self._linecolor)
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
+        self._layout()
+
+    def _layout(self):
+        """
+        Writes the quads of the text into the mesh, keeping the aligned edges in place.
+        """
+        quads, size = self._font.layout(self._text,self._halign)
+        dw = size[0]-self._size[0]
+        dh = size[1]-self._size[1]
+        if self._halign == 'left':
+            self._trans.x += dw/2.0
+        elif self._halign == 'right':
+            self._trans.x -= dw/2.0
+        if self._valign == 'bottom':
+            self._trans.y += dh/2.0
+        elif self._valign == 'top':
+            self._trans.y -= dh/2.0
+        self._size = size
+        self._mtrue = False
+
+        # The buffer only grows, so the indices rarely change
+        if self._capacity == 0 or len(quads) > self._capacity:
+            self._capacity = max(16,2*self._capacity,len(quads))
+            # The mesh keeps the flat buffer; the quads are a view of the same memory
+            self._buffer = np.zeros(16*self._capacity,dtype=np.float32)
+            self._vertices = self._buffer.reshape(-1,4,4)
+            self._mesh.indices = quad_indices(self._capacity)
+        # Center the text on the origin, on whole pixels
+        self._vertices[:len(quads)] = quads
+        self._vertices[:len(quads),:,0] -= size[0]//2
+        self._vertices[:len(quads),:,1] -= size[1]//2
+        self._vertices[len(quads):] = 0
+        # Setting the same buffer only tells the mesh that it changed
+        self._mesh.vertices = self._buffer
+
+        if self._fill is not None:
+            self._fill.pos  = (-(size[0]//2),-(size[1]//2))
+            self._fill.size = size
@@ -0,0 +1,289 @@
+"""
+Asset preloading for 2D game support.
+
+This module loads the files in the **Images**, **Fonts** and **Sounds** folders before
+the game starts, so that the first sprite, label or sound of the game does not stall a
+frame while it is read from disk.  A :class:`Preloader` reads and decodes the files on a
+pool of background threads.  Everything that must happen on the main thread (making
+textures, rendering fonts, opening sounds) is then done a few files at a time, within
+a small time budget per frame, so the window stays responsive while it loads.
+
+:class:`GameApp` runs a preloader before calling ``start`` if you pass ``preload=True``
+to the constructor.  See the attribute ``progress`` and the method ``loading`` of that
+class.
+"""
+import concurrent.futures
+import json
+import os
+import time
+
+from .gtrace import traced
+
+# The file extensions of each kind of asset
+IMAGE_EXTENSIONS = ('.png','.jpg','.jpeg','.gif','.bmp')
+FONT_EXTENSIONS  = ('.ttf','.otf')
+SOUND_EXTENSIONS = ('.wav','.ogg','.mp3')
+
+
+# #mark -
+class Preloader(object):
+    """
+    A class loading every asset of a game in the background.
+
+    A preloader is created with the folders to load, and starts loading when
+    :meth:`start` is called.  After that, :meth:`step` must be called once per frame
+    on the main thread until it returns True.  Each call finishes the assets that the
+    background threads have decoded, in the order they were found, until it runs out
+    of time for the frame.
+
+    Images are decoded by the Kivy image loaders on the background threads, and made
+    into textures on the main thread.  The textures are stored in the texture cache of
+    :class:`GameApp`, so :meth:`GameApp.load_texture` finds them there.  If the images
+    are packed into an atlas, it is the pages of the atlas that are decoded and made
+    into textures, a page per asset, and the region of every packed image is stored in
+    ``GameApp.ATLAS``.  Packed images are not loaded on their own.  Fonts and sounds are read on the background
+    threads, so that they are in memory, and then opened on the main thread: every
+    font is rendered once at each size in ``font_sizes``, and every sound is loaded
+    into the sound cache of :class:`GameApp`, where the next :class:`Sound` of that
+    file picks it up.
+
+    An asset that cannot be loaded is skipped, and its name is added to ``failed``.  The
+    game will then try to load it again the first time it is used.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def total(self):
+        """
+        The number of assets to load.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._jobs)
+
+    @property
+    def done(self):
+        """
+        The number of assets loaded so far (including those that failed).
+
+        **Invariant**: Must be an int in 0..total.
+        """
+        return self._next
+
+    @property
+    def progress(self):
+        """
+        The fraction of the assets loaded so far.
+
+        **Invariant**: Must be a float in 0..1.
+        """
+        if not self._jobs:
+            return 1.0
+        return self._next/len(self._jobs)
+
+    @property
+    def finished(self):
+        """
+        Whether every asset is loaded.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._next == len(self._jobs)
+
+    @property
+    def failed(self):
+        """
+        The file names of the assets that could not be loaded.
+
+        **Invariant**: Must be a tuple of strings.
+        """
+        return tuple(self._failed)
+
+    # BUILT-IN METHODS
+    def __init__(self,images=None,fonts=None,sounds=None,font_sizes=(15,),workers=None,
+                 budget=4.0,atlas=None):
+        """
+        Creates a new preloader for the given folders.
+
+        :param images: The folder of image files (None to skip images)
+        :type images:  ``str`` or None
+
+        :param fonts: The folder of font files (None to skip fonts)
+        :type fonts:  ``str`` or None
+
+        :param sounds: The folder of sound files (None to skip sounds)
+        :type sounds:  ``str`` or None
+
+        :param font_sizes: The point sizes to render every font at
+        :type font_sizes:  ``tuple`` of ``int`` or ``float`` > 0
+
+        :param workers: The number of background threads (chosen by Python if None)
+        :type workers:  ``int`` > 0 or None
+
+        :param budget: The time :meth:`step` may take per frame, in milliseconds
+        :type budget:  ``int`` or ``float`` > 0
+        
+        :param atlas: The .atlas file the images are packed into (None if there is none)
+        :type atlas:  ``str`` or None
+        """
+        assert all(type(size) in [int,float] and size > 0 for size in font_sizes), \
+            'font_sizes %s are not positive numbers' % repr(font_sizes)
+        assert workers is None or (type(workers) == int and workers > 0), \
+            'workers %s is not a positive int' % repr(workers)
+        assert type(budget) in [int,float] and budget > 0, 'budget %s is not positive' % repr(budget)
+        self._font_sizes = tuple(font_sizes)
+        self._workers = workers
+        self._budget = budget/1000.0
+        self._jobs = []
+        self._next = 0
+        self._failed = []
+        self._pool = None
+
+        # The regions of each atlas page, and the file name of each packed image
+        self._regions = {}
+        self._packed = {}
+        if atlas is not None:
+            with open(atlas) as file:
+                pages = json.load(file)
+            for page in sorted(pages):
+                path = os.path.join(os.path.dirname(atlas),page)
+                self._regions[page] = pages[page]
+                self._jobs.append(['page',page,path,None])
+                for key in pages[page]:
+                    self._packed[key] = None
+        for kind, folder, extensions in (('image',images,IMAGE_EXTENSIONS),
+                                         ('font',fonts,FONT_EXTENSIONS),
+                                         ('sound',sounds,SOUND_EXTENSIONS)):
+            if folder is None or not os.path.isdir(folder):
+                continue
+            for name in sorted(os.listdir(folder)):
+                key, ext = os.path.splitext(name)
+                if not ext.lower() in extensions:
+                    continue
+                if kind == 'image' and key in self._packed:
+                    self._packed[key] = name
+                else:
+                    self._jobs.append([kind,name,os.path.join(folder,name),None])
+
+    # PUBLIC METHODS
+    def start(self):
+        """
+        Starts decoding every asset on the background threads.
+
+        This method does nothing if the preloader was already started.
+        """
+        if self._pool is not None or self.finished:
+            return
+        from .app import GameApp
+        self._pool = concurrent.futures.ThreadPoolExecutor(self._workers,'game2d-load')
+        for job in self._jobs:
+            kind, name, path = job[:3]
+            if kind == 'image' and (name in GameApp.ATLAS or name in GameApp.TEXTURE_CACHE):
+                continue
+            decode = _decode_image if kind in ('image','page') else _read_file
+            job[3] = self._pool.submit(decode,path)
+
+    @traced('Preloader.step','io')
+    def step(self):
+        """
+        Finishes loading the assets that are ready, and returns True if all are loaded.
+
+        This method must be called on the main thread.  It returns once it has used up
+        its time budget, or when the next asset is still being decoded, so it never
+        blocks a frame for long.
+        """
+        if self._pool is None:
+            self.start()
+        deadline = time.perf_counter()+self._budget
+        while self._next < len(self._jobs):
+            kind, name, path, future = self._jobs[self._next]
+            if future is not None and not future.done():
+                break
+            try:
+                self._finish(kind,name,future)
+            except Exception:
+                self._failed.append(name)
+            self._jobs[self._next][3] = None
+            self._next += 1
+            if time.perf_counter() >= deadline:
+                break
+        if self.finished:
+            self.cancel()
+        return self.finished
+
+    def cancel(self):
+        """
+        Stops the background threads.
+
+        Assets that were not finished yet are left to be loaded on first use.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False,cancel_futures=True)
+            self._pool = None
+
+    # HIDDEN METHODS
+    def _finish(self,kind,name,future):
+        """
+        Does the part of loading an asset that must happen on the main thread.
+
+        :param kind: The kind of asset
+        :type kind:  one of ``'page'`` (of the atlas), ``'image'``, ``'font'`` or ``'sound'``
+
+        :param name: The file name of the asset
+        :type name:  ``str``
+
+        :param future: The result of the background decoding (None if there was none)
+        :type future:  ``concurrent.futures.Future`` or None
+        """
+        from .app import GameApp
+        if kind == 'page':
+            from kivy.core.image import Image
+            texture = Image(future.result()).texture
+            for key, region in self._regions[name].items():
+                if self._packed[key] is not None:
+                    GameApp.ATLAS[self._packed[key]] = texture.get_region(*region)
+        elif kind == 'image':
+            if name in GameApp.TEXTURE_CACHE:
+                return
+            if future is None:
+                GameApp.TEXTURE_CACHE[name] = GameApp.ATLAS[name]
+                return
+            from kivy.core.image import Image
+            GameApp.TEXTURE_CACHE[name] = Image(future.result()).texture
+        elif kind == 'font':
+            future.result()
+            from kivy.core.text import Label
+            for size in self._font_sizes:
+                Label(text='0',font_name=name,font_size=size).refresh()
+        else:
+            future.result()
+            from kivy.core.audio import SoundLoader
+            sound = SoundLoader.load(name)
+            if sound is None:
+                raise IOError('cannot read the file %s' % repr(name))
+            GameApp.SOUND_CACHE.setdefault(name,[]).append(sound)
+
+
+def _decode_image(path):
+    """
+    Returns the decoded image in the given file (on a background thread).
+
+    :param path: The path of the image file
+    :type path:  ``str``
+    """
+    from kivy.core.image import ImageLoader
+    return ImageLoader.load(path,nocache=True)
+
+
+def _read_file(path):
+    """
+    Returns the size of the given file after reading all of it (on a background thread).
+
+    Reading the file puts it in the cache of the operating system, so that opening it
+    on the main thread does not wait on the disk.
+
+    :param path: The path of the file
+    :type path:  ``str``
+    """
+    with open(path,'rb') as file:
+        return len(file.read())
@@ -0,0 +1,632 @@
+"""
+Software audio mixing for 2D game support.
+
+Every :class:`Sound` is its own playback in the audio backend, so a burst of effects in
+one frame costs a playback per effect.  A :class:`Mixer` instead decodes the WAV files
+in the **Sounds** folder into NumPy arrays once, and mixes every effect that is playing
+into a single stream of samples, a block at a time.  Each effect adds a slice of its
+samples to the block with NumPy, in buffers made once, so mixing a block makes no new
+arrays and its cost barely grows with the number of effects.
+
+The mixed stream goes to a sink.  A :class:`DeviceSink` plays it on the sound card (this
+needs the package ``sounddevice``).  A :class:`FileSink` writes it to a WAV file and a
+:class:`NullSink` only counts it, so mixing can be tested and timed without a sound
+card.  This module does not use Kivy.
+"""
+import collections
+import os
+import struct
+import sys
+import numpy as np
+
+
+# #mark -
+class Mixer(object):
+    """
+    A class mixing sound effects into one stream.
+
+    A mixer has a fixed number of voices.  Playing an effect gives it a voice, which
+    plays the effect from start to end once, at the gain it was given.  If every voice
+    is busy, the voice that started first is taken over (voice stealing).
+
+    Effects are decoded with :meth:`load` (or :meth:`load_all`), converted to the rate
+    and channels of the mixer, and kept in memory.  Playing an effect that is not loaded
+    loads it first, so load the effects when the game starts.
+
+    The mixer produces samples in one of two ways.  A :class:`DeviceSink` asks the mixer
+    for samples when the sound card needs them, so the game does nothing more.  For the
+    other sinks, the game calls :meth:`update` every animation frame, which mixes the
+    time of that frame and writes it to the sink.
+
+    As a sound card mixes on its own thread, :meth:`play` and :meth:`stop` never touch
+    the voices.  They queue a command instead, which the next block carries out.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def volume(self):
+        """
+        The volume of the mixed stream.
+
+        1 means full volume, 0 means mute.  The default value is 1.
+
+        **Invariant**: Must be a float in the range 0..1.
+        """
+        return self._volume
+
+    @volume.setter
+    def volume(self,value):
+        assert type(value) in [int,float] and value >= 0 and value <= 1, \
+            'value %s is not a valid volume' % repr(value)
+        self._volume = float(value)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def rate(self):
+        """
+        The number of samples per second (per channel) of the stream.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._rate
+
+    @property
+    def channels(self):
+        """
+        The number of channels of the stream.
+
+        **Invariant**: Must be 1 or 2.
+        """
+        return self._channels
+
+    @property
+    def block(self):
+        """
+        The most samples (per channel) mixed at a time.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._block
+
+    @property
+    def voices(self):
+        """
+        The number of effects that can play at the same time.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return len(self._voice_sound)
+
+    @property
+    def active(self):
+        """
+        The number of effects playing right now.
+
+        **Invariant**: Must be an int in 0..voices.
+        """
+        return sum(1 for sound in self._voice_sound if sound >= 0)
+
+    @property
+    def sink(self):
+        """
+        The sink the stream is written to, or None.
+
+        **Invariant**: Must be a sink (such as :class:`NullSink`) or None.
+        """
+        return self._sink
+
+    # BUILT-IN METHODS
+    def __init__(self,sink=None,rate=44100,channels=2,voices=32,block=1024,folder=None):
+        """
+        Creates a new mixer with no effects loaded.
+
+        :param sink: Where to write the stream (None to only mix with :meth:`render`)
+        :type sink:  a sink (such as :class:`NullSink`) or None
+
+        :param rate: The number of samples per second of the stream
+        :type rate:  ``int`` > 0
+
+        :param channels: The number of channels of the stream
+        :type channels:  1 or 2
+
+        :param voices: The number of effects that can play at the same time
+        :type voices:  ``int`` > 0
+
+        :param block: The most samples mixed at a time
+        :type block:  ``int`` > 0
+
+        :param folder: The folder of the sound files (the **Sounds** folder if None)
+        :type folder:  ``str`` or None
+        """
+        assert type(rate) == int and rate > 0, 'rate %s is not a positive int' % repr(rate)
+        assert channels in (1,2), 'channels %s is not 1 or 2' % repr(channels)
+        assert type(voices) == int and voices > 0, 'voices %s is not a positive int' % repr(voices)
+        assert type(block) == int and block > 0, 'block %s is not a positive int' % repr(block)
+        self._rate = rate
+        self._channels = channels
+        self._folder = folder
+        self._volume = 1.0
+        self._carry = 0.0
+
+        # The samples of every effect, and the position of each name in that list
+        self._samples = []
+        self._names = {}
+
+        # The voices: the effect playing (-1 if none), how far it is, its gain and age.
+        # Only the thread mixing the blocks changes them, when it carries out commands.
+        self._voice_sound = [-1]*voices
+        self._voice_pos = [0]*voices
+        self._voice_gain = [0.0]*voices
+        self._voice_age = [0]*voices
+        self._plays = 0
+        self._commands = collections.deque()
+
+        self._block = block
+        self._mix = np.zeros((block,channels),dtype=np.float32)
+        self._part = np.zeros((block,channels),dtype=np.float32)
+        self._out = np.zeros((block,channels),dtype=np.int16)
+
+        self._sink = sink
+        if sink is not None:
+            sink.open(self)
+
+    # PUBLIC METHODS
+    def load(self,name):
+        """
+        Decodes a WAV file and keeps it for playing, if it is not loaded yet.
+
+        The samples are converted to the rate and channels of this mixer.
+
+        :param name: The name of a file in the sound folder
+        :type name:  ``str``
+        """
+        if name in self._names:
+            return
+        samples, rate = read_wav(os.path.join(self._sound_folder(),name))
+        samples = _convert(samples,rate,self._rate,self._channels)
+        # Add the samples first, so a voice never plays an effect that is not there
+        self._samples.append(samples)
+        self._names[name] = len(self._samples)-1
+
+    def load_all(self):
+        """
+        Decodes every WAV file in the sound folder.
+        """
+        folder = self._sound_folder()
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith('.wav'):
+                self.load(name)
+
+    def play(self,name,gain=1.0):
+        """
+        Starts playing the given effect on a free voice, from the next block.
+
+        If every voice is busy, the voice that started first plays this effect instead.
+
+        :param name: The name of a sound file (loaded if it is not loaded yet)
+        :type name:  ``str``
+
+        :param gain: The volume of this effect (1 is full volume, 0 is mute)
+        :type gain:  ``int`` or ``float`` >= 0
+        """
+        assert type(gain) in [int,float] and gain >= 0, 'gain %s is not valid' % repr(gain)
+        if not name in self._names:
+            self.load(name)
+        self._commands.append(('play',self._names[name],float(gain)))
+
+    def stop(self,name=None):
+        """
+        Stops every voice playing the given effect (every voice if name is None).
+
+        :param name: The name of a sound file, or None
+        :type name:  ``str`` or None
+        """
+        if name is None:
+            self._commands.append(('stop',None))
+        elif name in self._names:
+            self._commands.append(('stop',self._names[name]))
+
+    def render(self,frames=None):
+        """
+        Returns the next samples of the stream, mixing every voice that is playing.
+
+        The result is an array of 16 bit samples of shape ``(frames, channels)``.  It is
+        reused by the next call, so copy it if you need to keep it.
+
+        :param frames: The number of samples per channel (a whole block if None)
+        :type frames:  ``int`` in 1..block, or None
+        """
+        if frames is None:
+            frames = self._block
+        assert 0 < frames <= self._block, 'frames %s is not in 1..block' % repr(frames)
+        self._carry_out()
+        mix = self._mix[:frames]
+        mix.fill(0)
+        for voice in range(len(self._voice_sound)):
+            sound = self._voice_sound[voice]
+            if sound < 0:
+                continue
+            samples = self._samples[sound]
+            pos = self._voice_pos[voice]
+            count = min(frames,len(samples)-pos)
+            part = self._part[:count]
+            np.multiply(samples[pos:pos+count],self._voice_gain[voice],out=part)
+            np.add(mix[:count],part,out=mix[:count])
+            if pos+count >= len(samples):
+                self._voice_sound[voice] = -1
+            else:
+                self._voice_pos[voice] = pos+count
+        if self._volume != 1:
+            mix *= self._volume
+        np.clip(mix,-1.0,1.0,out=mix)
+        np.multiply(mix,32767,out=mix)
+        # Casting in a copy, as a cast in a ufunc makes a buffer of its own
+        out = self._out[:frames]
+        np.copyto(out,mix,casting='unsafe')
+        return out
+
+    def update(self,dt):
+        """
+        Mixes dt seconds of the stream and writes it to the sink.
+
+        Call this method once per animation frame.  It does nothing if there is no sink,
+        or if the sink asks for the samples itself (like :class:`DeviceSink`).
+
+        :param dt: The time since the last animation frame
+        :type dt:  ``int`` or ``float`` >= 0
+        """
+        if self._sink is None or self._sink.pulls:
+            return
+        self._carry += dt*self._rate
+        frames = int(self._carry)
+        self._carry -= frames
+        block = self._block
+        while frames > 0:
+            size = min(frames,block)
+            self._sink.write(self.render(size))
+            frames -= size
+
+    def close(self):
+        """
+        Stops every voice, and closes the sink.
+        """
+        self.stop()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    # HIDDEN METHODS
+    def _carry_out(self):
+        """
+        Carries out the commands queued by :meth:`play` and :meth:`stop`, in order.
+
+        This is called by :meth:`render`, on the thread mixing the blocks.
+        """
+        while self._commands:
+            command = self._commands.popleft()
+            if command[0] == 'play':
+                voice = self._voice_sound.index(-1) if -1 in self._voice_sound else \
+                        self._voice_age.index(min(self._voice_age))
+                self._plays += 1
+                self._voice_sound[voice] = command[1]
+                self._voice_pos[voice] = 0
+                self._voice_gain[voice] = command[2]
+                self._voice_age[voice] = self._plays
+            else:
+                for voice in range(len(self._voice_sound)):
+                    if command[1] is None or self._voice_sound[voice] == command[1]:
+                        self._voice_sound[voice] = -1
+
+    def _sound_folder(self):
+        """
+        Returns the folder of the sound files.
+
+        This is the **Sounds** folder of the game if a :class:`GameApp` has been made,
+        and the folder **Sounds** in the working directory otherwise.
+        """
+        if self._folder is not None:
+            return self._folder
+        app = sys.modules.get(__package__+'.app')
+        if app is not None and hasattr(app.GameApp,'sounds'):
+            return app.GameApp.sounds
+        return 'Sounds'
+
+
+# #mark -
+class NullSink(object):
+    """
+    A sink that only counts the samples written to it.
+
+    This sink is for testing and benchmarking the mixer without a sound card.
+    """
+    # Whether the sink asks the mixer for samples itself
+    pulls = False
+
+    @property
+    def frames(self):
+        """
+        The number of samples (per channel) written so far.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    @property
+    def peak(self):
+        """
+        The largest absolute sample written so far.
+
+        **Invariant**: Must be an int in 0..32768.
+        """
+        return self._peak
+
+    def __init__(self):
+        """
+        Creates a new sink with nothing written.
+        """
+        self._frames = 0
+        self._peak = 0
+
+    def open(self,mixer):
+        """
+        Prepares the sink for the stream of the given mixer.
+
+        :param mixer: The mixer writing to this sink
+        :type mixer:  :class:`Mixer`
+        """
+        pass
+
+    def write(self,samples):
+        """
+        Counts a block of samples.
+
+        :param samples: The samples, as returned by :meth:`Mixer.render`
+        :type samples:  ``numpy.ndarray`` of ``int16``
+        """
+        self._frames += len(samples)
+        if len(samples):
+            self._peak = max(self._peak,int(np.abs(samples.astype(np.int32)).max()))
+
+    def close(self):
+        """
+        Ends the stream.
+        """
+        pass
+
+
+class FileSink(object):
+    """
+    A sink writing the stream to a 16 bit WAV file.
+    """
+    # Whether the sink asks the mixer for samples itself
+    pulls = False
+
+    def __init__(self,filename):
+        """
+        Creates a new sink for the given file.
+
+        The file is created when the sink is given to a mixer.
+
+        :param filename: The name of the file to write
+        :type filename:  ``str``
+        """
+        assert type(filename) == str, 'filename %s is not a string' % repr(filename)
+        self._filename = filename
+        self._file = None
+        self._bytes = 0
+
+    def open(self,mixer):
+        """
+        Creates the file, with a header for the stream of the given mixer.
+
+        :param mixer: The mixer writing to this sink
+        :type mixer:  :class:`Mixer`
+        """
+        self._file = open(self._filename,'wb')
+        self._bytes = 0
+        # The sizes are written when the file is closed
+        self._file.write(_wav_header(mixer.rate,mixer.channels,0))
+
+    def write(self,samples):
+        """
+        Adds a block of samples to the file.
+
+        :param samples: The samples, as returned by :meth:`Mixer.render`
+        :type samples:  ``numpy.ndarray`` of ``int16``
+        """
+        data = samples.astype('<i2').tobytes()
+        self._file.write(data)
+        self._bytes += len(data)
+
+    def close(self):
+        """
+        Writes the sizes in the header, and closes the file.
+        """
+        if self._file is None:
+            return
+        self._file.seek(4)
+        self._file.write(struct.pack('<I',36+self._bytes))
+        self._file.seek(40)
+        self._file.write(struct.pack('<I',self._bytes))
+        self._file.close()
+        self._file = None
+
+
+class DeviceSink(object):
+    """
+    A sink playing the stream on the sound card.
+
+    This sink needs the package ``sounddevice``.  The sound card asks the mixer for
+    every block of samples on its own thread, so there is no need to call
+    :meth:`Mixer.update`.
+    """
+    # Whether the sink asks the mixer for samples itself
+    pulls = True
+
+    def __init__(self,device=None,latency='low'):
+        """
+        Creates a new sink for a sound card.
+
+        :param device: The sound card to use (the default one if None)
+        :type device:  ``int`` or ``str`` or None
+
+        :param latency: The latency of the stream, as given to ``sounddevice``
+        :type latency:  ``str`` or ``float``
+        """
+        self._device = device
+        self._latency = latency
+        self._stream = None
+        self._mixer = None
+
+    def open(self,mixer):
+        """
+        Starts playing the stream of the given mixer.
+
+        :param mixer: The mixer writing to this sink
+        :type mixer:  :class:`Mixer`
+        """
+        import sounddevice
+        self._mixer = mixer
+        self._stream = sounddevice.OutputStream(samplerate=mixer.rate,channels=mixer.channels,
+                                                dtype='int16',blocksize=mixer.block,
+                                                device=self._device,latency=self._latency,
+                                                callback=self._callback)
+        self._stream.start()
+
+    def write(self,samples):
+        """
+        Does nothing, as the sound card asks for the samples itself.
+        """
+        pass
+
+    def close(self):
+        """
+        Stops playing the stream.
+        """
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def _callback(self,outdata,frames,time,status):
+        """
+        Fills the buffer of the sound card with the next samples (on its thread).
+        """
+        block = self._mixer.block
+        start = 0
+        while start < frames:
+            size = min(frames-start,block)
+            outdata[start:start+size] = self._mixer.render(size)
+            start += size
+
+
+# #mark -
+def read_wav(filename):
+    """
+    Returns the samples and rate of a PCM WAV file.
+
+    The samples are an array of floats in -1..1, of shape ``(frames, channels)``.  The
+    file may hold 8, 16, 24 or 32 bit integer samples, or 32 bit float samples.
+
+    The chunks of the file are read here, as the game has a module ``wave`` of its own
+    that hides the one of the standard library.
+
+    :param filename: The name of the file to read
+    :type filename:  ``str``
+    """
+    with open(filename,'rb') as file:
+        data = file.read()
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise IOError('%s is not a WAV file' % repr(filename))
+    fmt = None
+    pcm = None
+    pos = 12
+    while pos+8 <= len(data):
+        kind, size = struct.unpack('<4sI',data[pos:pos+8])
+        body = data[pos+8:pos+8+size]
+        if kind == b'fmt ':
+            fmt = struct.unpack('<HHIIHH',body[:16])
+        elif kind == b'data':
+            pcm = body
+        pos += 8+size+(size & 1)
+    if fmt is None or pcm is None:
+        raise IOError('%s has no samples' % repr(filename))
+    tag, channels, rate, _, align, bits = fmt
+    if tag == 0xFFFE:
+        tag = 3 if bits == 32 and _extensible_float(data) else 1
+    pcm = pcm[:len(pcm)-len(pcm) % align]
+    if tag == 3 and bits == 32:
+        samples = np.frombuffer(pcm,dtype='<f4').astype(np.float32)
+    elif bits == 8:
+        samples = (np.frombuffer(pcm,dtype=np.uint8).astype(np.float32)-128)/128
+    elif bits == 16:
+        samples = np.frombuffer(pcm,dtype='<i2').astype(np.float32)/32768
+    elif bits == 24:
+        raw = np.frombuffer(pcm,dtype=np.uint8).reshape(-1,3).astype(np.int32)
+        value = raw[:,0] | (raw[:,1] << 8) | (raw[:,2] << 16)
+        value = np.where(value >= 1 << 23,value-(1 << 24),value)
+        samples = value.astype(np.float32)/(1 << 23)
+    elif bits == 32:
+        samples = np.frombuffer(pcm,dtype='<i4').astype(np.float32)/(1 << 31)
+    else:
+        raise IOError('%s has %d bit samples' % (repr(filename),bits))
+    return samples.reshape(-1,channels), rate
+
+
+def _extensible_float(data):
+    """
+    Returns True if the format of an extensible WAV file is float.
+
+    :param data: The contents of the file
+    :type data:  ``bytes``
+    """
+    start = data.find(b'fmt ')
+    # The sub-format GUID starts 24 bytes into the format chunk
+    return start >= 0 and data[start+8+24:start+8+26] == b'\x03\x00'
+
+
+def _convert(samples,rate,target,channels):
+    """
+    Returns samples converted to the given rate and number of channels.
+
+    The rate is changed by linear interpolation, which is enough for sound effects.
+
+    :param samples: The samples, of shape ``(frames, channels)``
+    :type samples:  ``numpy.ndarray`` of floats
+
+    :param rate: The rate of the samples
+    :type rate:  ``int`` > 0
+
+    :param target: The rate to convert to
+    :type target:  ``int`` > 0
+
+    :param channels: The number of channels to convert to
+    :type channels:  1 or 2
+    """
+    if samples.shape[1] != channels:
+        mono = samples.mean(axis=1,keepdims=True)
+        samples = np.repeat(mono,channels,axis=1)
+    if rate != target and len(samples) > 1:
+        frames = int(round(len(samples)*target/rate))
+        times = np.arange(frames)*(rate/target)
+        source = np.arange(len(samples))
+        samples = np.stack([np.interp(times,source,samples[:,c])
+                            for c in range(channels)],axis=1)
+    return np.ascontiguousarray(samples,dtype=np.float32)
+
+
+def _wav_header(rate,channels,size):
+    """
+    Returns the header of a 16 bit PCM WAV file.
+
+    :param rate: The number of samples per second
+    :type rate:  ``int`` > 0
+
+    :param channels: The number of channels
+    :type channels:  ``int`` > 0
+
+    :param size: The number of bytes of samples
+    :type size:  ``int`` >= 0
+    """
+    return struct.pack('<4sI4s4sIHHIIHH4sI',b'RIFF',36+size,b'WAVE',b'fmt ',16,1,
+                       channels,rate,rate*channels*2,channels*2,16,b'data',size)
@@ -8,6 +8,7 @@ These classes will not work unless you adhere to proper subclassing practices.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
+import collections
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from introcs.geom import Point2, Matrix
@@ -38,6 +39,64 @@ def is_color(c):
     return type(c) == str and (introcs.is_tkcolor(c) or introcs.is_webcolor(c))
 
 
+# Shared Kivy colors, keyed by the color value given to the object, least recently used first
+COLOR_CACHE = collections.OrderedDict()
+# Shared Kivy colors, keyed by their (r,g,b,a) tuple, least recently used first
+RGBA_CACHE = collections.OrderedDict()
+# The number of colors kept in each of COLOR_CACHE and RGBA_CACHE
+COLOR_CACHE_SIZE = 256
+
+def get_color(c):
+    """
+    Returns a shared Kivy ``Color`` instruction for a color value.
+
+    The color ``c`` may be anything accepted by :func:`is_color`.  Strings and
+    sequences are resolved (and checked) only the first time they are seen, and every
+    color with the same (r,g,b,a) value shares a single ``Color`` instruction.  Each
+    cache forgets the least recently used color once it holds more than
+    ``COLOR_CACHE_SIZE`` of them, so colors that change every frame (like a fade) do
+    not grow the caches.  The shared instructions must never be changed.
+
+    :return: The Kivy color instruction for ``c``
+    :rtype:  ``Color``
+
+    :param c: The color value
+    :type c:  a valid color (see :func:`is_color`)
+    """
+    key = c
+    if type(c) in [tuple, list]:
+        key = tuple(c)
+    elif type(c) != str:
+        key = None
+
+    if not key is None and key in COLOR_CACHE:
+        COLOR_CACHE.move_to_end(key)
+        return COLOR_CACHE[key]
+
+    assert is_color(c), '%s is not a valid color' % repr(c)
+    if type(c) in [tuple, list]:
+        rgba = tuple(float(z) for z in c)+((1.0,) if len(c) == 3 else ())
+    elif type(c) in [introcs.RGB, introcs.HSV]:
+        rgba = tuple(c.glColor())
+    elif c[0] == '#':
+        rgba = tuple(introcs.RGB.CreateWebColor(c).glColor())
+    else:
+        rgba = tuple(introcs.RGB.CreateName(c).glColor())
+
+    if rgba in RGBA_CACHE:
+        RGBA_CACHE.move_to_end(rgba)
+    else:
+        RGBA_CACHE[rgba] = Color(rgba[0],rgba[1],rgba[2],rgba[3])
+        while len(RGBA_CACHE) > COLOR_CACHE_SIZE:
+            RGBA_CACHE.popitem(last=False)
+    color = RGBA_CACHE[rgba]
+    if not key is None:
+        COLOR_CACHE[key] = color
+        while len(COLOR_CACHE) > COLOR_CACHE_SIZE:
+            COLOR_CACHE.popitem(last=False)
+    return color
+
+
 def is_num_tuple(t,size):
     """
     Checks whether a value is a sequence of numbers.
@@ -231,19 +290,7 @@ class GObject(object):
 
     @linecolor.setter
     def linecolor(self,value):
-        import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
-        if type(value) in [tuple, list] and len(value) == 3:
-            value = list(value)+[1.0]
-        elif type(value) in [introcs.RGB, introcs.HSV]:
-            value = value.glColor()
-        elif type(value) == str:
-            if value[0] == '#':
-                value = introcs.RGB.CreateWebColor(value).glColor()
-            else:
-                value = introcs.RGB.CreateName(value).glColor()
-
-        self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        self._linecolor = None if value is None else get_color(value)
         if self._defined:
             self._reset()
 
@@ -269,19 +316,7 @@ class GObject(object):
 
     @fillcolor.setter
     def fillcolor(self,value):
-        import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
-        if type(value) in [tuple, list] and len(value) == 3:
-            value = list(value)+[1.0]
-        elif type(value) in [introcs.RGB, introcs.HSV]:
-            value = value.glColor()
-        elif type(value) == str:
-            if value[0] == '#':
-                value = introcs.RGB.CreateWebColor(value).glColor()
-            else:
-                value = introcs.RGB.CreateName(value).glColor()
-
-        self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        self._fillcolor = None if value is None else get_color(value)
         if self._defined:
             self._reset()
 
@@ -0,0 +1,164 @@
+"""
+Frame timing for 2D game support.
+
+This module measures where the time of each animation frame goes.  A :class:`FrameStats`
+records how long each phase of a frame took (clearing the view, updating the game,
+drawing it and committing the canvas) and how many canvas instructions were drawn, for
+a rolling window of recent frames.  It can then report percentiles of those times, so that
+hitches show up without attaching a profiler.
+
+:class:`GameApp` creates one of these for you if you pass ``stats=True`` to the
+constructor.  See the attribute ``stats`` of that class.
+"""
+import time
+import numpy as np
+
+# The phases of a frame, in the order they happen
+PHASES = ('clear','update','draw','commit')
+
+
+# #mark -
+class FrameStats(object):
+    """
+    A class recording the timing of recent animation frames.
+
+    Each frame is recorded with :meth:`begin`, then a call to :meth:`mark` at the end of
+    every phase (in the order of ``PHASES``), and finally :meth:`end`.  The times are kept
+    in a ring buffer of the last ``window`` frames, so the percentiles always describe
+    the recent past, and recording a frame never allocates memory.
+
+    All times reported by this class are in milliseconds.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def window(self):
+        """
+        The number of recent frames kept.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return len(self._times)
+
+    @property
+    def budget(self):
+        """
+        The time a frame may take without counting as a hitch, in milliseconds.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._budget
+
+    @property
+    def frames(self):
+        """
+        The number of frames recorded so far (including those out of the window).
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    @property
+    def hitches(self):
+        """
+        The number of frames in the window that took longer than the budget.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return int(np.count_nonzero(self._filled()[:,-1] > self._budget))
+
+    # BUILT-IN METHODS
+    def __init__(self,window=600,budget=1000/60.0):
+        """
+        Creates a new, empty record of frames.
+
+        :param window: The number of recent frames to keep
+        :type window:  ``int`` > 0
+
+        :param budget: The longest a frame may take without being a hitch (in ms)
+        :type budget:  ``int`` or ``float`` > 0
+        """
+        assert type(window) == int and window > 0, 'window %s is not a positive int' % repr(window)
+        assert type(budget) in [int,float] and budget > 0, 'budget %s is not positive' % repr(budget)
+        # One column per phase, then the whole frame
+        self._times  = np.zeros((window,len(PHASES)+1))
+        self._counts = np.zeros(window,dtype=int)
+        self._budget = float(budget)
+        self._frames = 0
+        self._start  = 0.0
+        self._last   = 0.0
+        self._phase  = 0
+
+    # PUBLIC METHODS
+    def begin(self):
+        """
+        Starts recording a frame.
+        """
+        self._start = self._last = time.perf_counter()
+        self._phase = 0
+
+    def mark(self):
+        """
+        Ends the current phase of the frame.
+        """
+        now = time.perf_counter()
+        self._times[self._frames % len(self._times),self._phase] = (now-self._last)*1000
+        self._last = now
+        self._phase += 1
+
+    def end(self,count=0):
+        """
+        Finishes recording a frame.
+
+        :param count: The number of canvas instructions drawn in the frame
+        :type count:  ``int`` >= 0
+        """
+        slot = self._frames % len(self._times)
+        self._times[slot,-1] = (time.perf_counter()-self._start)*1000
+        self._counts[slot] = count
+        self._frames += 1
+
+    def percentiles(self,phase=None):
+        """
+        Returns the p50, p95, p99 and maximum time of a phase in the window.
+
+        The result is a dictionary with the keys ``'p50'``, ``'p95'``, ``'p99'`` and
+        ``'max'``.  All of the values are 0 if no frame was recorded yet.
+
+        :param phase: The phase to report (the whole frame if None)
+        :type phase:  ``str`` in ``PHASES`` or None
+        """
+        column = -1 if phase is None else PHASES.index(phase)
+        times = self._filled()[:,column]
+        if len(times) == 0:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        p50, p95, p99 = np.percentile(times,(50,95,99))
+        return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+                'max': float(times.max())}
+
+    def count(self):
+        """
+        Returns the mean number of canvas instructions drawn per frame in the window.
+        """
+        counts = self._counts[:min(self._frames,len(self._counts))]
+        return float(counts.mean()) if len(counts) else 0.0
+
+    def summary(self):
+        """
+        Returns a short text report of the window, one line per phase.
+        """
+        lines = ['%d frames  %d hitches  %.0f instructions' % (self._frames,self.hitches,
+                                                              self.count()),
+                 'ms        p50   p95   p99    max']
+        for phase in PHASES+(None,):
+            stats = self.percentiles(phase)
+            lines.append('%-7s %5.2f %5.2f %5.2f %6.2f' % (phase or 'frame',stats['p50'],
+                         stats['p95'],stats['p99'],stats['max']))
+        return '\n'.join(lines)
+
+    # HIDDEN METHODS
+    def _filled(self):
+        """
+        Returns the rows of the ring buffer that hold recorded frames.
+        """
+        return self._times[:min(self._frames,len(self._times))]
@@ -8,13 +8,27 @@ to draw shapes.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
+import collections
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from kivy.uix.label import Label
+from kivy.core.text import Label as CoreLabel
 from kivy.uix.image import Image
-from .gobject import GObject
+from .gobject import GObject, get_color
+from .gtrace import traced
 from .app import GameApp
 
+# The rendered text of labels, least recently used first (see GLabel)
+TEXT_CACHE = collections.OrderedDict()
+# The number of rendered texts kept in TEXT_CACHE
+TEXT_CACHE_SIZE = 64
+# The keywords of GLabel passed on to the Kivy text renderer
+TEXT_OPTIONS = ('italic','underline','strikethrough','markup','outline_width',
+                'outline_color','line_height','padding','padding_x','padding_y',
+                'max_lines','shorten','shorten_from','split_str','strip',
+                'font_hinting','font_kerning','font_blended','text_language',
+                'base_direction')
+
+
 class GRectangle(GObject):
     """
     A class representing a (potentially) solid rectangle.
@@ -262,7 +276,7 @@ class GImage(GRectangle):
         if not self._fillcolor is None:
             self._cache.add(self._fillcolor)
         else:
-            self._cache.add(Color(1,1,1))
+            self._cache.add(get_color((1,1,1,1)))
         self._cache.add(fill)
         
         if not self._linecolor is None and self.linewidth > 0:
@@ -296,7 +310,17 @@ class GLabel(GRectangle):
     to the font by filename, including the .ttf. If you give no name, it will use the 
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
-    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
+    
+    Rendering text is slow, so the rendered text is kept in ``TEXT_CACHE``, shared by
+    every label with the same text, font, size, style, alignment and color.  Making a
+    new label with the same message every frame renders the message only once.  The
+    cache holds the ``TEXT_CACHE_SIZE`` most recently used texts.
+    
+    Besides the attributes of this class, a label only takes the text options of the
+    Kivy renderer listed in ``TEXT_OPTIONS`` (such as `italic`, `markup` or
+    `outline_width`) as keywords.  These are fixed when the label is made.  Any other
+    Kivy ``Label`` keyword is an error."""
     
     # MUTABLE PROPERTIES
     @property
@@ -311,8 +335,8 @@ class GLabel(GRectangle):
     def font_size(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._fsize = value
-        self._label.font_size = value
-        self._label.texture_update()
+        if self._defined:
+            self._reset()
     
     @property
     def font_name(self):
@@ -320,14 +344,15 @@ class GLabel(GRectangle):
         The file name for the .ttf file to use as a font
         
         **Invariant**: Must be a string referring to a .ttf file in folder Fonts"""
-        return self._label.font_name
+        return self._fname
     
     @font_name.setter
     def font_name(self,value):
         from .app import GameApp
         assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
-        self._label.font_name = value
-        self._label.texture_update()
+        self._fname = value
+        if self._defined:
+            self._reset()
     
     @property
     def bold(self):
@@ -339,13 +364,14 @@ class GLabel(GRectangle):
         `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
         
         **Invariant**: Must be a boolean"""
-        return self._label.bold
+        return self._bold
 
     @bold.setter
     def bold(self,value):
         assert type(value) == bool, repr(value)+' is not a bool'
-        self._label.bold = value
-        self._label.texture_update()
+        self._bold = value
+        if self._defined:
+            self._reset()
 
     @property
     def text(self):
@@ -357,13 +383,14 @@ class GLabel(GRectangle):
         this label will grow to ensure that the text will fit in the rectangle.
         
         **Invariant**: Must be a string"""
-        return self._label.text
+        return self._text
     
     @text.setter
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
-        self._label.text = value
-        self._label.texture_update()
+        self._text = value
+        if self._defined:
+            self._reset()
     
     @property
     def halign(self):
@@ -385,7 +412,6 @@ class GLabel(GRectangle):
     def halign(self,value):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
-        self._label.halign = value
         if self._defined:
             self._reset()
     
@@ -409,7 +435,6 @@ class GLabel(GRectangle):
     def valign(self,value):
         assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
         self._valign = value
-        self._label.valign = value
         if self._defined:
             self._reset()
     
@@ -588,20 +613,26 @@ class GLabel(GRectangle):
             GLabel(text='Hello')
         
         This class supports the all same keywords as :class:`GRectangle`, as well as 
-        additional attributes for the text properties (e.g. font size and name).
+        additional attributes for the text properties (e.g. font size and name) and the
+        text options in ``TEXT_OPTIONS``.
         """
         self._defined = False
         self._hanchor = 'center'
         self._vanchor = 'center'
         
-        sanitized = {}
-        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom']
-        for key in keywords:
-            if not key in excludes:
-                sanitized[key] = keywords[key]
+        self._text  = keywords['text'] if 'text' in keywords else ''
+        self._fsize = keywords['font_size'] if 'font_size' in keywords else 15
+        self._fname = keywords['font_name'] if 'font_name' in keywords else 'Roboto'
+        self._bold  = keywords['bold'] if 'bold' in keywords else False
         
-        self._label = Label(**sanitized)
-        self._label.size_hint = (None,None)
+        options = []
+        for key in keywords:
+            if key in TEXT_OPTIONS:
+                value = keywords[key]
+                options.append((key,tuple(value) if type(value) == list else value))
+            else:
+                assert hasattr(GLabel,key), 'GLabel does not support the keyword %s' % repr(key)
+        self._options = tuple(sorted(options))
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.halign = keywords['halign'] if 'halign' in keywords else 'center'
@@ -612,7 +643,6 @@ class GLabel(GRectangle):
             self.linecolor = (0,0,0,1)
         self._reset()
         self._defined = True
-        self._label.bind(texture_size=self._callback)
     
     def __str__(self):
         """
@@ -627,27 +657,19 @@ class GLabel(GRectangle):
                 % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
     
     # HIDDEN METHODS
-    def _callback(self,instance=None,value=None):
-        """
-        A workaround to deal with parameter requirements for callbacks
-        """
-        if self._defined:
-            self._reset()
-    
     def _reset(self):
         """
         Resets the drawing cache.
         """
-        # Set up the label at the center.
-        self._label.size = self._label.texture_size
-        self._label.center = (0,0)
-        if self.linecolor:
-            self._label.color = self.linecolor
+        color = (1,1,1,1) if self.linecolor is None else tuple(self.linecolor)
+        texture = get_text(self._text,self._fname,self._fsize,self._bold,self._halign,color,
+                           self._options)
+        tw, th = (0,0) if texture is None else texture.size
         
         # Resize the outside if necessary
         self._defined = False
-        self.width  = max(self.width, self._label.width)
-        self.height = max(self.height,self._label.height)
+        self.width  = max(self.width, tw)
+        self.height = max(self.height,th)
         self._defined = True
         
         # Reset the absolute anchor
@@ -662,17 +684,20 @@ class GLabel(GRectangle):
         elif self._vanchor == 'bottom':
             self._trans.y = self._hv+self.height/2.0
         
-        # Reset the label anchor.
+        # Anchor the text inside the label
         if self.halign == 'left':
-            self._label.x = -self.width/2.0
+            tx = -self.width/2.0
         elif self.halign == 'right':
-            self._label.right = self.width/2.0
+            tx = self.width/2.0-tw
+        else:
+            tx = -tw/2.0
         
-        # Reset the label anchor.
         if self.valign == 'top':
-            self._label.top = self.height/2.0
+            ty = self.height/2.0-th
         elif self.valign == 'bottom':
-            self._label.bottom = -self.height/2.0
+            ty = -self.height/2.0
+        else:
+            ty = -th/2.0
         
         GObject._reset(self)
         x = -self.width/2.0
@@ -683,7 +708,10 @@ class GLabel(GRectangle):
             self._cache.add(self._fillcolor)
             self._cache.add(fill)
         
-        self._cache.add(self._label.canvas)
+        if texture is not None:
+            # The text is rendered in its color
+            self._cache.add(get_color((1,1,1,1)))
+            self._cache.add(Rectangle(texture=texture,pos=(int(tx),int(ty)),size=(tw,th)))
         
         if self._linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
@@ -691,3 +719,63 @@ class GLabel(GRectangle):
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
+
+
+# #mark -
+def get_text(text,font_name,font_size,bold,halign,color,options=()):
+    """
+    Returns a shared texture of the given text, or None if the text is empty.
+    
+    The texture is taken from ``TEXT_CACHE`` if the text was rendered recently.  If not,
+    the text is rendered and added to the cache, which forgets the least recently used
+    text once it holds more than ``TEXT_CACHE_SIZE`` of them.  The shared textures must
+    never be changed.
+    
+    :param text: The text to render
+    :type text:  ``str``
+    
+    :param font_name: The file name of the font
+    :type font_name:  ``str``
+    
+    :param font_size: The size of the font in points
+    :type font_size:  ``int`` or ``float``
+    
+    :param bold: Whether the text is bold
+    :type bold:  ``bool``
+    
+    :param halign: The alignment of the lines of the text
+    :type halign:  one of 'left', 'right', or 'center'
+    
+    :param color: The color of the text
+    :type color:  4-element ``tuple`` of floats
+    
+    :param options: The other text options, as sorted (keyword, value) pairs
+    :type options:  ``tuple`` of pairs with a keyword in ``TEXT_OPTIONS``
+    
+    :return: The texture of the text
+    :rtype:  ``Texture`` or None
+    """
+    if not text:
+        return None
+    key = (text,font_name,font_size,bold,halign,color,options)
+    if key in TEXT_CACHE:
+        TEXT_CACHE.move_to_end(key)
+        return TEXT_CACHE[key]
+    texture = _render_text(text,font_name,font_size,bold,halign,color,options)
+    TEXT_CACHE[key] = texture
+    while len(TEXT_CACHE) > TEXT_CACHE_SIZE:
+        TEXT_CACHE.popitem(last=False)
+    return texture
+
+
+@traced('GLabel.texture_update','text')
+def _render_text(text,font_name,font_size,bold,halign,color,options):
+    """
+    Returns a new texture of the given text.
+    
+    See :func:`get_text` for the parameters.
+    """
+    label = CoreLabel(text=text,font_name=font_name,font_size=font_size,bold=bold,
+                      halign=halign,color=color,**dict(options))
+    label.refresh()
+    return label.texture
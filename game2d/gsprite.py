@@ -12,6 +12,7 @@ Date:   November 1, 2017 (Python 3 version)
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from .grectangle import GRectangle, GObject
+from .gobject import get_color
 from .app import GameApp
 
 # #mark -
@@ -33,7 +34,12 @@ class GSprite(GRectangle):
     
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
+    
+    The frames of a filmstrip are cut out of its texture once per process.  Every sprite
+    with the same ``source`` and ``format`` shares the same tuple of frames.
     """
+    # Class attribute mapping (source, format) to the frames of a filmstrip
+    FRAME_CACHE = {}
     
     # MUTABLE PROPERTIES
     @property
@@ -103,12 +109,53 @@ class GSprite(GRectangle):
         self.source  = keywords['source'] if 'source' in keywords else None
         self._setFormat(keywords['format'] if 'format' in keywords else (1,1))
         self._frame  = 0
-        self._images = [None]*self.count
+        self._images = (None,)*self.count
         self._bounds = None
         self._texture = None
         GRectangle.__init__(self,**keywords)
         self._defined = True
     
+    # CLASS METHODS
+    @classmethod
+    def load_frames(cls,source,format):
+        """
+        Returns: The frames of the given filmstrip, or None if it cannot be loaded
+        
+        The frames are regions of the texture for ``source``, in the order
+        left-to-right, top-to-bottom.  If the frames have already been cut for this
+        ``source`` and ``format``, it will return the cached frames.  Otherwise, it will
+        cut the frames and cache them before returning them.
+        
+        :param source: The file name of the filmstrip
+        :type source:  ``str``
+        
+        :param format: The grid size (rows, columns) of the filmstrip
+        :type format:  2-element ``tuple`` of ``int`` > 0
+        """
+        key = (source,format)
+        if key in cls.FRAME_CACHE:
+            return cls.FRAME_CACHE[key]
+        
+        texture = GameApp.load_texture(source)
+        if not texture:
+            return None
+        
+        width  = texture.width/format[1]
+        height = texture.height/format[0]
+        images = []
+        ty = 0
+        for row in range(format[0]):
+            tx = 0
+            for col in range(format[1]):
+                images.append(texture.get_region(int(tx),texture.height-int(ty)-int(height),
+                                                 int(width),int(height)))
+                tx += width
+            ty += height
+        
+        frames = tuple(images)
+        cls.FRAME_CACHE[key] = frames
+        return frames
+    
     # HIDDEN METHODS
     def _setFormat(self,value):
         """
@@ -130,18 +177,9 @@ class GSprite(GRectangle):
         x = -self.width/2.0
         y = -self.height/2.0
         
-        texture = GameApp.load_texture(self.source)
-        if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+        frames = GSprite.load_frames(self.source,self._format)
+        if frames:
+            self._images = frames
         else:
             print('Failed to load',repr(self.source))
         
@@ -150,7 +188,7 @@ class GSprite(GRectangle):
         if not self._fillcolor is None:
             self._cache.add(self._fillcolor)
         else:
-            self._cache.add(Color(1,1,1))
+            self._cache.add(get_color((1,1,1,1)))
         self._cache.add(self._bounds)
         
         if not self._linecolor is None and self.linewidth > 0:
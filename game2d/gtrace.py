@@ -0,0 +1,289 @@
+"""
+Trace recording for 2D game support.
+
+This module records spans of time (a frame, an update, a texture load) as Chrome trace
+events, so that a capture of a game can be opened in ``chrome://tracing`` or the
+Perfetto UI (https://ui.perfetto.dev).  Each span shows up as a bar on the timeline of
+the thread that ran it, nested inside the spans that were open at the time, so a frame
+that blew its budget can be taken apart at a glance.
+
+Spans are recorded by the :class:`Tracer` in ``TRACER``.  Methods are traced with the
+decorator :func:`traced`, and any other block of code with the context manager
+:func:`span`.  Both cost a single test when no trace is being recorded.  The events are
+handed off in chunks to a background thread that writes the file, so recording a span
+never waits on the disk.
+
+:class:`GameApp` starts the tracer for you if you pass a file name as the keyword
+``trace``.
+"""
+import atexit
+import functools
+import json
+import os
+import queue
+import threading
+import time
+
+
+# #mark -
+class Tracer(object):
+    """
+    A class recording spans of time as Chrome trace events.
+
+    A tracer records nothing until :meth:`start` is called with the name of the file to
+    write.  It then records every span until :meth:`stop` is called, until the optional
+    time limit is reached, or until Python exits.
+
+    The events are kept in a buffer.  When the buffer holds ``chunk`` events, it is
+    passed to a background thread that writes it to the file in the JSON array format
+    of the trace event specification.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def enabled(self):
+        """
+        Whether this tracer is recording.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._enabled
+
+    @property
+    def filename(self):
+        """
+        The file this tracer is writing, or None if it is not recording.
+
+        **Invariant**: Must be a string or None.
+        """
+        return self._filename
+
+    # BUILT-IN METHODS
+    def __init__(self,chunk=4096):
+        """
+        Creates a new tracer that is not recording.
+
+        :param chunk: The number of events passed to the writer at a time
+        :type chunk:  ``int`` > 0
+        """
+        assert type(chunk) == int and chunk > 0, 'chunk %s is not a positive int' % repr(chunk)
+        self._chunk    = chunk
+        self._enabled  = False
+        self._filename = None
+        self._events   = []
+        self._origin   = 0
+        self._deadline = None
+        self._queue    = None
+        self._writer   = None
+        self._exiting  = False
+
+    # PUBLIC METHODS
+    def start(self,filename,limit=None):
+        """
+        Starts recording spans to the given file.
+
+        If the tracer is already recording, it finishes the old file first.
+
+        :param filename: The file to write
+        :type filename:  ``str``
+
+        :param limit: The number of seconds to record (no limit if None)
+        :type limit:  ``int`` or ``float`` > 0, or None
+        """
+        assert type(filename) == str, 'filename %s is not a string' % repr(filename)
+        assert limit is None or (type(limit) in [int,float] and limit > 0), \
+            'limit %s is not a positive number' % repr(limit)
+        self.stop()
+        file = open(filename,'w')
+        file.write('[\n')
+        self._queue  = queue.Queue()
+        self._writer = threading.Thread(target=self._write,args=(file,self._queue),
+                                        name='game2d-trace',daemon=True)
+        self._writer.start()
+        self._origin = time.perf_counter_ns()
+        self._deadline = None if limit is None else self._origin+int(limit*1e9)
+        self._filename = filename
+        self._events = [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+                         'args': {'name': 'game2d'}}]
+        self._enabled = True
+        if not self._exiting:
+            self._exiting = True
+            atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Stops recording, and finishes writing the file.
+
+        This method waits for the background writer to finish.  It does nothing if the
+        tracer is not recording.
+        """
+        if self._writer is None:
+            return
+        self._enabled = False
+        self._queue.put(self._events)
+        self._queue.put(None)
+        self._writer.join()
+        self._events = []
+        self._queue = None
+        self._writer = None
+        self._filename = None
+
+    def span(self,name,cat='game',args=None):
+        """
+        Returns a context manager that records the block it runs as a span.
+
+        :param name: The name of the span
+        :type name:  ``str``
+
+        :param cat: The category of the span (used to filter spans in the viewer)
+        :type cat:  ``str``
+
+        :param args: Extra values to show with the span
+        :type args:  ``dict`` or None
+        """
+        return _Span(self,name,cat,args)
+
+    def traced(self,name=None,cat='game'):
+        """
+        Returns a decorator that records every call of a function as a span.
+
+        :param name: The name of the span (the qualified name of the function if None)
+        :type name:  ``str`` or None
+
+        :param cat: The category of the span
+        :type cat:  ``str``
+        """
+        def decorator(func):
+            label = func.__qualname__ if name is None else name
+            @functools.wraps(func)
+            def wrapper(*args,**keywords):
+                if not self._enabled:
+                    return func(*args,**keywords)
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args,**keywords)
+                finally:
+                    self.record(label,cat,start,time.perf_counter_ns())
+            return wrapper
+        return decorator
+
+    def record(self,name,cat,start,end,args=None):
+        """
+        Records a span that has already finished.
+
+        :param name: The name of the span
+        :type name:  ``str``
+
+        :param cat: The category of the span
+        :type cat:  ``str``
+
+        :param start: When the span started, from ``time.perf_counter_ns()``
+        :type start:  ``int``
+
+        :param end: When the span ended, from ``time.perf_counter_ns()``
+        :type end:  ``int``
+
+        :param args: Extra values to show with the span
+        :type args:  ``dict`` or None
+        """
+        if not self._enabled:
+            return
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'pid': os.getpid(),
+                 'tid': threading.get_ident(), 'ts': (start-self._origin)/1000.0,
+                 'dur': (end-start)/1000.0}
+        if args:
+            event['args'] = args
+        self._events.append(event)
+        if len(self._events) >= self._chunk:
+            self._queue.put(self._events)
+            self._events = []
+        if self._deadline is not None and end >= self._deadline:
+            self.stop()
+
+    # HIDDEN METHODS
+    def _write(self,file,chunks):
+        """
+        Writes chunks of events to the file until it gets None (on its own thread).
+
+        :param file: The file to write, with the opening bracket already written
+        :type file:  A text file
+
+        :param chunks: The queue of chunks to write
+        :type chunks:  ``queue.Queue`` of lists of events
+        """
+        first = True
+        while True:
+            events = chunks.get()
+            if events is None:
+                break
+            for event in events:
+                if not first:
+                    file.write(',\n')
+                file.write(json.dumps(event))
+                first = False
+        file.write('\n]\n')
+        file.close()
+
+
+class _Span(object):
+    """
+    A context manager recording a block of code as a span.
+    """
+    __slots__ = ('_tracer','_name','_cat','_args','_start')
+
+    def __init__(self,tracer,name,cat,args):
+        """
+        Creates a span for the given tracer.
+        """
+        self._tracer = tracer
+        self._name   = name
+        self._cat    = cat
+        self._args   = args
+        self._start  = 0
+
+    def __enter__(self):
+        """
+        Starts the span.
+        """
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self,kind,value,traceback):
+        """
+        Ends the span, recording it if the tracer is recording.
+        """
+        if self._tracer._enabled:
+            self._tracer.record(self._name,self._cat,self._start,time.perf_counter_ns(),
+                                self._args)
+        return False
+
+
+#: The tracer used by game2d (and by the decorator :func:`traced`)
+TRACER = Tracer()
+
+def traced(name=None,cat='game'):
+    """
+    Returns a decorator that records every call of a function as a span of ``TRACER``.
+
+    :param name: The name of the span (the qualified name of the function if None)
+    :type name:  ``str`` or None
+
+    :param cat: The category of the span
+    :type cat:  ``str``
+    """
+    return TRACER.traced(name,cat)
+
+def span(name,cat='game',args=None):
+    """
+    Returns a context manager that records a block as a span of ``TRACER``.
+
+    :param name: The name of the span
+    :type name:  ``str``
+
+    :param cat: The category of the span
+    :type cat:  ``str``
+
+    :param args: Extra values to show with the span
+    :type args:  ``dict`` or None
+    """
+    return TRACER.span(name,cat,args)
@@ -319,14 +319,58 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    In retained mode, the view does not empty the window canvas at the start of a
+    frame.  It only records what is drawn, and at the end of the frame it compares
+    that with the previous frame.  Objects drawn in both frames stay attached to the
+    canvas, so the canvas is only touched when objects are added or removed, or
+    when the drawing order changes.  You still draw everything every frame, and the
+    result on screen is the same.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
 
+    # MUTABLE ATTRIBUTES
+    @property
+    def retained(self):
+        """
+        Whether this view keeps drawn objects attached between frames.
+
+        Changing this value clears the view.
+
+        **Invariant**: Must be a bool
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        if value != self._retained:
+            self._frame.clear()
+            self._contents.clear()
+            self._count = 0
+            self._drawn = []
+            self._shown = []
+        self._retained = value
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of canvas instructions drawn so far in this frame.
+
+        A drawn object is a group of instructions (such as a transform, a color and a
+        rectangle), and every instruction in the group is counted.
+
+        **Invariant**: Must be an int >= 0
+        """
+        return self._count
+
+
     # BUILT-IN METHODS
-    def __init__(self):
+    def __init__(self,retained=False):
         """
         Creates a new view for display
 
@@ -334,6 +378,9 @@ class GView(FloatLayout):
         window.  That functionality happens behind the scenes with hidden methods.
         You should only use use the object provided in the `view` attribute of
         :class:`GameApp`. See the documentation of that class for more information.
+
+        :param retained: Whether to keep drawn objects attached between frames
+        :type retained:  ``bool``
         """
         FloatLayout.__init__(self)
         self._frame = InstructionGroup()
@@ -341,6 +388,11 @@ class GView(FloatLayout):
         self.bind(size=self._reset)
         self._reset()
         self._contents = set()
+        self._count = 0
+        self._drawn = []
+        self._shown = []
+        self._retained = False
+        self.retained = retained
 
 
     # PUBLIC METHODS
@@ -355,20 +407,63 @@ class GView(FloatLayout):
         :type cmd:  A Kivy graphics command
         """
         if not cmd in self._contents:
-            self._frame.add(cmd)
             self._contents.add(cmd)
+            children = getattr(cmd,'children',None)
+            self._count += 1 if children is None else len(children)
+            if self._retained:
+                self._drawn.append(cmd)
+            else:
+                self._frame.add(cmd)
 
     def clear(self):
         """
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  In
+        retained mode, this only starts recording the next frame; the window keeps
+        its contents until the frame is committed.
         """
-        self._frame.clear()
         self._contents.clear()
+        self._count = 0
+        self._drawn = []
+        if not self._retained:
+            self._frame.clear()
+            self._shown = []
 
     # HIDDEN METHODS
+    def _commit(self):
+        """
+        Updates the canvas to match the objects drawn in this frame (retained mode)
+
+        Objects that were not drawn this frame are removed.  If the objects that are
+        left are still in the same order, the new objects are added at the end.
+        Otherwise the drawing order changed and the canvas is rebuilt.  If nothing
+        changed, the canvas is not touched at all.
+        """
+        if not self._retained:
+            return
+
+        drawn = self._drawn
+        if drawn == self._shown:
+            return
+
+        kept = []
+        for cmd in self._shown:
+            if cmd in self._contents:
+                kept.append(cmd)
+            else:
+                self._frame.remove(cmd)
+
+        if kept == drawn[:len(kept)]:
+            for cmd in drawn[len(kept):]:
+                self._frame.add(cmd)
+        else:
+            self._frame.clear()
+            for cmd in drawn:
+                self._frame.add(cmd)
+        self._shown = drawn
+
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -6,6 +6,7 @@ This classes wrap the Kivy audio interface, making it simpler for students to us
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
+import collections
 from kivy.core.audio import SoundLoader
 from .app import GameApp
 
@@ -21,7 +22,10 @@ class Sound(object):
     
     When a sound is played, it cannot be played again until it finishes, or is stopped.  
     This means that if you want multiple, simultaneous sound effects from the same WAV 
-    file.you will need to create multiple Sound objects.
+    file.you will need to create multiple Sound objects, or use a :class:`SoundPool`.
+    
+    If the file was loaded before the game started (see :attr:`GameApp.progress`), the
+    first sound made from it takes the preloaded copy instead of reading the file.
     """
     # This class is a simply replacement for the built-in Kivy Sound class.  It is a
     # little better with error handling, since GStreamer appears to be quite unreliable.
@@ -78,7 +82,11 @@ class Sound(object):
         from .app import GameApp
         assert GameApp.is_sound(source), 'source %s is not a sound file' % repr(source)
         self._source = source
-        self._sound  = SoundLoader.load(source)
+        preloaded = GameApp.SOUND_CACHE.get(source)
+        if preloaded:
+            self._sound = preloaded.pop()
+        else:
+            self._sound = SoundLoader.load(source)
         if self._sound is None:
             raise IOError('Module game2d cannot read the file %s' % repr(source))
     
@@ -118,6 +126,9 @@ class SoundLibrary(object):
     To play the sound, we access it as follows::
         
         soundlib['soundname'].play()
+    
+    Every sound is loaded as soon as it is assigned, and each can only play once at a
+    time.  For short effects that may overlap, use a :class:`SoundPool` instead.
     """
     
     def __init__(self):
@@ -179,3 +190,247 @@ class SoundLibrary(object):
         :rtype:  ``iterable``
         """
         return self._data.keys()
+
+
+# #mark -
+class SoundPool(object):
+    """
+    A class playing short sound effects that may overlap.
+    
+    A pool maps keys to sound files, like :class:`SoundLibrary`, but each effect is
+    played with a set of ``voices``: copies of the sound that can play at the same time.
+    Playing an effect uses a voice that is not playing; if they are all playing, the
+    voice that started the longest time ago is stopped and used again (voice stealing).
+    So rapid fire never cuts off the latest shot, and never makes new sound objects::
+        
+        effects = SoundPool(voices=4)
+        effects['pew'] = 'pew1.wav'
+        effects.play('pew')
+    
+    Assigning a file does not read it.  An effect is loaded the first time it is played
+    or when :meth:`load` is called (do that in ``start``, so that the game never waits on
+    the disk).  To bound the memory used, at most ``capacity`` effects stay loaded.  When
+    another effect is loaded, the one played least recently is unloaded, and it is
+    loaded again the next time it is played.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def voices(self):
+        """
+        The number of copies of each effect that can play at the same time.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._voices
+    
+    @property
+    def capacity(self):
+        """
+        The most effects that are loaded at the same time.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._capacity
+    
+    @property
+    def loaded(self):
+        """
+        The keys of the loaded effects, from the least to the most recently played.
+        
+        **Invariant**: Must be a tuple of strings.
+        """
+        return tuple(self._loaded)
+    
+    # BUILT-IN METHODS
+    def __init__(self,voices=4,capacity=16):
+        """
+        Creates a new, empty sound pool.
+        
+        :param voices: The number of copies of each effect that can play at once
+        :type voices:  ``int`` > 0
+        
+        :param capacity: The most effects that are loaded at the same time
+        :type capacity:  ``int`` > 0
+        """
+        assert type(voices) == int and voices > 0, 'voices %s is not a positive int' % repr(voices)
+        assert type(capacity) == int and capacity > 0, \
+            'capacity %s is not a positive int' % repr(capacity)
+        self._voices = voices
+        self._capacity = capacity
+        self._files = {}
+        # Key -> [voices, when each voice started], least recently played first
+        self._loaded = collections.OrderedDict()
+        # The number of plays so far, which orders the starts of the voices
+        self._plays = 0
+    
+    def __len__(self):
+        """
+        :return: The number of effects in this pool.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._files)
+    
+    def __contains__(self, key):
+        """
+        :return: True if the pool has an effect for the given key.
+        :rtype:  ``bool``
+        """
+        return key in self._files
+    
+    def __getitem__(self, key):
+        """
+        Accesses the sound file of the given effect.
+        
+        :param key: The key identifying an effect
+        :type key:  ``str``
+        
+        :return: The file name of the effect
+        :rtype:  ``str``
+        """
+        return self._files[key]
+    
+    def __setitem__(self, key, filename):
+        """
+        Assigns a sound file to the given key, without loading it.
+        
+        If the key had another file, the old effect is unloaded.
+        
+        :param key: The key identifying an effect
+        :type key:  ``str``
+        
+        :param filename: The name of the file containing the sound source
+        :type filename:  ``str``
+        """
+        assert GameApp.is_sound(filename), '%s is not a sound file' % repr(filename)
+        if key in self._files:
+            self.unload(key)
+        self._files[key] = filename
+    
+    def __delitem__(self, key):
+        """
+        Deletes (and unloads) the effect for the given key.
+        
+        :param key: The key identifying an effect
+        :type key:  ``str``
+        """
+        self.unload(key)
+        del self._files[key]
+    
+    def __iter__(self):
+        """
+        :return: The iterator for the keys of this pool.
+        :rtype:  ``iterable``
+        """
+        return iter(self._files.keys())
+    
+    # PUBLIC METHODS
+    def keys(self):
+        """
+        :return: The keys for this sound pool.
+        :rtype:  ``iterable``
+        """
+        return self._files.keys()
+    
+    def play(self, key, volume=1.0):
+        """
+        Plays the effect for the given key on a free voice.
+        
+        If every voice of the effect is playing, the one that started the longest time
+        ago is stopped and used.  If the effect is loaded, this method neither reads a
+        file nor makes any new object.
+        
+        :param key: The key identifying an effect
+        :type key:  ``str``
+        
+        :param volume: The volume to play at (1 is full volume, 0 is mute)
+        :type volume:  ``int`` or ``float`` in 0..1
+        """
+        entry = self._loaded.get(key)
+        if entry is None:
+            entry = self._load(key)
+        else:
+            self._loaded.move_to_end(key)
+        voices, starts = entry
+        index = None
+        for pos in range(len(voices)):
+            if voices[pos].state != 'play':
+                index = pos
+                break
+        if index is None:
+            # Steal the voice that started first
+            index = starts.index(min(starts))
+            voices[index].stop()
+        self._plays += 1
+        starts[index] = self._plays
+        voice = voices[index]
+        voice.volume = volume
+        voice.play()
+    
+    def stop(self, key=None):
+        """
+        Stops every voice of the given effect (of every effect if key is None).
+        
+        :param key: The key identifying an effect, or None
+        :type key:  ``str`` or None
+        """
+        keys = list(self._loaded) if key is None else [key]
+        for name in keys:
+            if name in self._loaded:
+                for voice in self._loaded[name][0]:
+                    voice.stop()
+    
+    def load(self, *keys):
+        """
+        Loads the effects for the given keys (every effect if no key is given).
+        
+        Loading more effects than the capacity unloads the ones played least recently.
+        
+        :param keys: The keys identifying effects
+        :type keys:  ``str``
+        """
+        for key in (keys or list(self._files)):
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+            else:
+                self._load(key)
+    
+    def unload(self, key):
+        """
+        Stops and unloads the voices of the given effect, if it is loaded.
+        
+        The effect stays in the pool, and is loaded again the next time it is played.
+        
+        :param key: The key identifying an effect
+        :type key:  ``str``
+        """
+        entry = self._loaded.pop(key,None)
+        if entry is not None:
+            for voice in entry[0]:
+                voice.stop()
+                voice.unload()
+    
+    # HIDDEN METHODS
+    def _load(self, key):
+        """
+        Returns the new entry of a loaded effect, unloading effects over the capacity.
+        
+        Sounds preloaded by :class:`GameApp` (see :attr:`GameApp.progress`) are used
+        before any file is read.
+        
+        :param key: The key identifying an effect
+        :type key:  ``str``
+        """
+        filename = self._files[key]
+        while len(self._loaded) >= self._capacity:
+            self.unload(next(iter(self._loaded)))
+        preloaded = GameApp.SOUND_CACHE.get(filename,[])
+        voices = []
+        for _ in range(self._voices):
+            voice = preloaded.pop() if preloaded else SoundLoader.load(filename)
+            if voice is None:
+                raise IOError('Module game2d cannot read the file %s' % repr(filename))
+            voices.append(voice)
+        entry = [voices,[0]*len(voices)]
+        self._loaded[key] = entry
+        return entry
@@ -0,0 +1,173 @@
+"""
+Headless support module for Alien Invaders
+
+This module lets a Wave run without a kivy window. The models in models.py
+only create their game2d views when they are drawn, so a Wave that is never
+drawn is plain game state. All it needs is an input object, which GameApp
+normally provides. ScriptedInput stands in for GInput and replays a script
+of held keys, one entry per animation frame.
+
+To play a wave with no rendering, use
+
+    wave = Wave()
+    frames = run_wave(wave, ScriptedInput([('right','spacebar')]*600))
+
+This is meant for batch jobs and tests, where thousands of waves need to
+run as fast as the CPU allows.
+
+Every wave records its input in a Trace (see replay.py). To play a recorded
+wave again, as fast as possible, and check that it ended the same way, use
+
+    trace = wave.get_trace()
+    again = play_trace(trace)
+    assert again.get_state() == trace.outcome
+
+# Avery Avila - aha68
+# Neil Gidwani - nsg67
+# 12/7/21
+"""
+from wave import *
+
+# PRIMARY RULE: This module only drives Wave through its public methods, the
+# same way Invaders does. It never draws anything.
+
+
+class ScriptedInput(object):
+    """
+    A class to replace GInput when there is no window.
+
+    The input is a script: a sequence with one entry per animation frame.
+    Each entry is a collection of the key names (as used by GInput) that are
+    held down during that frame. Once the script runs out, no keys are held.
+
+    Wave only uses the method is_key_down, but key_count and keys are
+    provided as well so this class can stand in for GInput anywhere.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _script: the keys held down in each frame
+    # Invariant: _script is a list of frozensets of strings
+    #
+    # Attribute _frame: the index of the current frame in the script
+    # Invariant: _frame is an int >= 0
+
+    # GETTERS AND SETTERS
+    @property
+    def key_count(self):
+        """
+        The number of keys currently held down.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._held())
+
+    @property
+    def keys(self):
+        """
+        The keys that are currently held down.
+
+        **Invariant**: Must be a tuple of strings (possibly empty)
+        """
+        return tuple(self._held())
+
+    @property
+    def frame(self):
+        """
+        The index of the current frame in the script.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frame
+
+    # INITIALIZER
+    def __init__(self,script=()):
+        """
+        Initializes a scripted input
+
+        Parameter script: the keys held down in each frame
+        Precondition: script is a sequence of collections of key names
+        """
+        self._script = [frozenset(keys) for keys in script]
+        self._frame = 0
+
+    # PUBLIC METHODS
+    def is_key_down(self,key):
+        """
+        Returns True if key is held down in the current frame
+
+        Parameter key: the key to test
+        Precondition: key is a string
+        """
+        return key in self._held()
+
+    def advance(self):
+        """
+        Moves the script forward to the next frame
+        """
+        self._frame += 1
+
+    # HIDDEN METHODS
+    def _held(self):
+        """
+        Returns the set of keys held down in the current frame
+        """
+        if self._frame < len(self._script):
+            return self._script[self._frame]
+        return frozenset()
+
+
+def run_wave(wave,input,dt=None,max_frames=None):
+    """
+    Returns the number of frames it took to finish the wave
+
+    This method updates the wave once per frame, advancing the script after
+    every update, until the wave is over or max_frames have been played.
+    Unlike Invaders, it never pauses when the ship is destroyed; the ship is
+    revived on the next frame.
+
+    Parameter wave: the wave to play
+    Precondition: wave is a Wave object
+
+    Parameter input: the scripted input for the wave
+    Precondition: input is a ScriptedInput object
+
+    Parameter dt: the time of each animation frame (the frame_time of the
+    wave config if None)
+    Precondition: dt is a float > 0 or None
+
+    Parameter max_frames: the most frames to play (no limit if None)
+    Precondition: max_frames is an int >= 0 or None
+    """
+    if dt is None:
+        dt = wave.get_config().frame_time
+    frames = 0
+    while not wave.is_game_over():
+        if max_frames is not None and frames >= max_frames:
+            break
+        wave.update(input, dt)
+        input.advance()
+        frames += 1
+    return frames
+
+
+def play_trace(trace,check=False):
+    """
+    Returns a new wave that has played every frame of trace
+
+    The wave is made with the seed and config of the trace and updated once
+    for each frame, with the keys and frame time that were recorded, so it
+    ends in the same state as the recorded wave.
+
+    Parameter trace: the trace to play back
+    Precondition: trace is a Trace object
+
+    Parameter check: whether to check the final state against the outcome
+    Precondition: check is a bool, and if True the trace has an outcome
+    """
+    wave = Wave(trace.seed, trace.config)
+    input = ScriptedInput(trace.script())
+    for dt in trace.times():
+        wave.update(input, dt)
+        input.advance()
+    if check:
+        assert wave.get_state() == trace.outcome, 'playback did not match trace'
+    return wave
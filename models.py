@@ -26,16 +26,141 @@ about whether to make a new class or not, please ask on Piazza.
 # Neil Gidwani - nsg67
 # 12/7/21
 """
-from consts import *
-from game2d import *
+import game2d
+import numpy as np
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other
-# than consts.py.  If you need extra information from Gameplay, then it should
-# be a parameter in your method, and Wave should pass it as a argument when it
-# calls the method.
+# than consts.py and config.py.  If you need extra information from Gameplay,
+# then it should be a parameter in your method, and Wave should pass it as a
+# argument when it calls the method.  The sizes and speeds of the models come
+# from the GameConfig that Wave passes to their initializers.
 
 
-class Ship(GSprite):
+class Model(object):
+    """
+    A class to represent the plain state of an object on screen.
+
+    A model is only a rectangle (center x, y, width and height) plus an
+    animation frame. It does not create any kivy graphics, so a Wave made
+    of models can be updated without a window (see headless.py). The first
+    time a model is drawn, the draw method of its subclass builds its game2d
+    view, and from then on it copies its state into that view before every
+    draw.
+    That way the rendered game and a headless game share the same state.
+
+    A model also remembers where it was before the last update (see
+    save_position), so that it can be drawn part of the way between its
+    previous and current positions. This keeps motion smooth when the game
+    is drawn more often than it is updated.
+
+    Models use __slots__, so they are small and quick to create.
+    """
+    __slots__ = ('x','y','px','py','width','height','frame','_view')
+
+    # INSTANCE ATTRIBUTES:
+    # Attribute x: the x coordinate of the center
+    # Invariant: x is an int or float
+    #
+    # Attribute y: the y coordinate of the center
+    # Invariant: y is an int or float
+    #
+    # Attribute px: the x coordinate of the center before the last update
+    # Invariant: px is an int or float
+    #
+    # Attribute py: the y coordinate of the center before the last update
+    # Invariant: py is an int or float
+    #
+    # Attribute width: the width of the model
+    # Invariant: width is an int or float > 0
+    #
+    # Attribute height: the height of the model
+    # Invariant: height is an int or float > 0
+    #
+    # Attribute frame: the current animation frame
+    # Invariant: frame is an int >= 0
+    #
+    # Attribute _view: the game2d object that draws this model
+    # Invariant: _view is a GObject, or None if it was never drawn
+
+    def __init__(self,curr_x,curr_y,width,height):
+        """
+        Initializes a model at the given location
+
+        Parameter curr_x: the starting x coordinate
+        Precondition: x is a number (int or float)
+
+        Parameter curr_y: the starting y coordinate
+        Precondition: y is a number (int or float)
+
+        Parameter width: the width of the model
+        Precondition: width is a number (int or float) > 0
+
+        Parameter height: the height of the model
+        Precondition: height is a number (int or float) > 0
+        """
+        self.x = curr_x
+        self.y = curr_y
+        self.px = curr_x
+        self.py = curr_y
+        self.width = width
+        self.height = height
+        self.frame = 0
+        self._view = None
+
+    def contains(self,point):
+        """
+        Returns True if this model contains the point
+
+        This is the same bounding box check as GObject.contains
+
+        Parameter point: the point to check
+        Precondition: point is a pair of numbers
+        """
+        return (abs(point[0]-self.x) < self.width/2.0 and
+                abs(point[1]-self.y) < self.height/2.0)
+
+    def save_position(self):
+        """
+        Remembers the current position as the position before the update
+
+        Call this method before moving the model in an update.
+        """
+        self.px = self.x
+        self.py = self.y
+
+    def draw(self,view,alpha=1.0):
+        """
+        Draws the view of this model
+
+        The model is drawn at the fraction alpha of the way from its
+        previous position to its current one. Subclasses create their view
+        the first time they are drawn, and then call this method.
+
+        Parameter view: the game view, used in drawing
+        Precondition: view is an instance of GView
+
+        Parameter alpha: how far to go from the previous position
+        Precondition: alpha is a float in 0..1; _view is not None
+        """
+        self._sync_view(alpha)
+        self._view.draw(view)
+
+    def _sync_view(self,alpha=1.0):
+        """
+        Copies the position of this model into its view
+
+        Parameter alpha: how far to go from the previous position
+        Precondition: alpha is a float in 0..1
+        """
+        if alpha >= 1:
+            self._view.x = self.x
+            self._view.y = self.y
+        else:
+            self._view.x = self.px + alpha*(self.x-self.px)
+            self._view.y = self.py + alpha*(self.y-self.py)
+
+
+class Ship(Model):
     """
     A class to represent the game ship.
 
@@ -54,17 +179,20 @@ class Ship(GSprite):
     And Aliens collide with Ship bolts, not Alien bolts. An easy way to
     keep this straight is for this class to have its own collision method.
 
-    However, there is no need for any more attributes other than those
-    inherited by GImage. You would only add attributes if you needed them
-    for extra gameplay features (like animation).
+    The ship is drawn with a GSprite of the ship image, whose frame follows
+    the frame attribute of this model.
     """
+    __slots__ = ('_config',)
+
     #  IF YOU ADD ATTRIBUTES, LIST THEM BELOW
+    # Attribute _config: the settings of the game
+    # Invariant: _config is a GameConfig
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
 
     # INITIALIZER TO CREATE A NEW SHIP
 
-    def __init__(self,curr_x,curr_y):
+    def __init__(self,curr_x,curr_y,config):
         """
         Initializes a Ship at the given location
 
@@ -74,13 +202,11 @@ class Ship(GSprite):
         Parameter curr_y: the starting y coordinate
         Precondition: y is a number (int or float)
 
-        Parameter source: the .png image of the ship
-        Precondition: source is a string that references a .png file
-        inside of invaders
+        Parameter config: the settings of the game
+        Precondition: config is a GameConfig
         """
-        super().__init__(x = curr_x,y = curr_y, width = SHIP_WIDTH,
-                        height = SHIP_HEIGHT, source = SHIP_IMAGE,
-                        format = (2,4))
+        super().__init__(curr_x,curr_y,config.ship_width,config.ship_height)
+        self._config = config
 
     # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
     def collides(self,bolt):
@@ -96,10 +222,12 @@ class Ship(GSprite):
         if not isinstance(bolt, Bolt):
             return False
         #corners goes ((top left),(top right), (bottom left), (bottom right))
-        corners =  ((bolt.x - BOLT_WIDTH//2, bolt.y + BOLT_HEIGHT//2),
-                    (bolt.x + BOLT_WIDTH//2, bolt.y + BOLT_HEIGHT//2),
-                    (bolt.x + BOLT_WIDTH//2, bolt.y - BOLT_HEIGHT//2),
-                    (bolt.x - BOLT_WIDTH//2, bolt.y - BOLT_HEIGHT//2))
+        half_w = bolt.width//2
+        half_h = bolt.height//2
+        corners =  ((bolt.x - half_w, bolt.y + half_h),
+                    (bolt.x + half_w, bolt.y + half_h),
+                    (bolt.x + half_w, bolt.y - half_h),
+                    (bolt.x - half_w, bolt.y - half_h))
         contain = False
         for point in corners:
             if self.contains(point):
@@ -109,97 +237,429 @@ class Ship(GSprite):
     # COROUTINE METHOD TO ANIMATE THE SHIP
 
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
+    def draw(self,view,alpha=1.0):
+        """
+        Draws this ship, creating its GSprite the first time
 
+        Parameter view: the game view, used in drawing
+        Precondition: view is an instance of GView
 
-class Alien(GImage):
-    """
-    A class to represent a single alien.
+        Parameter alpha: how far to go from the previous position
+        Precondition: alpha is a float in 0..1
+        """
+        if self._view is None:
+            self._view = game2d.GSprite(x = self.x,y = self.y,
+                        width = self.width, height = self.height,
+                        source = self._config.ship_image, format = (2,4))
+        super().draw(view,alpha)
 
-    At the very least, you want a __init__ method to initialize the alien
-    dimensions. These dimensions are all specified in consts.py.
+    def _sync_view(self,alpha=1.0):
+        """
+        Copies the position and frame of this ship into its view
+
+        Parameter alpha: how far to go from the previous position
+        Precondition: alpha is a float in 0..1
+        """
+        super()._sync_view(alpha)
+        self._view.frame = self.frame
 
-    You also MIGHT want to add code to detect a collision with a bolt. We
-    do not require this.  You could put this method in Wave if you wanted to.
-    But the advantage of putting it here is that Ships and Aliens collide
-    with different bolts.  Ships collide with Alien bolts, not Ship bolts.
-    And Aliens collide with Ship bolts, not Alien bolts. An easy way to
-    keep this straight is for this class to have its own collision method.
 
-    However, there is no need for any more attributes other than those
-    inherited by GImage. You would only add attributes if you needed them
-    for extra gameplay features (like giving each alien a score value).
+class Formation(object):
     """
-    #  IF YOU ADD ATTRIBUTES, LIST THEM BELOW
+    A class to represent the whole grid of aliens as one object.
+
+    The aliens always form a regular lattice that moves as a rigid body.
+    So the formation only stores the center of the bottom left cell (the
+    origin), the distance between two columns and two rows (the step), and
+    a NumPy array saying which cells still have an alien. The center of the
+    alien at (row, col) is origin + (col*h_step, row*v_step). Marching the
+    formation only moves the origin, and destroying an alien is a single
+    write to the alive array. Row 0 is the bottom row and column 0 is the
+    left column.
+
+    Because the lattice is regular, the cell under any point can be found
+    by arithmetic on its offset from the origin. Collisions use this to
+    test each bolt against the cell it is over and that cell's neighbours,
+    without looking at the rest of the grid.
+
+    The formation also keeps track of how many aliens are left in each row
+    and column, the leftmost and rightmost columns with an alien, the lowest
+    row with an alien and the bottom alien of every column. These are all
+    updated when an alien is destroyed, so none of the queries below ever
+    have to scan the grid.
+
+    The formation is drawn with a single SpriteBatch, which is created the
+    first time the formation is drawn. Every cell has an image in the batch
+    and the images of destroyed aliens are hidden. The batch only rewrites
+    its vertices when the formation has moved or lost an alien.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _origin: the center of the bottom left cell
+    # Invariant: _origin is a float array of shape (2,) in (x, y)
+    #
+    # Attribute _step: the distance between the centers of neighbour cells
+    # Invariant: _step is a float array of shape (2,) in (x, y), each
+    # at least the alien size plus the bolt size, halved
+    #
+    # Attribute _alive: which cells still have an alien
+    # Invariant: _alive is a bool array of shape (rows, cols)
+    #
+    # Attribute _count: the number of aliens left
+    # Invariant: _count is an int >= 0, the number of True cells in _alive
+    #
+    # Attribute _row_count: the number of aliens left in each row
+    # Invariant: _row_count is an int array of shape (rows,)
+    #
+    # Attribute _col_count: the number of aliens left in each column
+    # Invariant: _col_count is an int array of shape (cols,)
+    #
+    # Attribute _left: the leftmost column with an alien
+    # Invariant: _left is an int in 0..cols (cols if the formation is empty)
+    #
+    # Attribute _right: the rightmost column with an alien
+    # Invariant: _right is an int in -1..cols-1 (-1 if the formation is empty)
+    #
+    # Attribute _low: the lowest row with an alien
+    # Invariant: _low is an int in 0..rows (rows if the formation is empty)
+    #
+    # Attribute _bottom: the row of the bottom alien of each column
+    # Invariant: _bottom is an int array of shape (cols,), holding rows for
+    # an empty column
+    #
+    # Attribute _shooters: the columns with an alien, in no particular order
+    # Invariant: _shooters is a list of ints, the columns with _col_count > 0
+    #
+    # Attribute _slot: the index of each column in _shooters
+    # Invariant: _slot[col] is the index of col in _shooters (if it is there)
+    #
+    # Attribute _config: the settings of the game
+    # Invariant: _config is a GameConfig
+    #
+    # Attribute _batch: the images used to draw each cell, in row-major order
+    # Invariant: _batch is a SpriteBatch, or None if the formation was never
+    # drawn
+
+    # GETTERS AND SETTERS
+    @property
+    def rows(self):
+        """
+        The number of rows in this formation
 
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+        **Invariant**: Must be an int > 0
+        """
+        return self._alive.shape[0]
 
-    # INITIALIZER TO CREATE AN ALIEN
-    def __init__(self,curr_x,curr_y,source):
+    @property
+    def cols(self):
         """
-        Initializes a Alien at the given location
+        The number of columns in this formation
 
-        Parameter curr_x: the starting x coordinate
-        Precondition: x is a number (int or float)
+        **Invariant**: Must be an int > 0
+        """
+        return self._alive.shape[1]
 
-        Parameter curr_y: the starting y coordinate
-        Precondition: y is a number (int or float)
+    @property
+    def origin(self):
+        """
+        The center (x, y) of the bottom left cell of this formation
 
-        Parameter source: the .png image of the alien
-        Precondition: source is a string that references a .png file
-        inside of invaders
+        The cell does not need to have a living alien in it.
+
+        **Invariant**: Must be a pair of floats
         """
-        super().__init__(x = curr_x,y = curr_y, width = ALIEN_WIDTH,
-                        height = ALIEN_HEIGHT, source = source)
+        return (float(self._origin[0]),float(self._origin[1]))
 
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def collides(self,bolt):
+    @property
+    def count(self):
         """
-        Returns True if the player bolt collides with this ship
+        The number of aliens left in this formation
 
-        This method returns False if bolt was not fired by the player.
+        **Invariant**: Must be an int >= 0
+        """
+        return self._count
 
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
+    @property
+    def shooters(self):
         """
-        #i took this from the assignment instructions
-        if not isinstance(bolt, Bolt):
-            return False
-        #corners goes ((top left),(top right), (bottom left), (bottom right))
-        corners =  ((bolt.x - BOLT_WIDTH//2, bolt.y + BOLT_HEIGHT//2),
-                    (bolt.x + BOLT_WIDTH//2, bolt.y + BOLT_HEIGHT//2),
-                    (bolt.x + BOLT_WIDTH//2, bolt.y - BOLT_HEIGHT//2),
-                    (bolt.x - BOLT_WIDTH//2, bolt.y - BOLT_HEIGHT//2))
-        contain = False
-        for point in corners:
-            if self.contains(point):
-                contain = True
-        return contain
+        The number of columns that still have an alien to fire a bolt
 
-    # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
+        **Invariant**: Must be an int >= 0
+        """
+        return len(self._shooters)
+
+    # INITIALIZER
+    def __init__(self,config):
+        """
+        Initializes a full formation of aliens at its starting position
+
+        The size, layout and images of the formation all come from config.
+
+        Parameter config: the settings of the game
+        Precondition: config is a GameConfig
+        """
+        rows = config.alien_rows
+        cols = config.aliens_in_row
+        self._config = config
+        self._origin = np.array([config.alien_x,config.alien_y],dtype=float)
+        self._step = np.array([config.alien_h_step,config.alien_v_step],dtype=float)
+        self._alive = np.ones((rows,cols),dtype=bool)
+        self._count = rows*cols
+        self._row_count = np.full(rows,cols)
+        self._col_count = np.full(cols,rows)
+        self._left = 0
+        self._right = cols-1
+        self._low = 0
+        self._bottom = np.zeros(cols,dtype=int)
+        self._shooters = list(range(cols))
+        self._slot = list(range(cols))
+        self._batch = None
+
+    # PUBLIC METHODS
+    def march(self,dx,dy):
+        """
+        Moves every alien in the formation by (dx, dy)
+
+        Parameter dx: the horizontal distance to move
+        Precondition: dx is a number (int or float)
+
+        Parameter dy: the vertical distance to move
+        Precondition: dy is a number (int or float)
+        """
+        self._origin += (dx,dy)
+
+    def kill(self,row,col):
+        """
+        Destroys the alien in the given cell
+
+        This method updates the counts and bounds of the formation. Moving a
+        bound past empty rows or columns is paid for once per row or column,
+        so it is O(1) over the life of the formation.
+
+        Parameter row: the row of the alien
+        Precondition: row is an int in 0..rows-1 and the cell has an alien
+
+        Parameter col: the column of the alien
+        Precondition: col is an int in 0..cols-1 and the cell has an alien
+        """
+        self._alive[row,col] = False
+        self._count -= 1
+        self._row_count[row] -= 1
+        self._col_count[col] -= 1
+
+        if self._bottom[col] == row:
+            while (self._bottom[col] < self.rows and
+                   not self._alive[self._bottom[col],col]):
+                self._bottom[col] += 1
+
+        if self._col_count[col] == 0:
+            # Swap the column out of the shooters
+            last = self._shooters.pop()
+            if last != col:
+                self._shooters[self._slot[col]] = last
+                self._slot[last] = self._slot[col]
+            while self._left < self.cols and self._col_count[self._left] == 0:
+                self._left += 1
+            while self._right >= 0 and self._col_count[self._right] == 0:
+                self._right -= 1
+
+        while self._low < self.rows and self._row_count[self._low] == 0:
+            self._low += 1
+
+    def is_alive(self,row,col):
+        """
+        Returns True if the given cell still has an alien
+
+        Parameter row: the row of the cell
+        Precondition: row is an int in 0..rows-1
+
+        Parameter col: the column of the cell
+        Precondition: col is an int in 0..cols-1
+        """
+        return bool(self._alive[row,col])
+
+    def position(self,row,col):
+        """
+        Returns the center (x, y) of the given cell
 
+        Parameter row: the row of the cell
+        Precondition: row is an int in 0..rows-1
 
-class Bolt(GRectangle):
+        Parameter col: the column of the cell
+        Precondition: col is an int in 0..cols-1
+        """
+        return (float(self._origin[0]+col*self._step[0]),
+                float(self._origin[1]+row*self._step[1]))
+
+    def is_empty(self):
+        """
+        Returns True if every alien in the formation is destroyed
+        """
+        return self._count == 0
+
+    def rightmost(self):
+        """
+        Returns the x coordinate of the right edge of the rightmost alien
+
+        Returns 0 if the formation is empty.
+        """
+        if self._count == 0:
+            return 0
+        return self.position(0,self._right)[0] + self._config.alien_width//2
+
+    def leftmost(self):
+        """
+        Returns the x coordinate of the left edge of the leftmost alien
+
+        Returns the width of the game if the formation is empty.
+        """
+        if self._count == 0:
+            return self._config.game_width
+        return self.position(0,self._left)[0] - self._config.alien_width//2
+
+    def bottom(self):
+        """
+        Returns the y coordinate of the bottom edge of the lowest alien
+
+        Returns the height of the game if the formation is empty.
+        """
+        if self._count == 0:
+            return self._config.game_height
+        return self.position(self._low,0)[1] - self._config.alien_height//2
+
+    def lowest(self,col):
+        """
+        Returns the row of the lowest alien in the given column
+
+        Returns None if the column is empty.
+
+        Parameter col: the column to search
+        Precondition: col is an int in 0..cols-1
+        """
+        if self._col_count[col] == 0:
+            return None
+        return int(self._bottom[col])
+
+    def shooter(self,index):
+        """
+        Returns the (row, col) of the bottom alien of a column with aliens
+
+        The columns with aliens are numbered 0..shooters-1 in no particular
+        order, so a random index picks a random column that can fire.
+
+        Parameter index: the number of the column
+        Precondition: index is an int in 0..shooters-1
+        """
+        col = self._shooters[index]
+        return (int(self._bottom[col]),col)
+
+    def hits(self,xs,ys):
+        """
+        Returns the aliens hit by a group of bolts as a list of triples
+
+        Each triple is (i, row, col), meaning that the bolt at (xs[i], ys[i])
+        destroys the alien at (row, col). The formation itself is not changed.
+
+        The cell under each bolt is computed from its offset to the origin.
+        Only that cell and its eight neighbours are tested exactly, which is
+        enough because the step is at least the reach of a bolt into a cell.
+        So the cost depends on the number of bolts, not of aliens.
+
+        The result is the same as checking the bolts one at a time in order:
+        a bolt hits the first alien it touches (from the bottom row up and
+        from left to right), and an alien hit by an earlier bolt can no
+        longer be hit by a later one.
+
+        A bolt hits an alien if any corner of the bolt is inside the alien.
+        As a bolt is smaller than an alien, this is true exactly when the
+        two boxes overlap.
+
+        Parameter xs: the x coordinates of the bolt centers
+        Precondition: xs is a 1d float array
+
+        Parameter ys: the y coordinates of the bolt centers
+        Precondition: ys is a 1d float array with the same length as xs
+        """
+        # Skip the bolts above or below the grid, usually all of them
+        reach_x = self._config.alien_reach_x
+        reach_y = self._config.alien_reach_y
+        low = self._origin[1] - reach_y
+        high = self._origin[1] + (self.rows-1)*self._step[1] + reach_y
+        near = np.flatnonzero((ys > low) & (ys < high))
+        if len(near) == 0:
+            return []
+        xs, ys = xs[near], ys[near]
+
+        # The nearest cell to each bolt, then its 3x3 block in row-major order
+        col = np.floor((xs-self._origin[0])/self._step[0]+0.5).astype(int)
+        row = np.floor((ys-self._origin[1])/self._step[1]+0.5).astype(int)
+        rows = row[:,np.newaxis] + _NEIGHBOR_ROWS
+        cols = col[:,np.newaxis] + _NEIGHBOR_COLS
+
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        near_x = np.abs(self._origin[0]+cols*self._step[0]-xs[:,np.newaxis]) < reach_x
+        near_y = np.abs(self._origin[1]+rows*self._step[1]-ys[:,np.newaxis]) < reach_y
+        touch = inside & near_x & near_y
+        touch[inside] &= self._alive[rows[inside],cols[inside]]
+
+        result = []
+        taken = set()
+        for i in np.flatnonzero(touch.any(axis=1)):
+            for j in np.flatnonzero(touch[i]):
+                cell = (int(rows[i,j]),int(cols[i,j]))
+                if cell not in taken:
+                    taken.add(cell)
+                    result.append((int(near[i]),)+cell)
+                    break
+        return result
+
+    def draw(self,view):
+        """
+        Draws every alien that is still alive
+
+        Parameter view: the game view, used in drawing
+        Precondition: view is an instance of GView
+        """
+        if self._batch is None:
+            sources = self._config.alien_sources
+            self._batch = game2d.SpriteBatch([sources[row]
+                                              for row in range(self.rows)
+                                              for col in range(self.cols)])
+        xs = self._origin[0] + self._step[0]*np.arange(self.cols)
+        ys = self._origin[1] + self._step[1]*np.arange(self.rows)
+        self._batch.update(np.tile(xs,self.rows),np.repeat(ys,self.cols),
+                           self._config.alien_width,self._config.alien_height,
+                           self._alive.ravel())
+        self._batch.draw(view)
+
+
+# The offsets of a cell and its neighbours, bottom row first (see hits)
+_NEIGHBOR_ROWS = np.repeat([-1,0,1],3)
+_NEIGHBOR_COLS = np.tile([-1,0,1],3)
+
+
+class Bolt(Model):
     """
     A class representing a laser bolt.
 
     Laser bolts are often just thin, white rectangles. The size of the bolt
-    is determined by constants in consts.py. We MUST subclass GRectangle,
-    because we need to add an extra (hidden) attribute for the velocity of
-    the bolt.
+    is determined by constants in consts.py. The bolt is drawn with a
+    GRectangle, but the bolt itself only needs an extra (hidden) attribute
+    for the velocity of the bolt.
 
     The class Wave will need to look at these attributes, so you will need
     getters for them.  However, it is possible to write this assignment with
     no setters for the velocities.  That is because the velocity is fixed and
     cannot change once the bolt is fired.
 
-    In addition to the getters, you need to write the __init__ method to set
-    the starting velocity. This __init__ method will need to call the __init__
-    from GRectangle as a  helper.
-
     You also MIGHT want to create a method to move the bolt.  You move the
     bolt by adding the velocity to the y-position.  However, the getter
     allows Wave to do this on its own, so this method is not required.
+
+    Bolts are meant to be reused through a BoltPool rather than created for
+    every shot, so that a recycled bolt keeps its view.
     """
+    __slots__ = ('_velocity','_player_bolt','_config')
+
     # INSTANCE ATTRIBUTES:
     # Attribute _velocity: the velocity in y direction
     # Invariant: _velocity is an int or float
@@ -207,6 +667,9 @@ class Bolt(GRectangle):
     # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     # Attribute _player_bolt: describes if the bolt was fired by a player
     # Invariant: _player_bolt is a bool
+    #
+    # Attribute _config: the settings of the game
+    # Invariant: _config is a GameConfig
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def setVelocity(self,direction):
@@ -220,14 +683,14 @@ class Bolt(GRectangle):
         Precondition: direction is a string
         """
         if direction == 'up':
-            self._velocity = BOLT_SPEED
+            self._velocity = self._config.bolt_speed
             self._player_bolt = True
         elif direction == 'down':
-            self._velocity = 0 - BOLT_SPEED
+            self._velocity = 0 - self._config.bolt_speed
             self._player_bolt = False
 
     # INITIALIZER TO SET THE VELOCITY
-    def __init__(self, curr_x, curr_y, direction):
+    def __init__(self, curr_x, curr_y, direction, config):
         """
         Initializes a bolt at the given location
 
@@ -239,10 +702,12 @@ class Bolt(GRectangle):
 
         Parameter direction: the direction of the bolt
         Precondition: direction is a string
+
+        Parameter config: the settings of the game
+        Precondition: config is a GameConfig
         """
-        super().__init__(x = curr_x, y = curr_y, width = BOLT_WIDTH,
-                        height = BOLT_HEIGHT, linecolor = 'black',
-                        fillcolor = 'magenta')
+        super().__init__(curr_x,curr_y,config.bolt_width,config.bolt_height)
+        self._config = config
         self.setVelocity(direction)
 
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
@@ -255,39 +720,179 @@ class Bolt(GRectangle):
         #i took this from the assignment instructions
         return self._player_bolt
 
-    def update_pos(self):
+    def update_pos(self,dt=None):
         """
         Updates the position of the bolt
 
-        This method only updates the y position of the bolt by _velocity
+        This method only updates the y position of the bolt. It moves by
+        _velocity every frame_time seconds (see GameConfig), so the bolt
+        has the same speed at any frame rate.
+
+        Parameter dt: The time since the last animation frame (one
+        frame_time if None)
+        Precondition: dt is a float > 0 or None
         """
-        self.y += self._velocity
+        frame_time = self._config.frame_time
+        if dt is None:
+            dt = frame_time
+        self.save_position()
+        self.y += self._velocity*(dt/frame_time)
 
     def is_gone(self):
         """
         Returns True if the bolt goes beyond the boundary of the game
 
-        The bolt needs to be between the GAME_HEIGHT and 0
+        The bolt needs to be between the height of the game and 0
         """
         #i took this from pyro.py in samples
-        high = (self.y + BOLT_HEIGHT//2)
-        low = (self.y - BOLT_HEIGHT//2)
-        if high > GAME_HEIGHT or low < 0:
+        high = (self.y + self.height//2)
+        low = (self.y - self.height//2)
+        if high > self._config.game_height or low < 0:
             return True
         return False
 
+    def draw(self,view,alpha=1.0):
+        """
+        Draws this bolt, creating its GRectangle the first time
+
+        Parameter view: the game view, used in drawing
+        Precondition: view is an instance of GView
+
+        Parameter alpha: how far to go from the previous position
+        Precondition: alpha is a float in 0..1
+        """
+        if self._view is None:
+            self._view = game2d.GRectangle(x = self.x, y = self.y,
+                        width = self.width, height = self.height,
+                        linecolor = 'black', fillcolor = 'magenta')
+        super().draw(view,alpha)
+
+
+class BoltPool(object):
+    """
+    A class to represent the laser bolts on screen.
+
+    A pool acts like a list of the live bolts (it supports len, indexing
+    and iteration), but it never lets go of a bolt. When a bolt is removed,
+    it is moved past the end of the live bolts and reused by the next call
+    to fire, together with the view it was drawn with. So once the pool
+    has grown to the most bolts on screen at a time, firing a bolt does not
+    create any objects.
+
+    Removing a bolt moves the last live bolt into its place (swap-remove),
+    so it costs O(1) but changes the order of the bolts. To remove several
+    bolts in one pass, go through the indices from the back.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _bolts: every bolt ever created by this pool
+    # Invariant: _bolts is a list of Bolt objects
+    #
+    # Attribute _count: the number of live bolts
+    # Invariant: _count is an int in 0..len(_bolts); the live bolts are the
+    # first _count bolts in _bolts
+    #
+    # Attribute _config: the settings of the game, for new bolts
+    # Invariant: _config is a GameConfig
+
+    def __init__(self,config):
+        """
+        Initializes an empty pool of bolts
+
+        Parameter config: the settings of the game
+        Precondition: config is a GameConfig
+        """
+        self._bolts = []
+        self._count = 0
+        self._config = config
+
+    def __len__(self):
+        """
+        Returns the number of live bolts
+        """
+        return self._count
+
+    def __getitem__(self,index):
+        """
+        Returns the live bolt at the given index
+
+        Parameter index: the index of the bolt
+        Precondition: index is an int in 0..len(self)-1
+        """
+        assert 0 <= index < self._count, '%s is not a live bolt' % repr(index)
+        return self._bolts[index]
+
+    def __iter__(self):
+        """
+        Returns an iterator over the live bolts
+        """
+        for i in range(self._count):
+            yield self._bolts[i]
+
+    def fire(self,curr_x,curr_y,direction):
+        """
+        Adds a live bolt at the given location, reusing a dead one if it can
+
+        Parameter curr_x: the starting x coordinate
+        Precondition: x is a number (int or float)
+
+        Parameter curr_y: the starting y coordinate
+        Precondition: y is a number (int or float)
+
+        Parameter direction: the direction of the bolt
+        Precondition: direction is a string
+        """
+        if self._count == len(self._bolts):
+            self._bolts.append(Bolt(curr_x,curr_y,direction,self._config))
+        else:
+            bolt = self._bolts[self._count]
+            bolt.x = curr_x
+            bolt.y = curr_y
+            bolt.save_position()
+            bolt.setVelocity(direction)
+        self._count += 1
+
+    def remove(self,index):
+        """
+        Removes the live bolt at the given index
+
+        The last live bolt takes its place.
+
+        Parameter index: the index of the bolt
+        Precondition: index is an int in 0..len(self)-1
+        """
+        assert 0 <= index < self._count, '%s is not a live bolt' % repr(index)
+        self._count -= 1
+        last = self._count
+        if index != last:
+            bolts = self._bolts
+            bolts[index], bolts[last] = bolts[last], bolts[index]
+
+    def draw(self,view,alpha=1.0):
+        """
+        Draws every live bolt
+
+        Parameter view: the game view, used in drawing
+        Precondition: view is an instance of GView
+
+        Parameter alpha: how far to draw each bolt from its previous position
+        Precondition: alpha is a float in 0..1
+        """
+        for i in range(self._count):
+            self._bolts[i].draw(view,alpha)
+
 
 # IF YOU NEED ADDITIONAL MODEL CLASSES, THEY GO HERE
-class Heart(GSprite):
+class Heart(Model):
     """
     A class to represent a heart that represents one life
 
-    Hearts are a sprite
+    Hearts are drawn with a sprite whose frame follows this model
     """
+    __slots__ = ()
 
-    def __init__(self,curr_x,curr_y):
+    def __init__(self,curr_x,curr_y,config):
         """
-        Initializes a Ship at the given location
+        Initializes a Heart at the given location
 
         Parameter curr_x: the starting x coordinate
         Precondition: x is a number (int or float)
@@ -295,11 +900,34 @@ class Heart(GSprite):
         Parameter curr_y: the starting y coordinate
         Precondition: y is a number (int or float)
 
-        Parameter source: the .png image of the ship
-        Precondition: source is a string that references a .png file
-        inside of invaders
+        Parameter config: the settings of the game
+        Precondition: config is a GameConfig
+        """
+        super().__init__(curr_x,curr_y,config.heart_width,config.heart_height)
+
+    def draw(self,view,alpha=1.0):
+        """
+        Draws this heart, creating its GSprite the first time
+
+        Parameter view: the game view, used in drawing
+        Precondition: view is an instance of GView
+
+        Parameter alpha: how far to go from the previous position
+        Precondition: alpha is a float in 0..1
+        """
+        if self._view is None:
+            # THE SPRITE FOR THE HEART WAS TAKEN FROM LAB 23
+            self._view = game2d.GSprite(x = self.x,y = self.y,
+                        width = self.width, height = self.height,
+                        source = 'heart-sprite.png', format = (2,4))
+        super().draw(view,alpha)
+
+    def _sync_view(self,alpha=1.0):
+        """
+        Copies the position and frame of this heart into its view
+
+        Parameter alpha: how far to go from the previous position
+        Precondition: alpha is a float in 0..1
         """
-        # THE SPRITE FOR THE HEART WAS TAKEN FROM LAB 23
-        super().__init__(x = curr_x,y = curr_y, width = HEART_WIDTH,
-                        height = HEART_HEIGHT, source = 'heart-sprite.png' ,
-                        format = (2,4))
+        super()._sync_view(alpha)
+        self._view.frame = self.frame
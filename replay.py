@@ -0,0 +1,201 @@
+"""
+Input traces for Alien Invaders
+
+A Wave is deterministic once its random number generator is seeded: the
+only other thing that changes what happens is the keys the player holds
+and the length of each animation frame. A Trace records exactly that, one
+entry per call to Wave.update, so that a wave can be played again with the
+same outcome (see play_trace in headless.py).
+
+The trace is compact. The keys held in a frame are packed into the bits of
+a single byte (see KEYS), and the frame times are run-length encoded, so a
+game at a fixed tick rate stores a single time. A trace also keeps the
+GameConfig of the wave, as the wave plays differently with other settings.
+Traces can be saved to and loaded from JSON files.
+
+# Avery Avila - aha68
+# Neil Gidwani - nsg67
+# 12/7/21
+"""
+import json
+from config import GameConfig
+
+# The keys that Wave reads, in the order of their bits in a trace
+KEYS = ('left','a','right','d','up','spacebar')
+
+
+class Trace(object):
+    """
+    A class to represent the input of a single wave.
+
+    A trace stores the seed and settings of the wave, the keys held down in
+    every frame, the time of every frame and (once the wave is recorded)
+    the state of the wave at the end. Playing the trace on a new wave with
+    the same seed and settings must end in exactly the same state.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _seed: the seed of the random number generator of the wave
+    # Invariant: _seed is an int
+    #
+    # Attribute _keys: the keys held down in each frame, one bit per key
+    # Invariant: _keys is a bytearray with one byte per frame
+    #
+    # Attribute _steps: the time of each frame, run-length encoded
+    # Invariant: _steps is a list of [dt, count] pairs, where dt is a float
+    # and count is an int > 0; the counts add up to len(_keys)
+    #
+    # Attribute _outcome: the state of the wave at the end of the trace
+    # Invariant: _outcome is a tuple (see Wave.get_state) or None
+    #
+    # Attribute _config: the settings of the wave
+    # Invariant: _config is a GameConfig
+
+    # GETTERS AND SETTERS
+    @property
+    def seed(self):
+        """
+        The seed of the random number generator of the wave
+
+        **Invariant**: Must be an int
+        """
+        return self._seed
+
+    @property
+    def config(self):
+        """
+        The settings of the wave
+
+        **Invariant**: Must be a GameConfig
+        """
+        return self._config
+
+    @property
+    def outcome(self):
+        """
+        The state of the wave at the end of the trace
+
+        **Invariant**: Must be a tuple or None (if it is not known)
+        """
+        return self._outcome
+
+    @outcome.setter
+    def outcome(self,value):
+        assert value is None or type(value) == tuple, '%s is not a tuple' % repr(value)
+        self._outcome = value
+
+    # INITIALIZER
+    def __init__(self,seed,keys=b'',steps=(),outcome=None,config=None):
+        """
+        Initializes a trace, empty unless keys and steps are given
+
+        Parameter seed: the seed of the wave
+        Precondition: seed is an int
+
+        Parameter keys: the keys held down in each frame, one bit per key
+        Precondition: keys is a bytes-like object
+
+        Parameter steps: the time of each frame, run-length encoded
+        Precondition: steps is a sequence of (dt, count) pairs whose counts
+        add up to len(keys)
+
+        Parameter outcome: the state of the wave at the end of the trace
+        Precondition: outcome is a tuple or None
+
+        Parameter config: the settings of the wave (the defaults if None)
+        Precondition: config is a GameConfig or None
+        """
+        assert type(seed) == int, '%s is not an int' % repr(seed)
+        assert config is None or isinstance(config,GameConfig), \
+            '%s is not a GameConfig' % repr(config)
+        self._seed = seed
+        self._config = GameConfig() if config is None else config
+        self._keys = bytearray(keys)
+        self._steps = [[float(dt),int(count)] for dt, count in steps]
+        assert sum(step[1] for step in self._steps) == len(self._keys), \
+            'the steps do not match the keys'
+        self._outcome = None
+        self.outcome = outcome
+
+    def __len__(self):
+        """
+        Returns the number of frames in this trace
+        """
+        return len(self._keys)
+
+    # PUBLIC METHODS
+    def record(self,input,dt):
+        """
+        Adds a frame to the end of this trace
+
+        Parameter input: the input of the frame
+        Precondition: input is an instance of GInput (or ScriptedInput)
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        """
+        mask = 0
+        for bit in range(len(KEYS)):
+            if input.is_key_down(KEYS[bit]):
+                mask |= 1 << bit
+        self._keys.append(mask)
+        steps = self._steps
+        if steps and steps[-1][0] == dt:
+            steps[-1][1] += 1
+        else:
+            steps.append([float(dt),1])
+
+    def script(self):
+        """
+        Returns the keys held down in each frame, as a ScriptedInput script
+        """
+        names = [frozenset(KEYS[bit] for bit in range(len(KEYS))
+                           if mask & (1 << bit)) for mask in range(1 << len(KEYS))]
+        return [names[mask] for mask in self._keys]
+
+    def times(self):
+        """
+        Returns an iterator over the time of each frame
+        """
+        for dt, count in self._steps:
+            for _ in range(count):
+                yield dt
+
+    def save(self,filename):
+        """
+        Saves this trace to a JSON file
+
+        Parameter filename: the file to write
+        Precondition: filename is a string
+        """
+        data = {'seed': self._seed, 'config': self._config.changes(),
+                'keys': self._keys.hex(), 'steps': self._steps,
+                'outcome': self._outcome}
+        with open(filename,'w') as file:
+            json.dump(data,file)
+
+    @classmethod
+    def load(cls,filename):
+        """
+        Returns the trace saved in a JSON file
+
+        Parameter filename: the file to read
+        Precondition: filename is a string naming a file made by save
+        """
+        with open(filename) as file:
+            data = json.load(file)
+        return cls(data['seed'],bytes.fromhex(data['keys']),data['steps'],
+                   _freeze(data['outcome']),GameConfig(**data.get('config',{})))
+
+
+def _freeze(value):
+    """
+    Returns value with every list (at any depth) turned into a tuple
+
+    JSON has no tuples, so this restores the outcome of a loaded trace.
+
+    Parameter value: the value to convert
+    Precondition: value was read from JSON
+    """
+    if type(value) == list:
+        return tuple(_freeze(item) for item in value)
+    return value
@@ -0,0 +1,169 @@
+"""
+Parallel rollouts for Alien Invaders
+
+This module plays many headless waves (see headless.py) at once, one per
+CPU core, for balancing the game and evaluating bots. Each game is an
+Episode: a seed, a policy that picks the keys to hold every frame, and
+the settings of the wave (a GameConfig, see config.py). The episodes are
+handed out to a pool of worker processes in chunks, and a compact Result
+comes back for every episode as soon as its chunk is done.
+
+    episodes = [Episode(seed, sweep) for seed in range(10000)]
+    for result in run_episodes(episodes):
+        print(result.seed, result.won, result.frames)
+
+Episodes with different settings can share the same pool, as every wave
+carries its own config.
+
+A policy is called as policy(wave, frame) before every update, and returns
+the names of the keys to hold down (as used by GInput). It must be defined
+at the top level of a module, so that it can be sent to the workers. The
+policies sweep and idle below are simple examples.
+
+The waves do not share any state, so the throughput grows with the number
+of cores, as long as each chunk holds enough episodes to hide the cost of
+sending it to a worker.
+
+# Avery Avila - aha68
+# Neil Gidwani - nsg67
+# 12/7/21
+"""
+import collections
+import multiprocessing
+import os
+import time
+
+#: A game to play: the seed of the wave, the policy, the settings of the wave
+#: (a GameConfig, or None for the defaults) and the most frames to play
+#: (or None)
+Episode = collections.namedtuple('Episode','seed policy config max_frames',
+                                 defaults=(None,None))
+
+#: The outcome of an episode: whether the player won, the number of frames
+#: played, aliens destroyed and lives lost, and the wall time in seconds
+Result = collections.namedtuple('Result',
+                                'seed won frames kills lives_lost wall')
+
+
+# POLICIES
+def idle(wave,frame):
+    """
+    Returns no keys, so the ship never moves or fires
+
+    Parameter wave: the wave being played
+    Precondition: wave is a Wave object
+
+    Parameter frame: the number of updates so far
+    Precondition: frame is an int >= 0
+    """
+    return ()
+
+
+def sweep(wave,frame):
+    """
+    Returns the keys to sweep the ship across the screen while firing
+
+    The ship changes direction every 40 frames.
+
+    Parameter wave: the wave being played
+    Precondition: wave is a Wave object
+
+    Parameter frame: the number of updates so far
+    Precondition: frame is an int >= 0
+    """
+    if (frame//40) % 2:
+        return ('right','spacebar')
+    return ('left','spacebar')
+
+
+# RUNNING EPISODES
+def play_episode(episode):
+    """
+    Returns the Result of playing an episode in this process
+
+    The episode ends when the wave is over or has played max_frames
+    frames. Every update is one frame_time of the wave config.
+
+    Parameter episode: the game to play
+    Precondition: episode is an Episode
+    """
+    from headless import Wave
+    start = time.perf_counter()
+    wave = Wave(episode.seed, episode.config)
+    dt = wave.get_config().frame_time
+    input = _PolicyInput()
+    lives = wave.get_lives()
+    frames = 0
+    while not wave.is_game_over():
+        if episode.max_frames is not None and frames >= episode.max_frames:
+            break
+        input.hold(episode.policy(wave,frames))
+        wave.update(input, dt)
+        frames += 1
+    wall = time.perf_counter()-start
+    won = wave.get_lives() > 0 and wave.is_game_over()
+    return Result(episode.seed,won,frames,wave.get_kills(),
+                  lives-wave.get_lives(),wall)
+
+
+def run_episodes(episodes,workers=None,chunksize=None):
+    """
+    Returns an iterator over the Results of playing the episodes
+
+    The episodes are played in a pool of worker processes. The results
+    come back as each chunk of episodes is finished, so they are NOT in the
+    order of the episodes (use the seed to match them up).
+
+    Parameter episodes: the games to play
+    Precondition: episodes is an iterable of Episode objects
+
+    Parameter workers: the number of worker processes (one per core if None)
+    Precondition: workers is an int > 0 or None
+
+    Parameter chunksize: the number of episodes sent to a worker at a time
+    Precondition: chunksize is an int > 0 or None
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize is None:
+        # About four chunks per worker, to balance the load
+        chunksize = 16
+        if hasattr(episodes,'__len__'):
+            chunksize = max(1,len(episodes)//(4*workers))
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(play_episode,episodes,chunksize):
+            yield result
+
+
+# HELPERS
+class _PolicyInput(object):
+    """
+    A class to replace GInput with the keys picked by a policy.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _keys: the keys held down in the current frame
+    # Invariant: _keys is a frozenset of strings
+
+    def __init__(self):
+        """
+        Initializes an input with no keys held down
+        """
+        self._keys = frozenset()
+
+    def hold(self,keys):
+        """
+        Sets the keys held down in the current frame
+
+        Parameter keys: the keys held down
+        Precondition: keys is a collection of key names
+        """
+        self._keys = frozenset(keys)
+
+    def is_key_down(self,key):
+        """
+        Returns True if key is held down in the current frame
+
+        Parameter key: the key to test
+        Precondition: key is a string
+        """
+        return key in self._keys
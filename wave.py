@@ -17,9 +17,12 @@ answer.
 # Neil Gidwani - nsg67
 # 12/7/21
 """
-from game2d import *
-from consts import *
+import game2d
+from game2d import traced
+from config import GameConfig
 from models import *
+from replay import Trace
+import numpy as np
 import random
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
@@ -50,19 +53,30 @@ class Wave(object):
     Only add the getters and setters that you need for Invaders. You can keep
     everything else hidden.
 
+    The ship, aliens, bolts and hearts are plain models (see models.py), so
+    only the method draw needs a window. A wave that is never drawn can be
+    updated headless with a ScriptedInput (see headless.py).
+
+    Every wave has its own seeded random number generator, and it records
+    the input of every update in a Trace (see replay.py). So a wave can be
+    played again, with the same outcome, from its seed and its trace.
+
+    The size of the screen and of the formation, and every speed, come
+    from the GameConfig of the wave (see config.py). Waves with different
+    configs can be played side by side.
     """
     # HIDDEN ATTRIBUTES:
     # Attribute _ship: the player ship to control
     # Invariant: _ship is a Ship object or None
     #
-    # Attribute _aliens: the 2d list of aliens in the wave
-    # Invariant: _aliens is a rectangular 2d list containing Alien objects or None
+    # Attribute _aliens: the formation of aliens in the wave
+    # Invariant: _aliens is a Formation object
     #
     # Attribute _bolts: the laser bolts currently on screen
-    # Invariant: _bolts is a list of Bolt objects, possibly empty
+    # Invariant: _bolts is a BoltPool, possibly empty
     #
     # Attribute _dline: the defensive line being protected
-    # Invariant : _dline is a GPath object
+    # Invariant : _dline is a GPath object, or None if the wave was never drawn
     #
     # Attribute _lives: the number of lives left
     # Invariant: _lives is an int >= 0
@@ -79,7 +93,7 @@ class Wave(object):
 
     # Attribute _rate: the current number of steps the alien should take
     #                  before its next bolt
-    # Invariant: _rate is an int between 1 and BOLT_RATE
+    # Invariant: _rate is an int between 1 and the bolt_rate of _config
 
     # Attribute _rate_time: the amount of time since the alien bolt was fired
     # Invariant: _rate_time is an int >= 0
@@ -107,34 +121,120 @@ class Wave(object):
     # Attribute _heart_animator: A coroutine for performing a heart animation
     # Invariant: _heart_animator is a generator-based coroutine (or None)
 
+    # Attribute _random: the random number generator of this wave
+    # Invariant: _random is a random.Random object seeded with the trace seed
+
+    # Attribute _trace: the input of every update so far
+    # Invariant: _trace is a Trace object with one frame per call to update
+
+    # Attribute _config: the settings of this wave
+    # Invariant: _config is a GameConfig, the config of _trace
+
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def get_seed(self):
+        """
+        Returns the seed of the random number generator of this wave
+        """
+        return self._trace.seed
+
+    def get_config(self):
+        """
+        Returns the settings of this wave (a GameConfig)
+        """
+        return self._config
+
+    def get_lives(self):
+        """
+        Returns the number of lives the player has left
+        """
+        return self._lives
+
+    def get_kills(self):
+        """
+        Returns the number of aliens destroyed so far
+        """
+        return self._aliens.rows*self._aliens.cols - self._aliens.count
+
+    def get_bolt_count(self):
+        """
+        Returns the number of laser bolts currently on screen
+        """
+        return len(self._bolts)
+
+    def get_trace(self):
+        """
+        Returns the input of this wave so far, with its current state
+
+        The outcome of the returned trace is the current state of this wave
+        (see get_state), so the trace can be played back and checked.
+        """
+        self._trace.outcome = self.get_state()
+        return self._trace
+
+    def get_state(self):
+        """
+        Returns a tuple describing the state of this wave
+
+        Two waves with equal states have the same lives, ship, aliens, bolts
+        and timers. This is used to check that a trace was played back
+        exactly. The tuple only holds ints, floats, bools and None.
+        """
+        ship = None
+        if self._ship is not None:
+            ship = (self._ship.x, self._ship.y)
+        aliens = tuple(self._aliens.is_alive(row,col)
+                       for row in range(self._aliens.rows)
+                       for col in range(self._aliens.cols))
+        bolts = tuple((bolt.x, bolt.y, bolt.is_player_bolt())
+                      for bolt in self._bolts)
+        return (self._lives, ship, self._aliens.origin, aliens, bolts,
+                self._time, self._rate, self._rate_time,
+                self._curr_alien_speed, len(self._trace))
 
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
+    def __init__(self, seed=None, config=None):
         """
         Initializes the wave subcontroller
 
         Note that this is a proper initializer, because
         Animation is NOT a subclass of GameApp (we only
         want one Window)
+
+        If seed is None, a seed is picked at random, so that the wave can
+        still be played back from its trace.
+
+        Parameter seed: the seed for the random number generator
+        Precondition: seed is an int or None
+
+        Parameter config: the settings of the wave (the defaults if None)
+        Precondition: config is a GameConfig or None
         """
+        if seed is None:
+            seed = random.getrandbits(32)
+        if config is None:
+            config = GameConfig()
+        self._config = config
+        self._random = random.Random(seed)
+        self._trace = Trace(seed, config=config)
         self._create_aliens()
         self._create_ship()
         self._time = 0
         self._vstep = 0
-        self._bolts = []
-        self._rate = random.randint(1, BOLT_RATE)
+        self._bolts = BoltPool(config)
+        self._dline = None
+        self._rate = self._random.randint(1, config.bolt_rate)
         self._rate_time = 0
         self._ship_destroyed = False
         self._animator = None
-        self._lives = SHIP_LIVES
+        self._lives = config.ship_lives
         self._old_ship = None
-        self._curr_alien_speed = ALIEN_SPEED
+        self._curr_alien_speed = config.alien_speed
         self._create_hearts()
         self._heart_time = 0
         self._heart_animator = None
 
     # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
+    @traced()
     def update(self,input, dt):
         """
         Animates the wave
@@ -145,6 +245,9 @@ class Wave(object):
         Parameter dt: The time since the last animation frame.
         Precondition: dt is a float.
         """
+        self._trace.record(input, dt)
+        if self._ship is not None:
+            self._ship.save_position()
         if self._lives > 0 and self._ship is None:
             self._revive_ship()
         if self._animator is not None:    # We have something to animate
@@ -161,7 +264,7 @@ class Wave(object):
         self._heart_time += dt
         if self._time > self._curr_alien_speed and self._time != 0:
                 self._update_aliens(dt)
-        self._update_bolts()
+        self._update_bolts(dt)
         self._update_hearts(dt)
 
     def is_ship_dead(self):
@@ -180,35 +283,54 @@ class Wave(object):
 
         A game is over if _lives < 0 or all aliens are dead
         """
-        alien_dead = True
         if self._lives <= 0:
             return True
-        for row in self._aliens:
-            for alien in row:
-                if alien is not None:
-                    alien_dead = False
-        return alien_dead
+        return self._aliens.is_empty()
+
+    def fire_bolt(self, x, y, direction):
+        """
+        Adds a laser bolt at the given location, as if it had been fired
+
+        This is used by the benchmark to fill the screen with bolts.
+
+        Parameter x: the starting x coordinate
+        Precondition: x is a number (int or float)
+
+        Parameter y: the starting y coordinate
+        Precondition: y is a number (int or float)
+
+        Parameter direction: the direction of the bolt
+        Precondition: direction is 'up' or 'down'
+        """
+        self._bolts.fire(x, y, direction)
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
-    def draw(self, view):
+    @traced()
+    def draw(self, view, alpha=1.0):
         """
         Draws the ship, aliens, defensive line, and bolts
 
+        The ship and bolts are drawn the fraction alpha of the way from where
+        they were before the last update to where they are now. The aliens
+        walk in steps, so they are always drawn where they are.
+
         Attribute view: the game view, used in drawing
         Invariant: view is an instance of GView (inherited from GameApp)
+
+        Parameter alpha: how far to draw moving objects from their previous
+        positions
+        Precondition: alpha is a float in 0..1
         """
-        for row in self._aliens:
-            for alien in row:
-                if alien is not None:
-                    alien.draw(view)
+        self._aliens.draw(view)
         if self._ship is not None:
-            self._ship.draw(view)
-        def_line = GPath(linewidth = 5,
-                        points = [0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],
+            self._ship.draw(view, alpha)
+        if self._dline is None:
+            line = self._config.defense_line
+            self._dline = game2d.GPath(linewidth = 5,
+                        points = [0,line,self._config.game_width,line],
                         linecolor = 'grey')
-        def_line.draw(view)
-        for bolt in self._bolts:
-            bolt.draw(view)
+        self._dline.draw(view)
+        self._bolts.draw(view, alpha)
         for heart in self._hearts:
             heart.draw(view)
 
@@ -217,35 +339,42 @@ class Wave(object):
         """
         Determines if there has been a collision between a ship and a bolt
 
-        If there has been contact, the ship gets set to None
+        If there has been contact, the ship gets set to None. A ship that
+        is already being destroyed still stops the bolt, but only loses one
+        heart.
 
         Parameter bolt: The bolt object to check if it collides with an alien
         Precondition: bolt is a Bolt object
         """
 
         if self._ship is not None and self._ship.collides(bolt):
-            self._ship_destroyed = True
-            self._hearts.pop(-1)
+            if not self._ship_destroyed:
+                self._ship_destroyed = True
+                self._hearts.pop(-1)
             return True
 
-    def _alien_contact(self, bolt):
+    @traced()
+    def _alien_contact(self, bolts):
         """
-        Determines if there has been a collision between a alien and a bolt
+        Returns the set of indices of the bolts that hit an alien
 
-        If there has been contact, the alien gets set to none
+        Every bolt is checked against every alien at once (see the method
+        hits in Formation). Each alien that is hit is removed from the
+        formation and speeds up the aliens by a factor of .97.
 
-        Parameter bolt: The bolt object to check if it collides with an alien
-        Precondition: bolt is a Bolt object
+        Parameter bolts: The bolts to check if they collide with an alien
+        Precondition: bolts is a BoltPool
         """
-        bolt = bolt
-        for i in range(len(self._aliens)):
-            for j in range(len(self._aliens[i])):
-                if self._aliens[i][j] is not None:
-                    if self._aliens[i][j].collides(bolt):
-                        self._aliens[i][j] = None
-                        self._curr_alien_speed *= .97
-                        return True
+        xs = np.fromiter((bolt.x for bolt in bolts),float,len(bolts))
+        ys = np.fromiter((bolt.y for bolt in bolts),float,len(bolts))
+        used = set()
+        for i, row, col in self._aliens.hits(xs,ys):
+            self._aliens.kill(row,col)
+            self._curr_alien_speed *= .97
+            used.add(i)
+        return used
 
+    @traced()
     def _update_ship_bolt(self, input, dt):
         """
         A helper method for updates the ship and bolts
@@ -259,36 +388,43 @@ class Wave(object):
         Parameter dt: The time since the last animation frame.
         Precondition: dt is a float.
         """
-        self._update_ship(input)
+        self._update_ship(input, dt)
         if input.is_key_down('up') or input.is_key_down('spacebar'):
             if self._ship is not None:
                 self._create_ship_bolt()
         if self._rate_time > self._rate:
             self._create_alien_bolt()
             self._rate_time = 0
-            self._rate = random.randint(1, BOLT_RATE)
+            self._rate = self._random.randint(1, self._config.bolt_rate)
 
-    def _update_ship(self, input):
+    @traced()
+    def _update_ship(self, input, dt):
         """
         Updates the ships position
 
         The ship can only more horizontally and is determined by
         a key input. Also makes sure the ship does not travel too far
-        to the left or right.
+        to the left or right. The ship moves ship_movement pixels every
+        frame_time seconds (see GameConfig).
 
         Attribute input : the input (inherited from GameApp)
         Invariant: input is an instance of GInput
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
         """
         #i took this from arrows.py in samples
+        config = self._config
         da = 0
         if input.is_key_down('left') or input.is_key_down('a'):
-            da -= SHIP_MOVEMENT
+            da -= config.ship_movement
         if input.is_key_down('right') or input.is_key_down('d'):
-            da += SHIP_MOVEMENT
+            da += config.ship_movement
+        da *= dt/config.frame_time
 
         temp = self._ship.x + da
-        max_dist = GAME_WIDTH - SHIP_WIDTH//2
-        min_dist = SHIP_WIDTH//2
+        max_dist = config.ship_max_x
+        min_dist = config.ship_min_x
         if temp > max_dist:
             self._ship.x = max_dist
         elif temp < min_dist:
@@ -296,28 +432,33 @@ class Wave(object):
         else:
             self._ship.x = temp
 
-    def _update_bolts(self):
+    @traced()
+    def _update_bolts(self, dt):
         """
         Updates the bolt
 
         The bolt needs to have its position updates and it needs to be
-        checked if it must be deleted or hits an alien or ship.
+        checked if it must be deleted or hits an alien or ship. Bolts are
+        removed from the back, as removing a bolt moves the last bolt into
+        its place (see BoltPool).
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
         """
         #i took the bottom section from pyro.py in samples
         for bolt in self._bolts:
-            bolt.update_pos()
+            bolt.update_pos(dt)
 
-        i = 0
-        while i < len(self._bolts):
+        for i in reversed(range(len(self._bolts))):
             if self._bolts[i].is_gone():
-                del self._bolts[i]
-            elif self._alien_contact(self._bolts[i]):
-                del self._bolts[i]
-            elif self._ship_contact(self._bolts[i]):
-                del self._bolts[i]
-            else:
-                i += 1
+                self._bolts.remove(i)
+
+        used = self._alien_contact(self._bolts)
+        for i in reversed(range(len(self._bolts))):
+            if i in used or self._ship_contact(self._bolts[i]):
+                self._bolts.remove(i)
 
+    @traced()
     def _update_aliens(self,dt):
         """
         Updates all aliens
@@ -329,15 +470,16 @@ class Wave(object):
         Parameter dt: The time since the last animation frame.
         Precondition: dt is a float.
         """
+        width = self._config.game_width
         if self._vstep % 2 == 0:
-            right = self._rightmost() + ALIEN_H_SEP
-            if right < GAME_WIDTH:
+            right = self._rightmost() + self._config.alien_h_sep
+            if right < width:
                 self._move_aliens_right()
-            elif right >= GAME_WIDTH:
+            elif right >= width:
                 self._move_down()
             self._rate_time += 1
         elif self._vstep % 2 == 1:
-            left = self._leftmost() - ALIEN_H_SEP
+            left = self._leftmost() - self._config.alien_h_sep
             if left > 0:
                 self._move_aliens_left()
             elif left <= 0:
@@ -348,11 +490,12 @@ class Wave(object):
             self._lives = 0
         self._time = dt
 
+    @traced()
     def _update_hearts(self, dt):
         """
         Updates all hearts
 
-        Hearts only get animated if _heart_time >= HEART_TIME
+        Hearts only get animated if _heart_time >= heart_time (see GameConfig)
 
         Parameter dt: The time since the last animation frame.
         Precondition: dt is a float.
@@ -364,81 +507,50 @@ class Wave(object):
             except:
                 self._heart_animator = None
                 self._heart_time = dt
-        elif self._heart_time >= HEART_TIME:
+        elif self._heart_time >= self._config.heart_time:
             self._heart_animator = self._animate_hearts(dt)
             next(self._heart_animator)
 
     def _move_aliens_right(self):
         """
-        Moves all aliens to the right by ALIEN_H_WALK
+        Moves all aliens to the right by alien_h_walk (see GameConfig)
         """
-        for row in self._aliens:
-            for alien in row:
-                if alien is not None:
-                    alien.x += ALIEN_H_WALK
+        self._aliens.march(self._config.alien_h_walk,0)
 
     def _move_aliens_left(self):
         """
-        Moves all aliens to the left by ALIEN_H_WALK
+        Moves all aliens to the left by alien_h_walk (see GameConfig)
         """
-        for row in self._aliens:
-            for alien in row:
-                if alien is not None:
-                    alien.x -= ALIEN_H_WALK
+        self._aliens.march(-self._config.alien_h_walk,0)
 
     def _rightmost(self):
         """
         Returns the x coordinate of the rightmost alien
 
-        This method loops through the right most alien in each row
-        """
-        furthest = 0
-        for row in self._aliens:
-            alien = row[-1]
-            i = -2
-            while alien is None and i >= -len(row):
-                alien = row[i]
-                i -= 1
-            if alien is not None:
-                curr_x = alien.x + ALIEN_WIDTH//2
-                if curr_x > furthest:
-                    furthest = curr_x
-        return furthest
+        Returns 0 if there are no aliens left
+        """
+        return self._aliens.rightmost()
 
     def _leftmost(self):
         """
         Returns the x coordinate of the leftmost alien
 
-        This methods loops through the left most alien in each row
-        """
-        furthest = GAME_WIDTH
-        for row in self._aliens:
-            alien = row[0]
-            i = 1
-            while alien is None and i < len(row):
-                alien = row[i]
-                i += 1
-            if alien is not None:
-                curr_x = alien.x - ALIEN_WIDTH//2
-                if curr_x < furthest:
-                    furthest = curr_x
-        return furthest
+        Returns the width of the game if there are no aliens left
+        """
+        return self._aliens.leftmost()
 
     def _move_down(self):
         """
-        Moves all aliens down by ALIEN_V_WALK
+        Moves all aliens down by alien_v_walk (see GameConfig)
 
         Also increments _vstep by 1
         """
-        for row in self._aliens:
-            for alien in row:
-                if alien is not None:
-                    alien.y -= ALIEN_V_WALK
+        self._aliens.march(0,-self._config.alien_v_walk)
         self._vstep += 1
 
     def _create_ship_bolt(self):
         """
-        Creates a bolt object directed upwards and adds it to _bolts
+        Fires a bolt from _bolts directed upwards
 
         The bolt object is created above the nose of the ship, and
         is directed upwards. The bolt is only created if there is no
@@ -447,35 +559,28 @@ class Wave(object):
         for bolt in self._bolts:
             if bolt.is_player_bolt():
                 return None
-        real_y = self._ship.y + SHIP_HEIGHT//2 + BOLT_HEIGHT//2
-        self._bolts.append(Bolt(self._ship.x, real_y, 'up'))
+        real_y = self._ship.y + self._config.ship_muzzle
+        self._bolts.fire(self._ship.x, real_y, 'up')
 
     def _create_alien_bolt(self):
         """
-        Creates a bolt object directed downwards and adds it to _bolts
+        Fires a bolt from _bolts directed downwards
 
         The bolt object is created just below the alien. The alien column
-        is selected at random and will always find an alien to fire
-        unless all aliens are None.
-        """
-        fire = None
-        while fire is None:
-            i = 1
-            fire = random.randint(0,ALIENS_IN_ROW -1)
-            alien = self._aliens[0][fire]
-            while alien is None and i < ALIEN_ROWS:
-                alien = self._aliens[i][fire]
-                i+=1
-            if alien is not None:
-                real_y = alien.y - ALIEN_HEIGHT//2 - BOLT_HEIGHT//2
-                self._bolts.append(Bolt(alien.x, real_y, 'down'))
-            else:
-                fire = None
+        is selected at random from the columns that still have aliens, so
+        no bolt is fired only if all aliens are destroyed.
+        """
+        if self._aliens.shooters > 0:
+            fire = self._random.randint(0,self._aliens.shooters-1)
+            row, col = self._aliens.shooter(fire)
+            alien_x, alien_y = self._aliens.position(row,col)
+            real_y = alien_y - self._config.alien_muzzle
+            self._bolts.fire(alien_x, real_y, 'down')
 
     def _animate_destroy_ship(self):
         """
         Animates a vertical up or down of the image over
-        ANIMATION_SPEED seconds
+        death_speed seconds (see GameConfig)
 
         This method is a coroutine that takes a break (so that the game
         can redraw the image) every time it moves it. The coroutine takes
@@ -487,7 +592,7 @@ class Wave(object):
         """
         #taken from _animate_slide in coroutine.py
         self._old_ship = self._ship
-        steps = 8/DEATH_SPEED
+        steps = 8/self._config.death_speed
         animating = True
         total = 0
         while animating:
@@ -516,7 +621,7 @@ class Wave(object):
         Precondition: dt is a float.
         """
         #taken from _animate_slide in coroutine.py
-        steps = 8/HEART_SPEED
+        steps = 8/self._config.heart_speed
         animating = True
         total = 0
         while animating:
@@ -551,52 +656,27 @@ class Wave(object):
 
         Returns True if an any alien is below the defense line
         """
-        for row in self._aliens:
-            for alien in row:
-                if alien is not None:
-                    real_y = alien.y - ALIEN_HEIGHT//2
-                    if real_y - DEFENSE_LINE <= 0:
-                        return True
-        return False
+        return self._aliens.bottom() - self._config.defense_line <= 0
 
     def _create_aliens(self):
         """
-        Creates a 2d list of Alien objects
-
-        Creates aliens from the bottom-up and starts in the bottom-left corner
-        and creates from left to right. Each alien image is repeated for two
-        rows and then changed to the next ALIEN_IMAGES in consts.
-        """
-        self._aliens = []
-        real_h_sep = ALIEN_H_SEP + ALIEN_WIDTH
-        real_v_sep = ALIEN_V_SEP + ALIEN_HEIGHT
-        #need to start from bottom
-        curr_x = ALIEN_H_SEP + ALIEN_WIDTH//2
-        top_h = GAME_HEIGHT - (ALIEN_CEILING + ALIEN_HEIGHT//2)
-        curr_y = top_h - (real_v_sep * (ALIEN_ROWS-1))
-        index= 0
-        flip = []
-        for a in ALIEN_IMAGES:
-            flip.insert(0,a)
-
-        for i in range(ALIEN_ROWS):
-            self._aliens.append([])
-            for j in range(ALIENS_IN_ROW):
-                image = ALIEN_IMAGES[((index%ALIEN_ROWS)//2)%3]
-                self._aliens[i].append(Alien(curr_x,curr_y,image))
-                curr_x += real_h_sep
-            curr_x = ALIEN_H_SEP + ALIEN_WIDTH//2
-            curr_y += real_v_sep
-            index += 1
+        Creates the Formation of aliens
+
+        The formation starts in the top left of the screen. Its size,
+        spacing and images (each alien image is repeated for two rows and
+        then changed to the next) are computed by the GameConfig.
+        """
+        self._aliens = Formation(self._config)
 
     def _create_ship(self):
         """
         Creates a ship object
 
-        The ship is centered horizontally and located at SHIP_BOTTOM. The
-        ship also uses SHIP_IMAGE in consts
+        The ship is centered horizontally and located at ship_bottom. The
+        ship also uses ship_image (see GameConfig)
         """
-        self._ship = Ship(GAME_WIDTH//2, SHIP_BOTTOM)
+        config = self._config
+        self._ship = Ship(config.game_width//2, config.ship_bottom, config)
 
     def _create_hearts(self):
         """
@@ -605,9 +685,10 @@ class Wave(object):
         The hearts are located in the top right corner with the first heart
         the rightmost one
         """
+        config = self._config
         self._hearts = []
-        curr_x = GAME_WIDTH - HEART_WIDTH//2
-        curr_y = GAME_HEIGHT - HEART_HEIGHT//2
+        curr_x = config.game_width - config.heart_width//2
+        curr_y = config.game_height - config.heart_height//2
         for heart in range(self._lives):
-            self._hearts.append(Heart(curr_x, curr_y))
-            curr_x -= HEART_WIDTH
+            self._hearts.append(Heart(curr_x, curr_y, config))
+            curr_x -= config.heart_width